@@ -1,9 +1,27 @@
 #!/usr/bin/env python
 
 """
+Public guide api. Functions are imported from crefor.control.guide on
+first access, so importing crefor.api doesn't load Maya, the guide
+model or logging until something is used.
+
+**Example**:
+
+>>> from crefor import api
+>>> api.create("C", "spine", 0)
+# Result: <Guide 'C_spine_0_gde'> #
 """
 
-from crefor.control.guide import remove, create, duplicate, remove, \
-    set_parent, add_child, has_parent, has_child, is_parent, remove_parent, \
-    get_guides, reinit, compile, decompile, write, read, rebuild, exists, \
-    set_axis, validate, set_debug
\ No newline at end of file
+from crefor.lib import libPython
+
+__all__ = ["remove", "create", "duplicate",
+           "set_parent", "add_child", "has_parent", "has_child", "is_parent", "remove_parent",
+           "get_guides", "reinit", "compile", "decompile", "write", "read", "rebuild", "exists",
+           "set_axis", "validate", "set_debug", "report", "write_report", "sweep",
+           "verify", "mirror", "link", "unlink", "get_linked",
+           "get_state", "set_state", "GuideSet", "is_guide", "duplicate_array",
+           "set_display", "connect_display", "set_connector_mode",
+           "rebuild_job", "read_job", "compile_job", "duplicate_job", "write_job",
+           "write_async"]
+
+libPython.lazy_module(__name__, dict((name, "crefor.control.guide") for name in __all__))
@@ -7,15 +7,25 @@ where required.
 """
 
 import os
+import csv
+import gzip
 import json
+import logging
+import threading
+from collections import OrderedDict
 from maya import cmds
 
-from crefor.lib import libUtil, libXform, libName
-from crefor.model.guide import Guide
+from crefor.lib import libUtil, libXform, libName, libScene, libAttr
+from crefor.model.guide import Guide, Up, get_orphans
+from crefor.model.guideset import GuideSet, is_guide
+from crefor.model import display
 
-from crefor import log
+from crefor import log, metrics, trace, solver, jobs
 logger = log.get_logger(__name__)
 
+@metrics.timed("control.guide.create")
+@trace.traced("control.guide.create", position=0, description=1, index=2)
+@libScene.bulk()
 def create(position, description, index=0):
     """create(position, description, index=0)
     Create a guide.
@@ -40,6 +50,9 @@ def create(position, description, index=0):
                   index=index).create()
     return guide
 
+@metrics.timed("control.guide.duplicate")
+@trace.traced("control.guide.duplicate", guide=0)
+@libScene.bulk(selection=False)
 def duplicate(guide, hierarchy=True):
     """duplicate(guide, hierarchy=True)
     Duplicate a guide. The duplicate guides names are all generated in scene
@@ -58,37 +71,481 @@ def duplicate(guide, hierarchy=True):
     # Result: <Guide 'C_spine_1_gde'> #
     """
 
+    return jobs.Job("control.guide.duplicate", _duplicate_steps, (guide, hierarchy)).run()
+
+def _duplicate_steps(job, guide, hierarchy):
+    """
+    duplicate() one guide at a time, removing duplicates on cancel
+    """
+
     guide = validate(guide)
 
-    data = libUtil.write_hierarchy(guide)
+    if hierarchy:
+        tree = libUtil.Hierarchy.fetch(guide)
+    else:
+        tree = libUtil.Hierarchy([guide.node], [-1])
+
+    job.total += len(tree) * 2 - 1
+
     dup_data = {}
+    try:
 
-    # Create duplicate guides
-    for parent in data:
-        dup_parent = parent.duplicate()
-        dup_data[parent] = dup_parent
+        # Allocate names up front, scene indices are queried once per name family
+        with libName.reservation():
+            names = dict((node, libName.generate(node)) for node in tree)
 
-    # Create duplicate hierarchy
-    for parent in data:
-        libXform.match_translates(dup_data[parent].node, parent.node)
-        for child in data[parent]:
+        # Create duplicate guides
+        for node in tree:
+            dup_data[node] = Guide(*libName.decompile(names[node], 3)).create()
+            yield
+
+        # Create duplicate hierarchy
+        for node in tree:
+            libXform.match_translates(dup_data[node].node, node)
+        for parent, child in tree.edges():
             dup_data[parent].add_child(dup_data[child])
+            yield
 
-    # Select top guide
-    top_guide = dup_data.values().pop(0).node
-    while cmds.listRelatives(top_guide, parent=True):
-        top_guide = cmds.listRelatives(top_guide, parent=True)[0]
+    except GeneratorExit:
+        for dup in dup_data.values():
+            if dup.exists():
+                dup.remove()
+        raise
 
     # Return duplicate nodes in list format
     # First index in list is top of hierarchy
-    dup_guides = dup_data.values()
-    dup_guides.insert(0, dup_guides.pop(dup_guides.index(Guide(*libName.decompile(top_guide, 3)))))
+    dup_guides = [dup_data[node] for node in tree]
 
     cmds.select(dup_guides[0].node, r=True)
 
-    logger.info("Duplicate guides created: %s" % [g.node for g in dup_guides])
-    return dup_guides
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Duplicate guides created: %s", [g.node for g in dup_guides])
+    job.result = dup_guides
+
+@metrics.timed("control.guide.duplicate_array")
+@trace.traced("control.guide.duplicate_array", guide=0)
+@libScene.bulk(selection=False)
+def duplicate_array(guide, count, transforms="linear", **kwargs):
+    """duplicate_array(guide, count, transforms="linear", **kwargs)
+    Duplicate a guide and its descendents count times. Names for all
+    copies are allocated up front, each copy numbered contiguously
+    like duplicate(), and all positions and up positions are computed
+    at once. Guides are still created and parented one at a time.
+    Copies keep the axis, flip, offset and aim settings of the source.
+
+    :param      guide:          Root guide to duplicate
+    :param      count:          Number of copies
+    :param      transforms:     'linear', 'radial' or one 4x4 worldspace
+                                matrix per copy. Keyword arguments are
+                                passed to solver.linear_transforms() or
+                                solver.radial_transforms().
+    :type       guide:          Guide, str
+    :type       count:          int
+    :type       transforms:     str, list
+    :returns:                   Copies, each a list of guides with the
+                                copied root first
+    :rtype:                     list
+    :raises:                    ValueError, ImportError
+
+    **Example**:
+
+    >>> # Four legs, two units apart
+    >>> duplicate_array("L_legA_0_gde", 3, offset=(0, 0, -2))
+    # Result: [[<Guide 'L_legA_1_gde'>, ...], ...] #
+
+    >>> # Five starfish arms
+    >>> duplicate_array("C_arm_0_gde", 4, "radial", axis="y")
+    """
+
+    if count < 1:
+        return []
+
+    if isinstance(transforms, basestring):
+        if transforms not in ["linear", "radial"]:
+            raise ValueError("Unknown transforms '%s', expected 'linear' or 'radial'" % transforms)
+        transforms = getattr(solver, "%s_transforms" % transforms)(count, **kwargs)
+    elif len(transforms) != count:
+        raise ValueError("Expected %s transforms, got %s" % (count, len(transforms)))
+
+    guide = validate(guide)
+    tree = libUtil.Hierarchy.fetch(guide)
+    nodes = tree.nodes
+    state = get_state(nodes)
+
+    # Transform every copy at once, (count, guides, 3)
+    positions = solver.transform_points(state["positions"], transforms)
+    up_positions = solver.transform_points(state["up_positions"], transforms)
+
+    # Allocate all names copy by copy so each copy is numbered
+    # contiguously, scene indices are queried once per name family
+    with libName.reservation():
+        names = [[libName.generate(node) for node in nodes] for _ in range(count)]
+
+    copies = []
+    for copy in names:
+        copies.append([Guide(*libName.decompile(name, 3)).create() for name in copy])
+
+    # Hierarchy and aims
+    targets = [str(Guide.validate(node).get_aim_at()) for node in nodes]
+    for dups in copies:
+        for parent, child in tree.edges():
+            dups[tree.index(parent)].add_child(dups[tree.index(child)])
+
+    guides = [guide for dups in copies for guide in dups]
+    set_state(guides,
+              positions=positions.reshape(-1, 3),
+              up_positions=up_positions.reshape(-1, 3),
+              axes=state["axes"] * count,
+              offsets=list(state["offsets"]) * count,
+              flips=list(state["flips"]) * count,
+              debug=list(state["debug"]) * count)
+
+    for dups in copies:
+        for dup, target in zip(dups, targets):
+            if target in tree:
+                dup.aim_at(dups[tree.index(target)])
+            else:
+                dup.aim_at(target)
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Duplicated '%s' %s time(s), %s guides created", guide.node, count, len(guides))
+    return copies
+
+@metrics.timed("control.guide.mirror")
+@trace.traced("control.guide.mirror")
+@libScene.bulk()
+def mirror(guides=[], plane="YZ", from_side="L", to_side="R"):
+    """mirror(guides=[], plane="YZ", from_side="L", to_side="R")
+    Mirror guides to their counterparts on the other side. Positions,
+    up positions and offsets are mirrored in one pass, then counterparts
+    are created or updated and given the same hierarchy, axis and aim
+    settings. Parents and aim targets outside of the mirrored guides,
+    eg. a centre spine, are shared.
+
+    :param      guides:     Guides to mirror, defaults to all
+                            from_side guides
+    :param      plane:      Mirror plane, 'YZ', 'XZ' or 'XY'
+    :param      from_side:  Position of guides to mirror
+    :param      to_side:    Position of mirrored guides
+    :type       guides:     list
+    :type       plane:      str
+    :type       from_side:  str
+    :type       to_side:    str
+    :returns:               Mirrored guides, parents first
+    :rtype:                 list
+    :raises:                ValueError, ImportError
+
+    **Example**:
+
+    >>> mirror(["L_hip_0_gde"])
+    # Result: [<Guide 'R_hip_0_gde'>] #
+
+    >>> # Mirror all left legs
+    >>> mirror()
+    # Result: [<Guide 'R_hip_0_gde'>, <Guide 'R_hip_1_gde'>, ...] #
+    """
+
+    if guides:
+        guides = map(validate, guides)
+    else:
+        guides = list(GuideSet(position=from_side))
+
+    for guide in guides:
+        if guide.position != from_side:
+            raise ValueError("Guide '%s' is not on side '%s'" % (guide.node, from_side))
+
+    if not guides:
+        return []
+
+    data = snapshot(guides)
+    nodes, _ = solver.hierarchy(data)
+    snapshots = [data[node] for node in nodes]
+
+    # Mirror all transforms at once
+    positions = solver.mirror([s["position"] for s in snapshots], plane)
+    ups = solver.mirror([s["up_position"] for s in snapshots], plane)
+    offsets = solver.mirror_offset([s["offset"] for s in snapshots])
+
+    def counterpart(node):
+        if node in data:
+            return libName.update(node, position=to_side)
+        return node
+
+    # Create or update counterparts, parents first
+    mirrored = []
+    for node, s in zip(nodes, snapshots):
+        name = counterpart(node)
+        if cmds.objExists(name):
+            guide = validate(name)
+        else:
+            guide = Guide(*libName.decompile(name, 3)).create()
+
+        parent = counterpart(s["parent"]) if s["parent"] else None
+        if parent and not (guide.parent and guide.parent.node == parent):
+            guide.set_parent(parent)
+        elif not parent and guide.parent:
+            guide.remove_parent()
+
+        mirrored.append(guide)
+
+    # Positions are worldspace, parents move children so set them in order
+    for guide, position in zip(mirrored, positions):
+        guide.set_position(*position, worldspace=True)
+
+    for guide, s, up, offset in zip(mirrored, snapshots, ups, offsets):
+        guide.up.set_position(up.tolist(), worldspace=True)
+        guide.set_axis(s["primary"], s["secondary"])
+        guide.aim_flip(s["aim_flip"])
+        guide.set_offset(*offset)
+
+        # Aim targets that were not mirrored are not children
+        if s["aim_at"] in data or s["aim_at"] in Guide.DEFAULT_AIMS:
+            guide.aim_at(counterpart(s["aim_at"]))
+        else:
+            logger.warning("Cannot mirror aim of '%s' at '%s', target was not mirrored", guide.node, s["aim_at"])
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Mirrored %s guide(s) across %s: %s", len(mirrored), plane, [g.node for g in mirrored])
+    return mirrored
+
+@metrics.timed("control.guide.link")
+@trace.traced("control.guide.link")
+@libScene.bulk()
+def link(guides=[], plane="YZ", from_side="L", to_side="R"):
+    """link(guides=[], plane="YZ", from_side="L", to_side="R")
+    Mirror guides, see mirror(), then keep their counterparts mirrored
+    live with utility nodes. Linked counterparts follow every edit to
+    their source guide until unlinked.
+
+    :param      guides:     Guides to link, defaults to all
+                            from_side guides
+    :param      plane:      Mirror plane, 'YZ', 'XZ' or 'XY'
+    :param      from_side:  Position of source guides
+    :param      to_side:    Position of linked guides
+    :type       guides:     list
+    :type       plane:      str
+    :type       from_side:  str
+    :type       to_side:    str
+    :returns:               Linked guides, parents first
+    :rtype:                 list
+
+    **Example**:
+
+    >>> link(["L_hip_0_gde", "L_knee_0_gde"])
+    # Result: [<Guide 'R_hip_0_gde'>, <Guide 'R_knee_0_gde'>] #
+    """
+
+    # Linked translates can't be set, bake existing links first
+    if guides:
+        guides = map(validate, guides)
+        unlink([libName.update(guide.node, position=to_side) for guide in guides])
+    else:
+        unlink([guide for guide in get_linked() if guide.position == to_side])
+
+    linked = mirror(guides, plane=plane, from_side=from_side, to_side=to_side)
+    for guide in linked:
+        guide.link(libName.update(guide.node, position=from_side), plane=plane)
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Linked %s guide(s) across %s", len(linked), plane)
+    return linked
+
+@metrics.timed("control.guide.unlink")
+@trace.traced("control.guide.unlink")
+@libScene.bulk()
+def unlink(guides=[]):
+    """unlink(guides=[])
+    Remove symmetry links, baking the current positions
+
+    :param      guides:     Guides to unlink, defaults to all linked
+                            guides
+    :type       guides:     list
+    :returns:               Guides that were unlinked
+    :rtype:                 list
+
+    **Example**:
+
+    >>> unlink()
+    # Result: [<Guide 'R_hip_0_gde'>, <Guide 'R_knee_0_gde'>] #
+    """
+
+    if guides:
+        guides = [validate(guide) for guide in guides if cmds.objExists(str(guide))]
+    else:
+        guides = get_linked()
+
+    return [guide for guide in guides if guide.unlink()]
+
+def get_linked():
+    """get_linked()
+    Get all symmetry linked guides in scene
+
+    :rtype:                 list
+    :returns:               List of guides
+    """
+
+    plugs = cmds.ls("*%s.%s" % (Guide.SUFFIX, Guide.SYMMETRY_ATTR)) or []
+    return [validate(plug.split(".")[0]) for plug in plugs]
+
+# Keys of get_state() and set_state()
+STATE_KEYS = ["positions", "up_positions", "axes", "offsets", "flips", "debug"]
+
+def _array(values, dtype=float):
+    """
+    Numpy array of values when numpy is available
+    """
+
+    if solver.available():
+        return solver.require().array(values, dtype=dtype)
+    return values
+
+def _rows(values, size):
+    """
+    Split a flat list of values into rows of size
+    """
+
+    return [values[index:index + size] for index in range(0, len(values), size)]
+
+def _state_nodes(guides):
+    """
+    Guide node names for state functions, raising for missing guides
+    """
+
+    if not guides:
+        return GuideSet().names()
+
+    nodes = [str(guide) for guide in guides]
+    missing = set(nodes) - set(cmds.ls(nodes) or [])
+    if missing:
+        raise ValueError("Guides do not exist: %s" % ", ".join(sorted(missing)))
+    return nodes
+
+@metrics.timed("control.guide.get_state")
+@trace.traced("control.guide.get_state")
+def get_state(guides=[]):
+    """get_state(guides=[])
+    Read the worldspace positions, up positions, axes, offsets, flips
+    and debug state of many guides at once. Guides are read by name
+    without being reinitialised, with two xform calls and one plug
+    read pass for all guides.
+
+    :param      guides:     Guides, defaults to all guides
+    :type       guides:     list
+    :returns:               Dict of STATE_KEYS and a 'guides' list. Values
+                            are numpy arrays when numpy is available.
+                            Axes are aim orients, eg. 'xyz'. Debug is the
+                            guide's own flag, the scene wide flag is
+                            display.get("debug").
+    :rtype:                 dict
+    :raises:                ValueError
+
+    **Example**:
+
+    >>> state = get_state(["L_arm_0_gde", "L_arm_1_gde"])
+    >>> state["positions"]
+    # Result: array([[ 1.,  5.,  0.], [ 3.,  5.,  0.]]) #
+    >>> state["axes"]
+    # Result: ['xyz', 'xyz'] #
+    """
+
+    nodes = _state_nodes(guides)
+    orders = list(Guide.AIM_ORIENT)
+
+    positions = []
+    up_positions = []
+    axes = []
+    offsets = []
+    flips = []
+    debug = []
+    if nodes:
+        ups = [libName.update(node, suffix=Up.SUFFIX) for node in nodes]
+        positions = _rows(cmds.xform(nodes, q=True, ws=True, t=True), 3)
+        up_positions = _rows(cmds.xform(ups, q=True, ws=True, t=True), 3)
+
+        attrs = ["aimOrient", "offsetOrientX", "offsetOrientY", "offsetOrientZ", "aimFlip", "debug"]
+        values = libAttr.get_many(["%s.%s" % (node, attr) for node in nodes for attr in attrs])
+        for row in _rows(values, len(attrs)):
+            axes.append(orders[int(row[0])])
+            offsets.append(row[1:4])
+            flips.append(bool(row[4]))
+            debug.append(bool(row[5]))
+
+    return {"guides": nodes,
+            "positions": _array(positions),
+            "up_positions": _array(up_positions),
+            "axes": axes,
+            "offsets": _array(offsets),
+            "flips": _array(flips, bool),
+            "debug": _array(debug, bool)}
+
+@metrics.timed("control.guide.set_state")
+@trace.traced("control.guide.set_state")
+@libScene.bulk()
+def set_state(guides, positions=None, up_positions=None, axes=None,
+              offsets=None, flips=None, debug=None):
+    """set_state(guides, positions=None, up_positions=None, axes=None, offsets=None, flips=None, debug=None)
+    Write state to many guides at once, see get_state(). Every
+    given array must have one entry per guide, None skips a key.
+    Positions are worldspace and set parents first.
+
+    :param      guides:         Guides
+    :param      positions:      Worldspace positions, shape (n, 3)
+    :param      up_positions:   Worldspace up positions, shape (n, 3)
+    :param      axes:           Aim orients, eg. 'yzx', or
+                                (primary, secondary) pairs
+    :param      offsets:        Offset orients, shape (n, 3)
+    :param      flips:          Aim flips
+    :param      debug:          Debug display
+    :type       guides:         list
+    :raises:                    ValueError
+
+    **Example**:
+
+    >>> state = get_state()
+    >>> state["positions"][:, 1] += 2.0
+    >>> set_state(**state)
+    """
 
+    nodes = _state_nodes(guides)
+
+    arrays = dict(positions=positions, up_positions=up_positions, axes=axes,
+                  offsets=offsets, flips=flips, debug=debug)
+    for key, values in arrays.items():
+        if values is not None and len(values) != len(nodes):
+            raise ValueError("Expected %s %s, got %s" % (len(nodes), key, len(values)))
+
+    if axes is not None:
+        indices = dict((order, index) for index, order in enumerate(Guide.AIM_ORIENT))
+        try:
+            axes = [indices[axis if isinstance(axis, basestring) else solver.aim_orient(*axis)]
+                    for axis in axes]
+        except KeyError as e:
+            raise ValueError("Invalid aim orient: %s" % e)
+
+    if positions is not None:
+
+        # Parents first, setting a parent moves its children
+        depth = dict((node.split("|")[-1], node.count("|")) for node in cmds.ls(nodes, long=True))
+        for index in sorted(range(len(nodes)), key=lambda i: depth[nodes[i]]):
+            cmds.xform(nodes[index], ws=True, t=list(positions[index]))
+
+    if up_positions is not None:
+        for node, position in zip(nodes, up_positions):
+            cmds.xform(libName.update(node, suffix=Up.SUFFIX), ws=True, t=list(position))
+
+    for index, node in enumerate(nodes):
+        if axes is not None:
+            cmds.setAttr("%s.aimOrient" % node, axes[index])
+        if offsets is not None:
+            for axis, value in zip("XYZ", offsets[index]):
+                cmds.setAttr("%s.offsetOrient%s" % (node, axis), float(value))
+        if flips is not None:
+            cmds.setAttr("%s.aimFlip" % node, bool(flips[index]))
+        if debug is not None:
+            cmds.setAttr("%s.debug" % node, bool(debug[index]))
+
+@metrics.timed("control.guide.reinit")
+@trace.traced("control.guide.reinit", guide=0)
 def reinit(guide):
     """reinit(guide)
     Reinitialise a guide. This simply converts args to a Guide model object
@@ -108,6 +565,9 @@ def reinit(guide):
     guide = validate(guide)
     return guide.reinit()
 
+@metrics.timed("control.guide.set_parent")
+@trace.traced("control.guide.set_parent", guide=0)
+@libScene.bulk()
 def set_parent(child, parent):
     """set_parent(child, parent)
     Set child guides parent.
@@ -129,6 +589,9 @@ def set_parent(child, parent):
     parent = validate(parent)
     return child.set_parent(parent)
 
+@metrics.timed("control.guide.add_child")
+@trace.traced("control.guide.add_child", guide=0)
+@libScene.bulk()
 def add_child(parent, child):
     """add_child(parent, child)
     Add a child guide to parent guide
@@ -150,6 +613,7 @@ def add_child(parent, child):
     parent = validate(parent)
     return parent.add_child(child)
 
+@metrics.timed("control.guide.has_parent")
 def has_parent(child, parent):
     """has_parent(child, parent)
     Does the child have parent anywhere in it's hierarchy?
@@ -171,6 +635,7 @@ def has_parent(child, parent):
     parent = validate(parent)
     return child.has_parent(parent)
 
+@metrics.timed("control.guide.has_child")
 def has_child(parent, child):
     """has_child(parent, child)
     Is guide an immediate child of parent?
@@ -193,6 +658,7 @@ def has_child(parent, child):
     parent = validate(parent)
     return child.has_parent(parent)
 
+@metrics.timed("control.guide.is_parent")
 def is_parent(parent, child):
     """is_parent(parent, child)
     Is parent guide an immediate parent of the child guide?
@@ -214,6 +680,9 @@ def is_parent(parent, child):
     parent = validate(parent)
     return child.is_parent(parent)
 
+@metrics.timed("control.guide.remove")
+@trace.traced("control.guide.remove", guide=0)
+@libScene.bulk()
 def remove(guide):
     """remove(guide)
     Delete the guide from the scene
@@ -229,11 +698,11 @@ def remove(guide):
     """
 
     guide = validate(guide)
-
-    cmds.undoInfo(openChunk=True)
     guide.remove()
-    cmds.undoInfo(closeChunk=True)
 
+@metrics.timed("control.guide.remove_parent")
+@trace.traced("control.guide.remove_parent", guide=0)
+@libScene.bulk()
 def remove_parent(guide):
     """remove_parent(guide)
     Remove guides parent if available
@@ -251,12 +720,28 @@ def remove_parent(guide):
     guide = validate(guide)
     guide.remove_parent()
 
-def compile():
-    """
+# Compile orientation sources, see compile()
+COMPILE_MODES = ["constraint", "solver", "verify"]
+
+@metrics.timed("control.guide.compile")
+@trace.traced("control.guide.compile", mode=0)
+@libScene.bulk()
+def compile(mode=None):
+    """compile(mode=None)
     Compile all guides into joints.
 
+    Orientations come from one of the COMPILE_MODES:
+
+        constraint: Read from each guide's evaluated aim network
+        solver:     Solve all at once from a snapshot, requires numpy
+        verify:     Solve all at once and log guides whose aim
+                    network disagrees, see verify()
+
+    :param      mode:       Compile mode, defaults to 'constraint'
+    :type       mode:       str, None
     :returns:               Tuple of compiled joints
     :rtype:                 tuple
+    :raises:                ValueError
 
     **Example**:
 
@@ -266,30 +751,102 @@ def compile():
     # Result ("C_spine_0_jnt", ) #
     """
 
-    guides = get_guides()
+    return jobs.Job("control.guide.compile", _compile_steps, (mode, )).run()
 
-    # Create hierarchy
-    hierarchy = {}
-    for guide in guides:
-        hierarchy[guide] = guide.children
+def _compile_steps(job, mode=None):
+    """
+    compile() one guide at a time. Cancelling deletes compiled joints
+    and keeps the guides, symmetry links stay baked.
+    """
+
+    if mode is None:
+        mode = "constraint"
+
+    if mode not in COMPILE_MODES:
+        raise ValueError("Unknown compile mode '%s', expected one of: %s" % (mode, COMPILE_MODES))
+
+    # Bake symmetry links
+    unlink()
+
+    tree = libUtil.Hierarchy.fetch()
+    guides = list(tree.guides())
+
+    job.total += len(guides)
+
+    # Solve orientations before any joints are made
+    orientations = {}
+    if mode != "constraint":
+        skeleton = solver.solve(_solver_data(guides, tree))
+        orientations = dict(zip(skeleton["guides"], skeleton["orients"]))
+
+        if mode == "verify":
+            for node, angle in sorted(verify(guides, skeleton=skeleton).items()):
+                logger.warning("Solved orientation of '%s' is off by %0.4f degrees", node, angle)
 
     # Create joints
     joints = {}
-    for guide in hierarchy:
-        joint = guide.compile()
-        joints[guide] = joint
+    try:
+        for guide in guides:
+            joint = guide.compile(orientation=orientations.get(guide.node))
+            joints[guide.node] = joint
+            yield
+
+    except GeneratorExit:
+        created = cmds.ls(joints.values())
+        if created:
+            cmds.delete(created)
+        raise
 
-    # Create joint hierarchy
-    for guide in joints:
-        for child in hierarchy[guide]:
-            cmds.parent(joints[child], joints[guide])
+    # Create joint hierarchy and remove guides after the last yield,
+    # so a cancel never follows the commit
+    for node in tree:
+        children = [joints[child] for child in tree.children(node)]
+        if children:
+            cmds.parent(children, joints[node])
 
-    # Remove guides
     for guide in guides:
         guide.remove()
 
-    return joints.values()
+    job.result = joints.values()
+
+@metrics.timed("control.guide.verify")
+@trace.traced("control.guide.verify")
+def verify(guides=[], tolerance=1e-3, skeleton=None):
+    """verify(guides=[], tolerance=1e-3, skeleton=None)
+    Compare solved orientations against each guide's aim network.
+
+    :param      guides:     Guides to compare, defaults to all guides
+    :param      tolerance:  Largest allowed difference in degrees
+    :param      skeleton:   Solved skeleton of guides, see solver.solve()
+    :type       guides:     list
+    :type       tolerance:  float
+    :type       skeleton:   dict, None
+    :returns:               Guides over tolerance and their difference
+                            in degrees
+    :rtype:                 dict
+    :raises:                ImportError
+
+    **Example**:
+
+    >>> verify()
+    # Result: {} #
+    """
+
+    guides = map(validate, guides) if guides else get_guides()
+    if skeleton is None:
+        skeleton = solver.solve(_solver_data(guides))
+
+    solved = dict(zip(skeleton["guides"], skeleton["orients"]))
+    nodes = [guide.node for guide in guides]
+
+    # Evaluate all aim networks with one query
+    evaluated = _rows(cmds.xform([guide.aim for guide in guides], q=True, ws=True, ro=True), 3) if guides else []
+    angles = solver.angle_between([solved[node] for node in nodes], evaluated)
 
+    return dict((node, float(angle)) for node, angle in zip(nodes, angles)
+                if angle > tolerance)
+
+@metrics.timed("control.guide.decompile")
 def decompile():
     """decompile()
     Convert all joints back to guides
@@ -328,6 +885,7 @@ def decompile():
     #         for child in guide_hierarchy[guide]:
     #             child.set_parent(child)
 
+@metrics.timed("control.guide.get_guides")
 def get_guides():
     """get_guides()
     Get all guides in scene
@@ -336,17 +894,45 @@ def get_guides():
     :returns:               Tuple of guides
     """
 
-    _guides = cmds.ls("*%s" % Guide.SUFFIX, type="joint")
+    return list(GuideSet())
 
-    guides = []
-    for node in _guides:
-        try:
-            guides.append(validate(node))
-        except Exception:
-            logger.error("Failed to validate guide node: '%s'" % node)
+def snapshot(guides):
+    """snapshot(guides)
+    Data snapshots of guides keyed by guide node in guide order,
+    as written by write()
 
-    return guides
+    :param      guides:     Guides
+    :type       guides:     list
+    :rtype:                 dict
+    """
 
+    return OrderedDict((guide.node, guide.snapshot()) for guide in guides)
+
+def _solver_data(guides, tree=None):
+    """
+    Solver input for guides from one get_state() read and one
+    hierarchy fetch, see solver.solve()
+    """
+
+    if tree is None:
+        tree = libUtil.Hierarchy.fetch()
+
+    state = get_state(guides)
+    targets = libAttr.get_enum_names(["%s.aimAt" % node for node in state["guides"]])
+
+    data = OrderedDict()
+    for index, node in enumerate(state["guides"]):
+        data[node] = dict(parent=tree.parent(node) if node in tree else None,
+                          aim_at=targets[index],
+                          aim_flip=bool(state["flips"][index]),
+                          offset=state["offsets"][index],
+                          position=state["positions"][index],
+                          up_position=state["up_positions"][index],
+                          primary=state["axes"][index][0],
+                          secondary=state["axes"][index][1])
+    return data
+
+@metrics.timed("control.guide.exists")
 def exists(guide):
     """exists(guide)
     Does the guide exist?
@@ -366,6 +952,9 @@ def exists(guide):
     except Exception:
         return False
 
+@metrics.timed("control.guide.set_axis")
+@trace.traced("control.guide.set_axis", guide=0)
+@libScene.bulk()
 def set_axis(guide, primary="X", secondary="Y"):
     """set_axis(guide, primary="X", secondary="Y")
     Set the primary and secondary for joint orientation
@@ -380,14 +969,131 @@ def set_axis(guide, primary="X", secondary="Y"):
 
     guide.set_axis(primary, secondary)
 
+@metrics.timed("control.guide.set_debug")
+@trace.traced("control.guide.set_debug")
+@libScene.bulk()
 def set_debug(value):
+    """set_debug(value)
+    Display the local axis of all guides, see set_display(). A guide
+    shows its local axis when its own debug flag or the scene wide
+    debug is on, so turning debug off also clears the flag of every
+    guide that has it set.
+
+    :param      value:      Display local axis
+    :type       value:      bool
+
+    **Example**:
+
+    >>> set_debug(False)
+    >>> get_state()["debug"]
+    # Result: array([False, False], dtype=bool) #
+    """
+
+    display.set(debug=bool(value))
+    if value:
+        return
+
+    nodes = GuideSet().names()
+    flags = libAttr.get_many(["%s.debug" % node for node in nodes]) if nodes else []
+    for node, flag in zip(nodes, flags):
+        if flag:
+            cmds.setAttr("%s.debug" % node, False)
+
+@metrics.timed("control.guide.set_display")
+@trace.traced("control.guide.set_display")
+def set_display(**values):
+    """set_display(**values)
+    Set scene wide guide display. Costs one setAttr per value
+    regardless of guide count.
+
+    :param      debug:                  Display local axis of all guides,
+                                        guides with their own debug flag
+                                        keep showing it, see set_debug()
+    :param      guideScale:             Scale multiplier of all guides
+    :param      upVisibility:           Show Up controls
+    :param      connectorVisibility:    Show connectors
+    :param      lod:                    Level of detail, 'full', 'opaque'
+                                        or 'wireframe'
+    :param      focus:                  Only show Up controls of selected
+                                        guides and connectors near them
+    :param      focusDepth:             Hierarchy steps from the selection
+                                        whose connectors stay visible
+    :param      connectorMode:          'annotation' or 'chain', see
+                                        set_connector_mode()
+    :raises:                            ValueError
+
+    **Example**:
+
+    >>> set_display(guideScale=0.5, connectorVisibility=False)
+    >>> set_display(lod="wireframe", focus=True, focusDepth=2)
     """
+
+    mode = values.pop("connectorMode", None)
+    display.set(**values)
+
+    if mode is not None:
+        set_connector_mode(mode)
+
+@metrics.timed("control.guide.set_connector_mode")
+@trace.traced("control.guide.set_connector_mode", mode=0)
+@libScene.bulk()
+def set_connector_mode(mode):
+    """set_connector_mode(mode)
+    Draw connectors as one annotation per child guide or as one curve
+    per unbranched chain. Aim conditions are kept per connector in both
+    modes. Switching touches every connector once.
+
+    :param      mode:       'annotation' or 'chain'
+    :type       mode:       str
+    :raises:                ValueError
+
+    **Example**:
+
+    >>> set_connector_mode("chain")
+    >>> cmds.ls("*_crv")
+    # Result: [u'L_armChain_0_crv', u'R_armChain_0_crv', u'C_neckChain_0_crv'] #
     """
 
-    guides = get_guides()
-    for g in guides:
-        g.set_debug(value)
+    display.set(connectorMode=mode)
+
+    for guide in get_guides():
+        for connector in guide.connectors:
+            display.connect_connector(connector.node, connector.child.shapes[0])
+
+    libScene.defer(display.update_chains)
+
+@metrics.timed("control.guide.connect_display")
+@trace.traced("control.guide.connect_display")
+@libScene.bulk()
+def connect_display(guides=[]):
+    """connect_display(guides=[])
+    Connect guides created before the display controller existed.
+    Connected guides are left untouched.
+
+    :param      guides:     Guides, defaults to all guides
+    :type       guides:     list
+    :returns:               Guides that were migrated
+    :rtype:                 list
+    """
+
+    guides = map(validate, guides) if guides else get_guides()
+
+    migrated = []
+    for guide in guides:
+        created = display.connect(guide)
+        for connector in guide.connectors:
+            display.connect_connector(connector.node, connector.child.shapes[0])
 
+        if created:
+            guide.add_nondag(created)
+            migrated.append(guide)
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Connected %s guide(s) to display controller", len(migrated))
+    return migrated
+
+@metrics.timed("control.guide.write")
+@trace.traced("control.guide.write", path=0)
 def write(path, guides=[]):
     """write(path, guides=[])
     Write out a json data snapshot of all guides
@@ -410,37 +1116,139 @@ def write(path, guides=[]):
     # Result: True #
     """
 
-    # Get guides input or list from scene
+    return jobs.Job("control.guide.write", _write_steps, (path, guides)).run()
+
+def _write_guides(guides=[]):
+    """
+    Guides to write, parents first. Defaults to all guides.
+    """
+
+    tree = libUtil.Hierarchy.fetch()
+
+    # Get guides input or list from scene, parents first
     if guides:
 
-        guides = []
+        nodes = []
         for node in guides:
-            try:
-                guides.append(validate(node))
-            except Exception:
-                logger.error("Failed to validate guide node: '%s'" % node)
+            if str(node) in tree:
+                nodes.append(str(node))
+            else:
+                logger.error("Failed to validate guide node: '%s'", node)
+
+        guides = [validate(node) for node in sorted(set(nodes), key=tree.index)]
 
     else:
-        guides = get_guides()
+        guides = list(tree.guides())
+
+    return guides
+
+# First bytes of gzip files
+GZIP_MAGIC = "\x1f\x8b"
+
+def _dump(path, data, compress=None):
+    """
+    Encode snapshot data and write it to path atomically. A temp file
+    next to path is written, synced to disk and renamed over path.
+    Doesn't touch the scene, so it is safe on a worker thread.
+    """
+
+    if compress is None:
+        compress = path.endswith(".gz")
+
+    text = json.dumps(data, indent=4)
+
+    temp = "%s.%s.%s.tmp" % (path, os.getpid(), threading.current_thread().ident)
+    try:
+        with open(temp, "wb") as f:
+            if compress:
+                gz = gzip.GzipFile(filename=os.path.basename(path), mode="wb", fileobj=f)
+                try:
+                    gz.write(text)
+                finally:
+                    gz.close()
+            else:
+                f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Windows can't rename over an existing file
+        if os.name == "nt" and os.path.exists(path):
+            os.remove(path)
+        os.rename(temp, path)
+
+    except Exception:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+    return os.path.exists(path)
+
+def _write_steps(job, path, guides=[]):
+    """
+    write() gathering one guide snapshot at a time, the file is only
+    written once all are gathered
+    """
+
+    guides = _write_guides(guides)
 
     # Don't write file to disk of no guides are found
     if not guides:
-        return False
+        job.result = False
+        return
+
+    job.total += len(guides)
 
     # Create a data snapshot dict of guide
-    data = {}
+    data = OrderedDict()
     for guide in guides:
         data[guide.node] = guide.snapshot()
+        yield
 
-    # Write file to disk
-    try:
-        with open(path, 'w') as f:
-            f.write(json.dumps(data, indent=4))
-    except Exception:
-        raise
+    # Write file to disk after the last yield
+    job.result = _dump(path, data)
 
-    return os.path.exists(path)
+@metrics.timed("control.guide.write_async")
+@trace.traced("control.guide.write_async", path=0)
+def write_async(path, guides=[], compress=None, callback=None):
+    """write_async(path, guides=[], compress=None, callback=None)
+    Write a json data snapshot without blocking on disk. Snapshots are
+    gathered on the main thread, encoding, compression and the atomic
+    file write happen on a worker thread.
+
+    :param      path:       Path where the data snapshot file is written to disk
+    :type       path:       str
+    :param      guides:     Guides to write, defaults to all guides
+    :type       guides:     list
+    :param      compress:   Gzip the file, defaults to paths ending in '.gz'
+    :type       compress:   bool, None
+    :param      callback:   Called with the future on the main thread
+                            once the file is written
+    :type       callback:   function, None
+    :returns:               Future of whether path exists on disk
+    :rtype:                 crefor.jobs.Future
+
+    **Example**:
+
+    >>> future = write_async("C:/documents/guides.json.gz")
+    >>> future.result()
+    # Result: True #
+    """
+
+    guides = _write_guides(guides)
+
+    if guides:
+        future = jobs.submit(_dump, path, snapshot(guides), compress)
+    else:
+        future = jobs.Future()
+        future.set_result(False)
 
+    if callback:
+        future.add_done_callback(callback)
+    return future
+
+@metrics.timed("control.guide.read")
+@trace.traced("control.guide.read", path=0)
+@libScene.bulk()
 def read(path, compile_guides=False):
     """read(path, compile_guides=False)
     Load a data snapshot of guides and recreate
@@ -462,45 +1270,87 @@ def read(path, compile_guides=False):
     # Result: ["L_arm_0_jnt"] #
     """
 
+    return jobs.Job("control.guide.read", _read_steps, (path, compile_guides)).run()
+
+def _load(path):
+    """
+    Snapshot data from a json file written by write(), gzipped
+    files are detected by content rather than extension
+    """
+
     data = {}
 
     try:
-        with open(path, "rU") as f:
-            data = json.loads(f.read())
+        with open(path, "rb") as f:
+            compressed = f.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+
+        if compressed:
+            with gzip.open(path, "rb") as f:
+                data = json.loads(f.read())
+        else:
+            with open(path, "rU") as f:
+                data = json.loads(f.read())
     except Exception:
         raise
 
+    return data
+
+def _read_steps(job, path, compile_guides=False, data=None):
+    """
+    read() one guide at a time. Cancelling leaves guides read so far
+    as they are, each one complete.
+    """
+
+    if data is None:
+        data = _load(path)
+
     # Check if all guides exist first
     for guide in data.keys():
         if not cmds.objExists(guide):
             raise NameError("Guide '%s' does not exist." % guide)
 
-    # Setup behaviour
-    for guide, snapshot in data.items():
-        guide = validate(guide)
+    tree = libUtil.Hierarchy.from_snapshot(data)
+    guides = dict((node, validate(node)) for node in tree)
+
+    job.total += len(tree) * 3 - len(tree.roots())
+
+    # Setup behaviour, parents first
+    for node in tree:
+        snapshot = data[node]
+        guide = guides[node]
 
         guide.set_position(*snapshot["position"], worldspace=True)
         guide.set_axis(snapshot["primary"], snapshot["secondary"])
+        yield
 
     # Create hierarchy
-    for guide, snapshot in data.items():
-        guide = validate(guide)
-        for child in snapshot["children"]:
-            child = validate(child)
-            add_child(guide, child)
+    for parent, child in tree.edges():
+        guides[parent].add_child(guides[child])
+        yield
+
+    for node in tree:
+        snapshot = data[node]
+        guide = guides[node]
 
         guide.up.set_position(snapshot["up_position"], worldspace=True)
 
         guide.aim_flip(snapshot["aim_flip"])
         guide.aim_at(snapshot["aim_at"])
         guide.set_offset(*snapshot["offset"])
+        yield
 
     # Compile into joints
     if compile_guides:
-        compile()
-
-    return 
-
+        steps = _compile_steps(job)
+        try:
+            for _ in steps:
+                yield
+        finally:
+            steps.close()
+
+@metrics.timed("control.guide.rebuild")
+@trace.traced("control.guide.rebuild", path=0)
+@libScene.bulk()
 def rebuild(path, compile_guides=False):
     """
     Rebuild all guides from a snapshot
@@ -522,23 +1372,315 @@ def rebuild(path, compile_guides=False):
     # Result: ["L_arm_0_jnt"] #
     """
 
-    cmds.undoInfo(openChunk=True)
+    return jobs.Job("control.guide.rebuild", _rebuild_steps, (path, compile_guides)).run()
 
-    data = {}
+def _rebuild_steps(job, path, compile_guides=False):
+    """
+    rebuild() one guide at a time, removing created guides on cancel
+    """
+
+    data = _load(path)
+    job.total += len(data)
 
+    created = []
+    steps = None
     try:
-        with open(path, "rU") as f:
-            data = json.loads(f.read())
-    except Exception:
+        for guide in data.keys():
+            created.append(create(*libName.decompile(guide, 3)))
+            yield
+
+        steps = _read_steps(job, path, compile_guides, data=data)
+        for _ in steps:
+            yield
+
+    except GeneratorExit:
+        if steps is not None:
+            steps.close()
+        for guide in created:
+            if guide.exists():
+                guide.remove()
         raise
 
-    for guide in data.keys():
-        create(*libName.decompile(guide, 3))
+def rebuild_job(path, compile_guides=False, callback=None):
+    """rebuild_job(path, compile_guides=False, callback=None)
+    Start rebuild() as a job running in deferred chunks. Cancelling
+    removes the guides created so far.
+
+    :param      path:       Path of the data snapshot file
+    :type       path:       str
+    :param      callback:   Called with the job after every chunk
+    :type       callback:   function, None
+    :rtype:                 crefor.jobs.Job
+
+    **Example**:
+
+    >>> job = rebuild_job("C:/documents/guides.json")
+    >>> job.progress()
+    # Result: 0.25 #
+    >>> job.cancel()
+    """
+
+    return jobs.Job("control.guide.rebuild",
+                    _rebuild_steps,
+                    (path, compile_guides),
+                    callback=callback).start()
+
+def read_job(path, compile_guides=False, callback=None):
+    """read_job(path, compile_guides=False, callback=None)
+    Start read() as a job running in deferred chunks. Cancelling keeps
+    guides read so far.
+
+    :rtype:                 crefor.jobs.Job
+    """
+
+    return jobs.Job("control.guide.read",
+                    _read_steps,
+                    (path, compile_guides),
+                    callback=callback).start()
+
+def compile_job(mode=None, callback=None):
+    """compile_job(mode=None, callback=None)
+    Start compile() as a job running in deferred chunks. Cancelling
+    deletes joints compiled so far and keeps all guides.
+
+    :rtype:                 crefor.jobs.Job
+    """
+
+    return jobs.Job("control.guide.compile",
+                    _compile_steps,
+                    (mode, ),
+                    callback=callback).start()
+
+def duplicate_job(guide, hierarchy=True, callback=None):
+    """duplicate_job(guide, hierarchy=True, callback=None)
+    Start duplicate() as a job running in deferred chunks. Cancelling
+    removes the duplicates created so far.
+
+    :rtype:                 crefor.jobs.Job
+    """
+
+    return jobs.Job("control.guide.duplicate",
+                    _duplicate_steps,
+                    (guide, hierarchy),
+                    callback=callback).start()
+
+def write_job(path, guides=[], callback=None):
+    """write_job(path, guides=[], callback=None)
+    Start write() as a job running in deferred chunks. Nothing is
+    written to disk when cancelled.
+
+    :rtype:                 crefor.jobs.Job
+    """
+
+    return jobs.Job("control.guide.write",
+                    _write_steps,
+                    (path, guides),
+                    callback=callback).start()
+
+# Suffixes of utility nodes crefor creates on behalf of guides
+OWNED_SUFFIXES = ["setup", "aim", "clh", "cond", "pma", "up", "cnc", "geo"]
+
+def _node_stats(nodes):
+    """
+    Node, connection and deformer counts of a node collection
+    """
+
+    nodes = list(nodes)
+    stats = {"nodes": len(nodes), "connections": 0, "deformers": 0, "types": {}}
+    if not nodes:
+        return stats
+
+    typed = cmds.ls(nodes, showType=True) or []
+    for node_type in typed[1::2]:
+        stats["types"][node_type] = stats["types"].get(node_type, 0) + 1
+
+    plugs = cmds.listConnections(nodes, connections=True, plugs=True) or []
+    stats["connections"] = len(set(frozenset(pair) for pair in zip(plugs[::2], plugs[1::2])))
+    stats["deformers"] = len(cmds.ls(nodes, type="geometryFilter") or [])
+
+    return stats
+
+def _legacy_orphans(guides, owned):
+    """
+    Untagged crefor nodes from older scenes that no guide owns. Only
+    nodes named after an existing guide count, eg. 'L_armLocal_0_cond'
+    for 'L_arm_0_gde', names alone are never enough.
+    """
+
+    descriptions = {}
+    for guide in guides:
+        position, description, index = libName.decompile(str(guide), 3)
+        descriptions.setdefault((position, index), []).append(description)
+
+    if not descriptions:
+        return []
+
+    orphans = []
+    for node in cmds.ls(["*_*_*_%s" % suffix for suffix in OWNED_SUFFIXES]) or []:
+        if node in owned or node in display.SHARED_NODES or not libName.is_valid(node):
+            continue
+        position, description, index, _ = libName.decompile(node)
+        for name in descriptions.get((position, index), []):
+            rest = description[len(name):]
+            if description.startswith(name) and (not rest or rest[0].isupper()):
+                orphans.append(node)
+                break
+
+    return sorted(orphans)
+
+@metrics.timed("control.guide.report")
+@trace.traced("control.guide.report")
+def report(guides=[]):
+    """report(guides=[])
+    Dependency graph cost of guides. Counts the nodes, connections,
+    deformers and shaders each guide owns, per node type, along with
+    scene totals and orphaned crefor nodes that no guide owns. User
+    nodes sharing crefor suffixes are not counted as orphans.
+
+    :param      guides:     Guides to report, defaults to all guides
+    :type       guides:     list
+    :rtype:                 dict
+    :returns:               {"guides": {guide: stats}, "total": stats,
+                            "orphans": stats}
+
+    **Example**:
+
+    >>> report()["guides"]["C_spine_0_gde"]["nodes"]
+    # Result: 41 #
+    """
+
+    all_guides = get_guides()
+    guides = [validate(g) for g in guides] if guides else all_guides
+
+    owned = {}
+    for guide in all_guides:
+        owned[guide.node] = guide.owned_nodes()
+
+    data = {"guides": {}}
+    all_shaders = set()
+    for guide in guides:
+        if guide.node not in owned:
+            owned[guide.node] = guide.owned_nodes()
+
+        shaders = set([guide.shader.node] + [shader.node for shader in guide.up.shaders])
+        all_shaders.update(shaders)
+
+        stats = _node_stats(owned[guide.node])
+        stats["shaders"] = len(shaders)
+        data["guides"][guide.node] = stats
+
+    total = set()
+    for guide in guides:
+        total.update(owned[guide.node])
+    data["total"] = _node_stats(total)
+    data["total"]["shaders"] = len(all_shaders)
+
+    # Orphans are tagged nodes whose guide is gone and untagged
+    # leftovers named after a guide, see sweep()
+    scene_owned = set()
+    for nodes in owned.values():
+        scene_owned.update(nodes)
+
+    orphans = sorted(set(get_orphans()) | set(_legacy_orphans(all_guides, scene_owned)))
+
+    data["orphans"] = _node_stats(orphans)
+    data["orphans"]["shaders"] = 0
+    data["orphans"]["names"] = orphans
+
+    return data
+
+@metrics.timed("control.guide.write_report")
+def write_report(path, data=None):
+    """write_report(path, data=None)
+    Write a guide cost report to disk. Paths ending in '.csv' are
+    written as one row per guide with a column per node type,
+    anything else is written as json.
+
+    :param      path:       Report file path
+    :param      data:       Report from report(), defaults to all guides
+    :type       path:       str
+    :type       data:       dict, None
+    :rtype:                 bool
+    :returns:               If path exists on disk
+
+    **Example**:
+
+    >>> write_report("C:/documents/spider_cost.csv")
+    # Result: True #
+    """
+
+    if data is None:
+        data = report()
+
+    if not path.lower().endswith(".csv"):
+        with open(path, "w") as f:
+            f.write(json.dumps(data, indent=4, sort_keys=True))
+        return os.path.exists(path)
+
+    rows = sorted(data["guides"].items())
+    rows.append(("total", data["total"]))
+    rows.append(("orphans", data["orphans"]))
+
+    types = set()
+    for _, stats in rows:
+        types.update(stats["types"])
+    types = sorted(types)
+
+    columns = ["nodes", "connections", "deformers", "shaders"]
+    with open(path, "wb") as f:
+        writer = csv.writer(f)
+        writer.writerow(["guide"] + columns + types)
+        for name, stats in rows:
+            writer.writerow([name] +
+                            [stats[column] for column in columns] +
+                            [stats["types"].get(node_type, 0) for node_type in types])
+
+    return os.path.exists(path)
+
+@metrics.timed("control.guide.sweep")
+@trace.traced("control.guide.sweep")
+@libScene.bulk()
+def sweep(legacy=False, dry_run=None):
+    """sweep(legacy=False, dry_run=None)
+    Delete every crefor utility node whose owning guide no longer
+    exists, in a single delete. Nodes are found through their owner
+    tag, see set_owner().
+
+    :param      legacy:     Also include untagged nodes from older scenes
+                            named after an existing guide but not owned
+                            by it
+    :param      dry_run:    Only return the orphans, defaults to True
+                            for legacy sweeps
+    :type       legacy:     bool
+    :type       dry_run:    bool, None
+    :rtype:                 list
+    :returns:               Orphaned nodes
+
+    **Example**:
+
+    >>> sweep()
+    # Result: [u'L_armLocal_0_cond', u'L_armCustom_0_pma'] #
+    """
+
+    if dry_run is None:
+        dry_run = legacy
+
+    orphans = set(get_orphans())
+    if legacy:
+        guides = get_guides()
+        owned = set()
+        for guide in guides:
+            owned.update(guide.owned_nodes())
+        orphans.update(_legacy_orphans(guides, owned))
 
-    read(path, compile_guides=compile_guides)
+    orphans = cmds.ls(sorted(orphans)) or []
+    if orphans and not dry_run:
+        cmds.delete(orphans)
 
-    cmds.undoInfo(closeChunk=True)
+    logger.info("Swept %s orphaned node(s)", len(orphans))
+    return orphans
 
+@metrics.timed("control.guide.validate")
 def validate(guide):
     """
     Reinit a guide
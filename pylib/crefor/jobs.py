@@ -0,0 +1,451 @@
+#!/usr/bin/env python
+
+"""
+Cooperative jobs for long control operations. A job wraps a generator
+that yields after each unit of work, usually one guide. Started jobs
+run in short chunks through Maya's deferred evaluation so the UI stays
+responsive, report progress through callbacks and can be cancelled
+between chunks. Cancelling closes the generator, letting the operation
+roll back what it has done so far.
+
+Each chunk of a started job is its own undo step, no undo chunk is
+left open while Maya is idle. Undoing while a job runs cancels it, so
+the operation rolls back the rest instead of resuming on top of the
+undone chunk.
+
+Work that never touches the scene, like encoding and writing files,
+can run on a worker thread with submit() instead.
+
+**Example**:
+
+>>> from crefor import api
+>>> def progress(job):
+...     print "%s/%s guides, eta %s" % (job.done, job.total, job.eta)
+>>> job = api.rebuild_job("/tmp/spider.json", callback=progress)
+>>> job.cancel()
+"""
+
+import sys
+import time
+import threading
+from maya import cmds, utils
+
+from crefor.lib import libScene
+from crefor import log, metrics
+
+logger = log.get_logger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+# Job running in deferred chunks, only one at a time
+_CURRENT = None
+
+def current():
+    """current()
+    The job currently running in deferred chunks, None if idle
+    """
+
+    if _CURRENT is not None and not _CURRENT.is_finished():
+        return _CURRENT
+    return None
+
+class Job(object):
+    """
+    Resumable operation split into chunks.
+
+    :param      name:       Job name, eg. 'control.guide.rebuild'
+    :type       name:       str
+    :param      steps:      Generator function called with the job and
+                            args, yielding once per unit of work. It sets
+                            job.total and job.result as it goes. Work
+                            that cannot be rolled back belongs after
+                            the last yield.
+    :type       steps:      function
+    :param      args:       Positional arguments for steps
+    :type       args:       tuple
+    :param      kwargs:     Keyword arguments for steps
+    :type       kwargs:     dict, None
+    :param      budget:     Seconds of work per chunk before handing
+                            control back to Maya
+    :type       budget:     float
+    :param      callback:   Called with the job after every chunk and
+                            once finished
+    :type       callback:   function, None
+
+    **Example**:
+
+    >>> def steps(job, count):
+    ...     job.total = count
+    ...     for index in range(count):
+    ...         create("C", "spine", index)
+    ...         yield
+    >>> Job("spine", steps, (100, )).start()
+    # Result: <Job 'spine' 0/100 running> #
+    """
+
+    def __init__(self, name, steps, args=(), kwargs=None, budget=0.05, callback=None):
+
+        self.name = name
+        self.budget = budget
+
+        self.total = 0
+        self.done = 0
+        self.status = PENDING
+        self.result = None
+        self.error = None
+
+        self.__steps = steps
+        self.__args = args
+        self.__kwargs = kwargs or {}
+        self.__callbacks = [callback] if callback else []
+        self.__generator = None
+        self.__start = None
+        self.__cancelled = False
+        self.__deferred = False
+        self.__undo_job = None
+
+    def __repr__(self):
+        return "<%s '%s' %s/%s %s>" % (self.__class__.__name__,
+                                       self.name,
+                                       self.done,
+                                       self.total,
+                                       self.status)
+
+    @property
+    def elapsed(self):
+        """
+        Seconds since the job started running
+        """
+
+        return time.time() - self.__start if self.__start else 0.0
+
+    @property
+    def eta(self):
+        """
+        Estimated seconds left from the rate so far, None until known
+        """
+
+        if not self.done or not self.total:
+            return None
+        return max(0.0, self.elapsed * (self.total - self.done) / float(self.done))
+
+    def progress(self):
+        """progress()
+        Fraction of work done, 0.0 to 1.0
+        """
+
+        if self.status == DONE:
+            return 1.0
+        if not self.total:
+            return 0.0
+        return min(1.0, self.done / float(self.total))
+
+    def is_finished(self):
+        return self.status in (DONE, CANCELLED, FAILED)
+
+    def add_callback(self, callback):
+        """add_callback(callback)
+        Call callback with the job after every chunk and once finished
+        """
+
+        self.__callbacks.append(callback)
+
+    def start(self):
+        """start()
+        Run in deferred chunks while Maya is idle, each chunk recorded
+        as one undo step. Without an idle loop in batch mode the job
+        runs to completion right away.
+
+        :returns:       Job
+        :rtype:         Job
+        :raises:        RuntimeError
+        """
+
+        global _CURRENT
+
+        running = current()
+        if running is not None and running is not self:
+            raise RuntimeError("Cannot start '%s' while '%s' is running" % (self.name, running.name))
+
+        if cmds.about(batch=True):
+            self.run()
+            return self
+
+        self.__begin()
+        self.__deferred = True
+        _CURRENT = self
+
+        self.__undo_job = cmds.scriptJob(event=["Undo", self.__undone])
+
+        self.__schedule()
+        return self
+
+    def run(self):
+        """run()
+        Run remaining chunks now, blocking until finished
+
+        :returns:       Job result
+        """
+
+        self.__begin()
+        while not self.is_finished():
+            self.__chunk(None)
+
+        if self.status == FAILED:
+            raise self.error[0], self.error[1], self.error[2]
+        return self.result
+
+    def cancel(self):
+        """cancel()
+        Cancel the job after its current unit of work. The operation
+        rolls back between units, so the scene is never left part way
+        through one.
+        """
+
+        if self.is_finished():
+            return
+
+        if self.status == PENDING:
+            self.__finish(CANCELLED)
+        else:
+            self.__cancelled = True
+
+    def __begin(self):
+        if self.status == PENDING:
+            self.status = RUNNING
+            self.__start = time.time()
+            self.__generator = self.__steps(self, *self.__args, **self.__kwargs)
+
+    def __schedule(self):
+        cmds.evalDeferred(self.__tick, lowestPriority=True)
+
+    def __undone(self):
+        """
+        Undo while running, roll back instead of resuming
+        """
+
+        if not self.is_finished():
+            logger.warning("Job '%s' cancelled by undo", self.name)
+            self.cancel()
+
+    def __tick(self):
+        """
+        Deferred chunk, rescheduling itself until finished
+        """
+
+        if self.is_finished():
+            return
+
+        try:
+            self.__chunk(self.budget)
+        except Exception:
+            logger.exception("Job '%s' failed", self.name)
+            return
+
+        if not self.is_finished():
+            self.__schedule()
+
+    def __chunk(self, budget):
+        """
+        Run units of work until the budget is spent, all of them
+        without a budget, stopping early once cancelled. The chunk,
+        including any roll back, is one undo step.
+        """
+
+        finished = False
+        deadline = time.time() + budget if budget else None
+
+        try:
+            with libScene.bulk(selection=False):
+                try:
+                    while not self.__cancelled:
+                        next(self.__generator)
+                        self.done += 1
+                        if deadline is not None and time.time() >= deadline:
+                            break
+                except StopIteration:
+                    finished = True
+
+                # Let the operation roll back
+                if self.__cancelled and not finished:
+                    self.__generator.close()
+
+        except Exception:
+            self.error = sys.exc_info()
+            self.__finish(FAILED)
+            raise
+
+        if finished:
+            self.__finish(DONE)
+        elif self.__cancelled:
+            self.__finish(CANCELLED)
+        else:
+            self.__notify()
+
+    def __finish(self, status):
+        self.status = status
+        self.__generator = None
+
+        if self.__undo_job is not None:
+            if cmds.scriptJob(exists=self.__undo_job):
+                cmds.scriptJob(kill=self.__undo_job, force=True)
+            self.__undo_job = None
+
+        # Blocking runs are timed by the operation itself
+        if self.__deferred:
+            metrics.record("%s.job" % self.name, self.elapsed)
+        logger.debug("Job '%s' %s after %0.2fs: %s/%s", self.name, status, self.elapsed, self.done, self.total)
+
+        self.__notify()
+
+    def __notify(self):
+        for callback in self.__callbacks:
+            try:
+                callback(self)
+            except Exception:
+                logger.exception("Job '%s' callback failed", self.name)
+
+class Future(object):
+    """
+    Result of work running on a worker thread. Done callbacks are
+    called with the future on Maya's main thread. Batch mode has no
+    idle loop to defer to, so there they run on the next result() or
+    exception() call instead.
+
+    **Example**:
+
+    >>> future = submit(json.dumps, data)
+    >>> future.add_done_callback(lambda future: future.result())
+    >>> future.result(timeout=10)
+    """
+
+    def __init__(self):
+        self.__event = threading.Event()
+        self.__lock = threading.Lock()
+        self.__callbacks = []
+        self.__pending = []
+        self.__result = None
+        self.__error = None
+
+        # Queried here, the scene is off limits to workers
+        self.__batch = cmds.about(batch=True)
+
+    def __repr__(self):
+        state = "pending"
+        if self.done():
+            state = "failed" if self.__error else "done"
+        return "<%s %s>" % (self.__class__.__name__, state)
+
+    def done(self):
+        return self.__event.is_set()
+
+    def result(self, timeout=None):
+        """result(timeout=None)
+        Wait for and return the result, raising any error of the work
+
+        :param      timeout:    Seconds to wait, None waits forever
+        :type       timeout:    float, None
+        :raises:                RuntimeError on timeout
+        """
+
+        if not self.__event.wait(timeout) and not self.done():
+            raise RuntimeError("Timed out waiting for result")
+        self.__run_pending()
+
+        if self.__error:
+            raise self.__error[0], self.__error[1], self.__error[2]
+        return self.__result
+
+    def exception(self, timeout=None):
+        """exception(timeout=None)
+        Wait for the work and return its error, None on success
+        """
+
+        if not self.__event.wait(timeout) and not self.done():
+            raise RuntimeError("Timed out waiting for result")
+        self.__run_pending()
+
+        return self.__error[1] if self.__error else None
+
+    def add_done_callback(self, callback):
+        """add_done_callback(callback)
+        Call callback with the future on the main thread once done,
+        straight away if already done
+        """
+
+        with self.__lock:
+            if not self.done():
+                self.__callbacks.append(callback)
+                return
+        self.__dispatch(callback)
+
+        # Called from the main thread
+        if self.__batch:
+            self.__run_pending()
+
+    def set_result(self, result):
+        self.__result = result
+        self.__finish()
+
+    def set_exception(self, exc_info):
+        self.__error = exc_info
+        self.__finish()
+
+    def __finish(self):
+        with self.__lock:
+            self.__event.set()
+            callbacks, self.__callbacks = self.__callbacks, []
+
+        for callback in callbacks:
+            self.__dispatch(callback)
+
+    def __dispatch(self, callback):
+        if self.__batch:
+            with self.__lock:
+                self.__pending.append(callback)
+        else:
+            utils.executeDeferred(self.__call, callback)
+
+    def __run_pending(self):
+        with self.__lock:
+            pending, self.__pending = self.__pending, []
+
+        for callback in pending:
+            self.__call(callback)
+
+    def __call(self, callback):
+        try:
+            callback(self)
+        except Exception:
+            logger.exception("Future callback failed")
+
+def submit(func, *args, **kwargs):
+    """submit(func, *args, **kwargs)
+    Run func on a worker thread. It must not touch the Maya scene.
+
+    :returns:       Future of func's return value
+    :rtype:         Future
+
+    **Example**:
+
+    >>> submit(time.sleep, 1).result()
+    """
+
+    future = Future()
+
+    def work():
+        try:
+            future.set_result(func(*args, **kwargs))
+        except Exception:
+            logger.debug("Worker '%s' failed", func.__name__, exc_info=True)
+            future.set_exception(sys.exc_info())
+
+    thread = threading.Thread(target=work, name="crefor.%s" % func.__name__)
+    thread.daemon = True
+    thread.start()
+
+    return future
@@ -5,7 +5,9 @@ General attribute use
 """
 
 from maya import cmds
+from maya.api import OpenMaya
 from copy import deepcopy
+from collections import OrderedDict
 
 class MayaAttribute(object):
     """
@@ -90,3 +92,46 @@ def add(node, name, *args, **kwargs):
 
 def edit(node, name, *args, **kwargs):
     MayaAttribute(node, name, *args, **kwargs).edit()
+
+def _plugs(plugs):
+    """
+    MPlugs of unique plug names from one selection list
+    """
+
+    unique = list(OrderedDict.fromkeys(plugs))
+    selection = OpenMaya.MSelectionList()
+    for plug in unique:
+        selection.add(plug)
+
+    found = dict((plug, selection.getPlug(index)) for index, plug in enumerate(unique))
+    return [found[plug] for plug in plugs]
+
+def get_many(plugs):
+    """get_many(plugs)
+    Read many numeric plugs through one selection list instead of one
+    getAttr each. Bool and enum plugs are read as numbers, angle
+    plugs in radians.
+
+    :param      plugs:      Plugs, eg. ['L_arm_0_gde.aimFlip']
+    :type       plugs:      list
+    :rtype:                 list
+
+    **Example**:
+
+    >>> get_many(["L_arm_0_gde.aimFlip", "L_arm_0_gde.offsetOrientX"])
+    # Result: [0.0, 45.0] #
+    """
+
+    return [plug.asDouble() for plug in _plugs(plugs)]
+
+def get_enum_names(plugs):
+    """get_enum_names(plugs)
+    Current field names of many enum plugs, see get_many()
+
+    :param      plugs:      Enum plugs, eg. ['L_arm_0_gde.aimAt']
+    :type       plugs:      list
+    :rtype:                 list
+    """
+
+    return [OpenMaya.MFnEnumAttribute(plug.attribute()).fieldName(plug.asShort())
+            for plug in _plugs(plugs)]
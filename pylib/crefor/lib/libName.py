@@ -4,21 +4,35 @@
 '''
 
 import re
+from contextlib import contextmanager
 from maya import cmds
-from copy import deepcopy
+from crefor.lib.libPython import memoize
 
 __all__ = ["compile", "update", "decompile"]
 
 # This is not accurate enough. Fix!
 CONVENTION = "^((?!_)[a-zA-Z])_((?!_)[a-zA-Z0-9]+)_(\d+)_((?!_)[a-zA-Z]+)$"
 
+# Precompiled field validators
+_POSITION = re.compile("^((?!_)[a-zA-Z]+)$")
+_DESCRIPTION = re.compile("^((?!_)[a-zA-Z0-9]+)$")
+_INDEX = re.compile("^((?!_)[0-9]+)$")
+_SUFFIX = re.compile("^((?!_)[a-zA-Z0-9]+)$")
+
+# Parsed name cache size
+CACHE_SIZE = 4096
+
+# Active batch reservation table, {(position, description, suffix): set(indices)}
+_RESERVED = None
+
 
 class __Name(object):
     """
     """
 
-    SEP = "_"
+    __slots__ = ("__position", "__description", "__index", "__suffix")
 
+    SEP = "_"
 
     def __init__(self, position, description, index=0, suffix="grp"):
 
@@ -52,16 +66,16 @@ class __Name(object):
         return self.__suffix
 
     def __set_position(self, position):
-        self.__position = self.__validate("^((?!_)[a-zA-Z]+)$", str(position)).upper()
+        self.__position = self.__validate(_POSITION, str(position)).upper()
 
     def __set_description(self, description):
-        self.__description = self.__validate("^((?!_)[a-zA-Z0-9]+)$", str(description))
+        self.__description = self.__validate(_DESCRIPTION, str(description))
 
     def __set_index(self, index):
-        self.__index = self.__validate("^((?!_)[0-9]+)$", str(index))
+        self.__index = str(int(self.__validate(_INDEX, str(index))))
 
     def __set_suffix(self, suffix):
-        self.__suffix = self.__validate("^((?!_)[a-zA-Z0-9]+)$", str(suffix))
+        self.__suffix = self.__validate(_SUFFIX, str(suffix))
 
     position = property(fget=__get_position, fset=__set_position)
     description = property(fget=__get_description, fset=__set_description)
@@ -69,19 +83,19 @@ class __Name(object):
     suffix = property(fget=__get_suffix, fset=__set_suffix)
 
     def __compile(self):
-        return ("%s" % self.SEP).join([self.position,
-                                       self.description,
-                                       str(self.index),
-                                       self.suffix])
+        return self.SEP.join([self.__position,
+                              self.__description,
+                              self.__index,
+                              self.__suffix])
 
     def __validate(self, regex, string):
         """
         """
 
-        try:
-            return re.match(regex, string).group(0)
-        except AttributeError:
+        match = regex.match(string)
+        if match is None:
             raise ValueError("Invalid naming convention: %s" % string)
+        return match.group(0)
 
     def __append_description(self, string):
         """
@@ -100,7 +114,7 @@ class __Name(object):
         """
 
         if position:
-            self.position = position if position else self.position
+            self.position = position
 
         if description:
             self.description = description
@@ -117,7 +131,10 @@ class __Name(object):
         return self
 
     def copy(self):
-        return deepcopy(self)
+        return self.__class__(self.__position,
+                              self.__description,
+                              self.__index,
+                              self.__suffix)
 
     def compile(self):
         return self.__compile()
@@ -129,34 +146,139 @@ class __Name(object):
         return str(self.copy().update(*args, **kwargs))
 
     def generate(self):
-        new = self.copy()
-        while cmds.objExists(new.compile()):
-            new.index += 1
-        return new.compile()
+        return allocate(self.compile())[0]
 
+@memoize(maxsize=CACHE_SIZE)
+def _parse(name):
+    """
+    Validated (position, description, index, suffix) tuple of name
+    """
+
+    return __Name(*name.split(__Name.SEP)).decompile()
+
+@memoize(maxsize=CACHE_SIZE)
 def compile(position, description, index, suffix):
     return __Name(position, description, index, suffix).compile()
 
+@memoize(maxsize=CACHE_SIZE)
 def update(name, **kwargs):
-    return __Name(*name.split(__Name.SEP)).recompile(**kwargs)
+    return __Name(*_parse(name)).recompile(**kwargs)
 
 def decompile(name, depth=None):
-    return __Name(*name.split(__Name.SEP)).decompile(depth)
+    return _parse(name)[:depth]
 
 def generate(name):
-    return __Name(*decompile(name)).generate()
+    return allocate(name)[0]
+
+def _used_indices(position, description, suffix):
+    """
+    Indices already taken in scene for a name family
+    """
+
+    pattern = __Name.SEP.join([position, description, "*", suffix])
+
+    used = set()
+    for node in cmds.ls(pattern) or []:
+        try:
+            name = _parse(node.split("|")[-1])
+        except Exception:
+            continue
+        if (name[0], name[1], name[3]) == (position, description, suffix):
+            used.add(name[2])
+    return used
+
+def allocate(name, count=1):
+    """allocate(name, count=1)
+    Find the next free indices for a name family with a single scene query.
+    Indices are searched upwards starting from the index of the input name.
+    Inside a reservation() block scene queries are cached per family and
+    handed out names stay reserved until the block exits.
+
+    :param      name:       Name to allocate from
+    :type       name:       str
+    :param      count:      Number of names to allocate
+    :type       count:      int
+    :returns:               Free names in ascending index order
+    :rtype:                 list
+
+    **Example**:
+
+    >>> allocate("L_finger_0_gde", count=3)
+    # Result: ['L_finger_4_gde', 'L_finger_5_gde', 'L_finger_6_gde'] #
+    """
+
+    position, description, index, suffix = _parse(name)
+    family = (position, description, suffix)
+
+    if _RESERVED is not None and family in _RESERVED:
+        used = _RESERVED[family]
+    else:
+        used = _used_indices(*family)
+        if _RESERVED is not None:
+            _RESERVED[family] = used
+
+    names = []
+    while len(names) < count:
+        if index not in used:
+            names.append(compile(position, description, index, suffix))
+            if _RESERVED is not None:
+                used.add(index)
+        index += 1
+    return names
+
+@contextmanager
+def reservation():
+    """reservation()
+    Batch scope for allocate() and generate(). Each name family is queried
+    from the scene once and allocated names are never handed out twice,
+    even before their nodes are created. Nested scopes share the outer table.
+
+    **Example**:
+
+    >>> with reservation():
+    ...     a = generate("L_arm_0_gde")
+    ...     b = generate("L_arm_0_gde")
+    >>> a == b
+    # Result: False #
+    """
+
+    global _RESERVED
+
+    if _RESERVED is not None:
+        yield
+        return
+
+    _RESERVED = {}
+    try:
+        yield
+    finally:
+        _RESERVED = None
 
 def is_valid(name):
-    return len(name.split(__Name.SEP)) == 4
+    if len(name.split(__Name.SEP)) != 4:
+        return False
+    try:
+        _parse(name)
+    except (TypeError, ValueError):
+        return False
+    return True
 
 def position(name):
-    return __Name(*name.split(__Name.SEP)).position
+    return _parse(name)[0]
 
 def description(name):
-    return __Name(*name.split(__Name.SEP)).description
+    return _parse(name)[1]
 
 def index(name):
-    return __Name(*name.split(__Name.SEP)).index
+    return _parse(name)[2]
 
 def suffix(name):
-    return __Name(*name.split(__Name.SEP)).suffix
+    return _parse(name)[3]
+
+def cache_clear():
+    """
+    Clear all memoized name lookups
+    """
+
+    for func in [_parse, compile, update]:
+        func.cache_clear()
@@ -6,6 +6,10 @@
 from __future__ import with_statement
 import gc
 import sys
+import types
+import importlib
+from functools import wraps
+from collections import OrderedDict
 
 def flush():
     '''
@@ -33,3 +37,87 @@ def flush():
     print "Flushed %s module(s)" % count
 
     gc.collect()  #force a garbage collection
+
+# Separates positional from keyword arguments in memoize keys
+_KWARGS = object()
+
+def memoize(maxsize=1024):
+    '''
+    Least recently used cache decorator for pure functions with
+    hashable arguments. Exceptions are never cached. The wrapped
+    function gains a cache_clear() method.
+
+    **Example**:
+
+    >>> @memoize(maxsize=256)
+    ... def parse(name):
+    ...     return name.split("_")
+    '''
+
+    def decorator(func):
+        cache = OrderedDict()
+
+        @wraps(func)
+        def inner(*args, **kwargs):
+            key = args
+            if kwargs:
+                key += (_KWARGS,) + tuple(sorted(kwargs.items()))
+
+            try:
+                result = cache.pop(key)
+            except KeyError:
+                result = func(*args, **kwargs)
+                if len(cache) >= maxsize:
+                    cache.popitem(last=False)
+            except TypeError:
+                # Unhashable arguments, skip cache
+                return func(*args, **kwargs)
+
+            cache[key] = result
+            return result
+
+        inner.cache_clear = cache.clear
+        return inner
+
+    return decorator
+
+class LazyModule(types.ModuleType):
+    '''
+    Module whose exported attributes are imported from their source
+    modules on first access and cached.
+    '''
+
+    def __init__(self, module, exports):
+        super(LazyModule, self).__init__(module.__name__, module.__doc__)
+        self.__dict__.update(module.__dict__)
+
+        # Python 2 clears the globals of collected modules
+        self.__module = module
+        self.__exports = dict(exports)
+
+    def __getattr__(self, name):
+        try:
+            source = self.__exports[name]
+        except KeyError:
+            raise AttributeError("'module' object has no attribute '%s'" % name)
+
+        value = getattr(importlib.import_module(source), name)
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(self.__exports))
+
+def lazy_module(name, exports):
+    '''
+    Replace an imported module with a LazyModule. Call at the end of
+    the module body with its exports, {attribute: source module}.
+
+    **Example**:
+
+    >>> lazy_module(__name__, {"create": "crefor.control.guide"})
+    '''
+
+    module = LazyModule(sys.modules[name], exports)
+    sys.modules[name] = module
+    return module
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+
+"""
+Scene state helpers for bulk operations
+"""
+
+from functools import wraps
+from maya import cmds
+
+# Nested bulk scopes, only the outermost scope touches scene state
+_DEPTH = 0
+
+# Calls deferred until the outermost scope exits
+_DEFERRED = []
+
+def defer(func):
+    """defer(func)
+    Call func once when the outermost bulk scope exits, or right away
+    outside of a bulk scope. Deferring the same function again while
+    it is pending does nothing.
+
+    **Example**:
+
+    >>> with bulk():
+    ...     for guide in guides:
+    ...         defer(update_chains)
+    """
+
+    if _DEPTH == 0:
+        return func()
+
+    if func not in _DEFERRED:
+        _DEFERRED.append(func)
+
+class bulk(object):
+    """bulk(undo=True, refresh=False, selection=True)
+    Scope for bulk scene operations, usable as a context manager or a
+    decorator. The outermost scope groups everything into one undo chunk,
+    suspends viewport refresh and restores the selection on exit. Nested
+    scopes do nothing.
+
+    :param      undo:           True records one undo chunk, False turns
+                                undo off for the scope, which is faster
+                                for batch builds that are never undone
+    :type       undo:           bool
+    :param      refresh:        Allow viewport refresh during the scope
+    :type       refresh:        bool
+    :param      selection:      Restore the selection on exit
+    :type       selection:      bool
+
+    **Example**:
+
+    >>> with bulk():
+    ...     for index in range(100):
+    ...         create("C", "spine", index)
+
+    >>> @bulk(undo=False, selection=False)
+    ... def build():
+    ...     pass
+    """
+
+    def __init__(self, undo=True, refresh=False, selection=True):
+
+        self.undo = undo
+        self.refresh = refresh
+        self.selection = selection
+
+        self.__undo_state = None
+        self.__selected = None
+
+    def __call__(self, func):
+
+        @wraps(func)
+        def inner(*args, **kwargs):
+            with self.__class__(undo=self.undo,
+                                refresh=self.refresh,
+                                selection=self.selection):
+                return func(*args, **kwargs)
+        return inner
+
+    def __enter__(self):
+        global _DEPTH
+
+        _DEPTH += 1
+        if _DEPTH > 1:
+            return self
+
+        if self.undo:
+            cmds.undoInfo(openChunk=True)
+        else:
+            self.__undo_state = cmds.undoInfo(q=True, state=True)
+            cmds.undoInfo(stateWithoutFlush=False)
+
+        if self.selection:
+            self.__selected = cmds.ls(sl=True, long=True) or []
+
+        if not self.refresh:
+            cmds.refresh(suspend=True)
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _DEPTH
+
+        _DEPTH -= 1
+        if _DEPTH > 0:
+            return False
+
+        try:
+            pending = list(_DEFERRED)
+            del _DEFERRED[:]
+            if exc_type is None:
+                for func in pending:
+                    func()
+
+            if self.selection:
+                selected = [node for node in self.__selected if cmds.objExists(node)]
+                if selected:
+                    cmds.select(selected, r=True)
+                else:
+                    cmds.select(cl=True)
+
+        finally:
+            if not self.refresh:
+                cmds.refresh(suspend=False)
+
+            if self.__undo_state is None:
+                cmds.undoInfo(closeChunk=True)
+            else:
+                cmds.undoInfo(stateWithoutFlush=self.__undo_state)
+                self.__undo_state = None
+
+        return False
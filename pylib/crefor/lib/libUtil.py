@@ -4,12 +4,226 @@
 Utility methods
 """
 
+from array import array
+from collections import deque
 from maya import cmds
 from crefor.model.guide import Guide
-from crefor import log
+from crefor.model.guideset import is_guide_name
+from crefor import log, solver
 
 logger = log.get_logger(__name__)
 
+class Hierarchy(object):
+    """
+    Snapshot of a guide hierarchy stored as a list of guide nodes and a
+    compact parent index array, -1 for roots. Nodes are kept parents
+    first. Guides are only validated when asked for.
+
+    :param      nodes:      Guide nodes, parents first
+    :type       nodes:      list
+    :param      parents:    Parent index of each node
+    :type       parents:    list
+
+    **Example**:
+
+    >>> tree = Hierarchy.fetch("C_spine_0_gde")
+    >>> list(tree.bfs())
+    # Result: ['C_spine_0_gde', 'C_spine_1_gde', 'L_arm_0_gde', ...] #
+    >>> tree.subtree("L_arm_0_gde").nodes
+    # Result: ['L_arm_0_gde', 'L_arm_1_gde'] #
+    """
+
+    def __init__(self, nodes=[], parents=[]):
+
+        self.nodes = list(nodes)
+        self.parents = array("i", parents)
+
+        self.__index = dict((node, index) for index, node in enumerate(self.nodes))
+        self.__children = [[] for _ in self.nodes]
+        for index, parent in enumerate(self.parents):
+            if parent >= 0:
+                self.__children[parent].append(index)
+
+    @classmethod
+    def fetch(cls, roots=None):
+        """fetch(roots=None)
+        Fetch the hierarchy below roots. All guides take two scene
+        calls, guides below roots three, however many there are.
+
+        :param      roots:      Root guides, defaults to all guides in scene
+        :type       roots:      list, str, Guide, None
+        :rtype:                 Hierarchy
+        :raises:                NameError
+        """
+
+        suffix = "_%s" % Guide.SUFFIX
+
+        if roots is None:
+            paths = cmds.ls("*%s" % suffix, type="joint", long=True) or []
+
+        else:
+            if not isinstance(roots, (list, tuple, set)):
+                roots = [roots]
+            roots = [str(root) for root in roots]
+
+            paths = cmds.ls(roots, long=True) or []
+            found = set(path.split("|")[-1] for path in paths)
+            missing = [root for root in roots if root.split("|")[-1] not in found]
+            if missing:
+                raise NameError("'%s' is not a guide." % missing[0])
+
+            paths.extend(cmds.listRelatives(roots,
+                                            allDescendents=True,
+                                            fullPath=True,
+                                            type="joint") or [])
+
+        # Guides are joints named by convention with the guide only attribute
+        paths = set(path for path in paths if path.endswith(suffix) and is_guide_name(path))
+        plugs = ["%s.aimOrient" % path for path in paths]
+        guides = set(cmds.ls(plugs, objectsOnly=True, long=True) or []) if plugs else set()
+
+        # Parse parents from paths, shallowest first
+        paths = sorted(paths & guides, key=lambda path: (path.count("|"), path))
+
+        index = {}
+        nodes = []
+        parents = []
+        for path in paths:
+            names = path.split("|")
+            parent = -1
+            for name in reversed(names[:-1]):
+                if name in index:
+                    parent = index[name]
+                    break
+            index[names[-1]] = len(nodes)
+            nodes.append(names[-1])
+            parents.append(parent)
+
+        return cls(nodes, parents)
+
+    @classmethod
+    def from_snapshot(cls, data):
+        """from_snapshot(data)
+        Hierarchy of a write() snapshot without touching the scene
+        """
+
+        return cls(*solver.hierarchy(data))
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __contains__(self, node):
+        return str(node) in self.__index
+
+    def __repr__(self):
+        return "<%s %s>" % (self.__class__.__name__, self.nodes)
+
+    def index(self, node):
+        return self.__index[str(node)]
+
+    def parent(self, node):
+        """parent(node)
+        Parent node, None for roots
+        """
+
+        parent = self.parents[self.index(node)]
+        return self.nodes[parent] if parent >= 0 else None
+
+    def children(self, node):
+        return [self.nodes[child] for child in self.__children[self.index(node)]]
+
+    def roots(self):
+        return [node for node, parent in zip(self.nodes, self.parents) if parent < 0]
+
+    def edges(self):
+        """edges()
+        (parent, child) node pairs, parents first
+        """
+
+        for child, parent in enumerate(self.parents):
+            if parent >= 0:
+                yield self.nodes[parent], self.nodes[child]
+
+    def chains(self):
+        """chains()
+        Unbranched chains of nodes. Each chain starts at a root or a
+        branching node and runs until a leaf or the next branch, so
+        every edge belongs to exactly one chain.
+
+        **Example**:
+
+        >>> Hierarchy(["root", "a", "b", "c"], [-1, 0, 0, 1]).chains()
+        # Result: [['root', 'a', 'c'], ['root', 'b']] #
+        """
+
+        chains = []
+        for parent, child in self.edges():
+            index = self.index(parent)
+            if self.parents[index] >= 0 and len(self.__children[index]) == 1:
+                continue
+
+            chain = [parent, child]
+            index = self.index(child)
+            while len(self.__children[index]) == 1:
+                index = self.__children[index][0]
+                chain.append(self.nodes[index])
+            chains.append(chain)
+
+        return chains
+
+    def topological(self):
+        """topological()
+        Nodes with every parent before its children
+        """
+
+        return iter(self.nodes)
+
+    def bfs(self, root=None):
+        """bfs(root=None)
+        Breadth first nodes below and including root, or all roots
+        """
+
+        queue = deque([self.index(root)] if root is not None else
+                      [index for index, parent in enumerate(self.parents) if parent < 0])
+        while queue:
+            index = queue.popleft()
+            yield self.nodes[index]
+            queue.extend(self.__children[index])
+
+    def dfs(self, root=None):
+        """dfs(root=None)
+        Depth first, pre-order nodes below and including root, or all roots
+        """
+
+        stack = [self.index(root)] if root is not None else \
+                [index for index, parent in enumerate(self.parents) if parent < 0]
+        stack.reverse()
+        while stack:
+            index = stack.pop()
+            yield self.nodes[index]
+            stack.extend(reversed(self.__children[index]))
+
+    def subtree(self, root):
+        """subtree(root)
+        Hierarchy below and including root
+        """
+
+        nodes = list(self.dfs(root))
+        index = dict((node, i) for i, node in enumerate(nodes))
+        parents = [-1] + [index[self.parent(node)] for node in nodes[1:]]
+        return self.__class__(nodes, parents)
+
+    def guides(self):
+        """guides()
+        Validated guides, parents first
+        """
+
+        for node in self.nodes:
+            yield Guide.validate(node)
+
 def write_hierarchy(guide):
     """
     Simple hierarchy data structure
@@ -22,38 +236,33 @@ def write_hierarchy(guide):
 
     >>> write_hierarchy("C_spine_0_gde")
     """
-    try:
-        guide = guide.joint
-    except Exception:
-        guide = str(guide)
 
-        if not cmds.objExists(guide):
-            raise NameError("'%s' is not a guide." % guide)
+    tree = Hierarchy.fetch(guide)
+    guides = dict((node, Guide.validate(node)) for node in tree)
 
     data = {}
-    all_guides = cmds.listRelatives(guide, allDescendents=True, type="joint") or []
-    all_guides.insert(0, guide)
-    for guide in all_guides:
-        children = [Guide.validate(c) for c in cmds.listRelatives(guide, children=True, type="joint") or []]
-        guide = Guide.validate(guide)
-
-        data[guide] = children
+    for node in tree:
+        data[guides[node]] = [guides[child] for child in tree.children(node)]
     return data
 
 def write_hierarchy_recursive(guide):
-    guide = Guide.validate(guide)
-    def recur(guide):
-        guide = Guide.validate(guide)
-        hierarchy = {}
-        for child in cmds.listRelatives(guide.joint, children=True, type="joint") or []:
-            child = Guide.validate(child)
-            hierarchy[child] = recur(child)
-        return hierarchy
-    return {guide: recur(guide)}
+    tree = Hierarchy.fetch(guide)
+    def recur(node):
+        return dict((Guide.validate(child), recur(child)) for child in tree.children(node))
+    root = tree.nodes[0]
+    return {Guide.validate(root): recur(root)}
 
 def read_hierarchy_recursive(data):
-    def recur(data):
-        for guide in data.keys():
-            recur(data[guide])
-        return data
-    return recur(data)
+    """
+    Hierarchy of nested {guide: {child: {}}} data
+    """
+
+    nodes = []
+    parents = []
+    def recur(data, parent):
+        for guide in sorted(data, key=str):
+            nodes.append(str(guide))
+            parents.append(parent)
+            recur(data[guide], len(nodes) - 1)
+    recur(data, -1)
+    return Hierarchy(nodes, parents)
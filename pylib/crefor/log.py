@@ -1,29 +1,228 @@
 #!/usr/bin/env python
 
 """
+Logging setup for crefor. Levels are configurable per subsystem, either
+with environment variables before import or with set_level() at runtime.
+By default only warnings are printed, and info from crefor.control.
+
+    CREFOR_LOG_LEVEL=WARNING
+    CREFOR_LOG_LEVELS=crefor.model=ERROR,crefor.control=INFO
 """
 
+import os
+import atexit
 import logging
+import threading
+
+from Queue import Queue
+
+LEVEL_ENV = "CREFOR_LOG_LEVEL"
+LEVELS_ENV = "CREFOR_LOG_LEVELS"
+
+DEFAULT_LEVEL = logging.WARNING
+
+# Subsystem levels used unless configured
+DEFAULT_LEVELS = {"crefor.control": logging.INFO}
+
+# Configured levels, {"crefor.model": logging.ERROR}
+_LEVELS = {}
+
+# Loggers created by get_logger()
+_LOGGERS = {}
+
+# Shared handlers
+_STREAM_HANDLER = None
+_FILE_HANDLER = None
+
+def _to_level(level):
+    """
+    Convert level name or number to a logging level
+    """
+
+    if isinstance(level, basestring):
+        name = level.strip().upper()
+        if name.isdigit():
+            return int(name)
+        value = logging.getLevelName(name)
+        if not isinstance(value, int):
+            raise ValueError("Unknown log level: '%s'" % level)
+        return value
+    return int(level)
+
+def _load_env():
+    """
+    Read levels from environment. Unknown levels are ignored with a
+    warning once all entries are read, so a typo never breaks import.
+    """
+
+    entries = []
+    if os.environ.get(LEVEL_ENV):
+        entries.append((LEVEL_ENV, "", os.environ[LEVEL_ENV]))
+
+    for item in os.environ.get(LEVELS_ENV, "").split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            entries.append((LEVELS_ENV, name.strip(), level))
+
+    invalid = []
+    for env, name, level in entries:
+        try:
+            _LEVELS[name] = _to_level(level)
+        except ValueError:
+            invalid.append((env, name, level))
+
+    for env, name, level in invalid:
+        get_logger(__name__).warning("Ignoring unknown log level in %s: '%s'", env,
+                                     "%s=%s" % (name, level) if name else level)
+
+def _resolve_level(name):
+    """
+    Level of the closest configured parent subsystem, falling back
+    to the closest default
+    """
+
+    parts = name.split(".")
+    for levels in (_LEVELS, DEFAULT_LEVELS):
+        for index in range(len(parts), 0, -1):
+            level = levels.get(".".join(parts[:index]))
+            if level is not None:
+                return level
+        if "" in levels:
+            return levels[""]
+    return DEFAULT_LEVEL
 
 def get_logger(name):
 
-    if logging.Logger.manager.loggerDict.get(name):
-        return logging.Logger.manager.loggerDict.get(name)
+    if name in _LOGGERS:
+        return _LOGGERS[name]
+
+    global _STREAM_HANDLER
+    if _STREAM_HANDLER is None:
+        _STREAM_HANDLER = logging.StreamHandler()
+        _STREAM_HANDLER.setFormatter(MyFormatter())
+
+    logger = logging.getLogger(name)
+    logger.setLevel(_resolve_level(name))
+
+    logger.addHandler(_STREAM_HANDLER)
+    if _FILE_HANDLER is not None:
+        logger.addHandler(_FILE_HANDLER)
+    logger.propagate = False
+
+    _LOGGERS[name] = logger
+    return logger
+
+def set_level(level, name="crefor"):
+    """set_level(level, name="crefor")
+    Set log level of a subsystem and all loggers below it.
+
+    :param      level:      Level name or number
+    :type       level:      str, int
+    :param      name:       Subsystem, eg. 'crefor.model'
+    :type       name:       str
 
-    else:
+    **Example**:
 
-        logger = logging.getLogger(name)
-        logger.setLevel(logging.DEBUG)
+    >>> set_level("WARNING", "crefor.model")
+    """
 
-        handler = logging.StreamHandler()
-        
-        formatter = MyFormatter()
-        handler.setFormatter(formatter)
-        
-        logger.addHandler(handler)
-        logger.propagate = False
+    _LEVELS[name] = _to_level(level)
+    for logger_name, logger in _LOGGERS.items():
+        logger.setLevel(_resolve_level(logger_name))
 
-        return logger
+def get_level(name="crefor"):
+    """get_level(name="crefor")
+    Effective level of a subsystem
+    """
+
+    return _resolve_level(name)
+
+def log_to_file(path, level=logging.DEBUG):
+    """log_to_file(path, level=logging.DEBUG)
+    Write all crefor log records to a file from a background thread.
+    Loggers only pay for queueing the record, formatting and disk
+    writes happen on the worker thread.
+
+    :param      path:       Log file path
+    :type       path:       str
+    :param      level:      Minimum level written to file
+    :type       level:      str, int
+    :returns:               Queue handler
+    :rtype:                 QueueHandler
+    """
+
+    global _FILE_HANDLER
+
+    stop_file_logging()
+
+    target = logging.FileHandler(path)
+    target.setFormatter(logging.Formatter("%(asctime)s %(name)s %(levelname)s - %(message)s"))
+
+    _FILE_HANDLER = QueueHandler(target)
+    _FILE_HANDLER.setLevel(_to_level(level))
+
+    for logger in _LOGGERS.values():
+        logger.addHandler(_FILE_HANDLER)
+
+    return _FILE_HANDLER
+
+def stop_file_logging():
+    """stop_file_logging()
+    Flush and detach the background file handler
+    """
+
+    global _FILE_HANDLER
+
+    if _FILE_HANDLER is None:
+        return
+
+    for logger in _LOGGERS.values():
+        logger.removeHandler(_FILE_HANDLER)
+
+    _FILE_HANDLER.close()
+    _FILE_HANDLER = None
+
+class QueueHandler(logging.Handler):
+    """
+    Handler that hands records to a worker thread which
+    emits them to the target handler.
+    """
+
+    def __init__(self, target):
+        super(QueueHandler, self).__init__()
+
+        self.target = target
+        self.queue = Queue()
+
+        self.__thread = threading.Thread(target=self.__run, name="crefor-log")
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def emit(self, record):
+        try:
+            # Resolve args now, they may change before the worker runs
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+                record.exc_info = None
+            self.queue.put_nowait(record)
+        except Exception:
+            self.handleError(record)
+
+    def __run(self):
+        while True:
+            record = self.queue.get()
+            if record is None:
+                break
+            self.target.handle(record)
+
+    def close(self):
+        if self.__thread.is_alive():
+            self.queue.put(None)
+            self.__thread.join()
+        self.target.close()
+        super(QueueHandler, self).close()
 
 class MyFormatter(logging.Formatter):
 
@@ -46,4 +245,7 @@ class MyFormatter(logging.Formatter):
                 s = s + "\n"
             s = s + record.exc_text
 
-        return s
\ No newline at end of file
+        return s
+
+_load_env()
+atexit.register(stop_file_logging)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+
+"""
+Operation metrics. Counts and latency histograms are recorded for
+control functions and guide model phases and can be queried or
+exported to json at the end of a build.
+
+**Example**:
+
+>>> from crefor import metrics
+>>> metrics.get("control.guide.create")
+# Result: {'count': 12, 'p50': 0.089, 'p95': 0.126, 'max': 0.131, ...} #
+>>> metrics.export("/tmp/build_metrics.json")
+"""
+
+import json
+import math
+import time
+from functools import wraps
+
+class Histogram(object):
+    """
+    Latency histogram with logarithmic buckets. Percentiles resolve
+    to the upper bound of their bucket, within ~10% of the true value.
+    """
+
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    # Bucket upper bounds grow by FACTOR starting at BASE seconds
+    BASE = 1e-6
+    FACTOR = 2 ** 0.125
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.buckets = {}
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.min = seconds if self.min is None else min(self.min, seconds)
+
+        index = 0
+        if seconds > self.BASE:
+            index = int(math.ceil(math.log(seconds / self.BASE, self.FACTOR)))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def percentile(self, percent):
+        """
+        Approximate latency below which percent of samples fall
+        """
+
+        if not self.count:
+            return 0.0
+
+        rank = max(1, int(math.ceil(self.count * percent / 100.0)))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self.BASE * self.FACTOR ** index, self.max)
+        return self.max
+
+    def summary(self):
+        return {"count": self.count,
+                "total": self.total,
+                "mean": self.total / self.count if self.count else 0.0,
+                "min": self.min or 0.0,
+                "p50": self.percentile(50),
+                "p95": self.percentile(95),
+                "max": self.max}
+
+class Registry(object):
+    """
+    Collection of named histograms
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.__histograms = {}
+
+    def record(self, name, seconds):
+        """
+        Add a latency sample
+        """
+
+        if self.enabled:
+            try:
+                histogram = self.__histograms[name]
+            except KeyError:
+                histogram = self.__histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def timed(self, name):
+        """timed(name)
+        Decorator recording the latency of every call
+
+        **Example**:
+
+        >>> @registry.timed("control.guide.create")
+        ... def create(): pass
+        """
+
+        def decorator(func):
+            @wraps(func)
+            def inner(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                t = time.time()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.time() - t)
+            return inner
+        return decorator
+
+    def timer(self, name):
+        """timer(name)
+        Context manager recording the latency of a block
+        """
+
+        return _Timer(self, name)
+
+    def get(self, name):
+        """get(name)
+        Summary of a metric, empty dict if nothing was recorded
+        """
+
+        histogram = self.__histograms.get(name)
+        return histogram.summary() if histogram else {}
+
+    def names(self):
+        return sorted(self.__histograms)
+
+    def snapshot(self):
+        """snapshot()
+        Summaries of all metrics, {"name": {"count": 1, ...}}
+        """
+
+        return dict((name, h.summary()) for name, h in self.__histograms.items())
+
+    def reset(self):
+        self.__histograms.clear()
+
+    def export(self, path, **extra):
+        """export(path, **extra)
+        Write all metric summaries to a json file. Extra keyword
+        arguments are stored alongside, eg. template or host names.
+        """
+
+        data = {"timestamp": time.time(),
+                "metrics": self.snapshot()}
+        data.update(extra)
+
+        with open(path, "w") as f:
+            f.write(json.dumps(data, indent=4, sort_keys=True))
+
+        return path
+
+class _Timer(object):
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.registry.record(self.name, time.time() - self.start)
+        return False
+
+registry = Registry()
+
+record = registry.record
+timed = registry.timed
+timer = registry.timer
+get = registry.get
+names = registry.names
+snapshot = registry.snapshot
+reset = registry.reset
+export = registry.export
+
+def enable(enabled=True):
+    """enable(enabled=True)
+    Turn metric recording on or off
+    """
+
+    registry.enabled = bool(enabled)
@@ -3,11 +3,11 @@
 """
 """
 
-import logging
 from maya import cmds
 from crefor.lib import libName
+from crefor import log
 
-logger = logging.getLogger(__name__)
+logger = log.get_logger(__name__)
 
 class Node(object):
     """
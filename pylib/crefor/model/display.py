@@ -0,0 +1,409 @@
+#!/usr/bin/env python
+
+"""
+Scene wide guide display controller. Every guide is connected to one
+controller node so global display changes are a single setAttr.
+
+**Example**:
+
+>>> from crefor.model import display
+>>> display.set(debug=True, guideScale=0.5)
+>>> display.get("upVisibility")
+# Result: True #
+>>> display.set(lod="wireframe", focus=True, focusDepth=2)
+"""
+
+from maya import cmds
+
+from crefor.lib import libName, libAttr, libScene
+from crefor import log
+
+logger = log.get_logger(__name__)
+
+NODE = libName.compile("N", "guideDisplay", 0, "net")
+
+# Level of detail, from most to least expensive to draw
+LOD_LEVELS = ["full", "opaque", "wireframe"]
+
+# Connectors drawn as one annotation per child or one curve per
+# unbranched chain
+CONNECTOR_MODES = ["annotation", "chain"]
+
+# Sphere isoparm divisions and shaded points per span at full and
+# reduced detail, matching Maya's medium and rough display smoothness
+SMOOTHNESS = {"full": (1, 2), "low": (0, 1)}
+
+# Controller attributes and their defaults
+ATTRIBUTES = [("debug", "bool", False),
+              ("guideScale", "double", 1.0),
+              ("upVisibility", "bool", True),
+              ("connectorVisibility", "bool", True),
+              ("lod", "enum", 0),
+              ("focus", "bool", False),
+              ("focusDepth", "long", 1),
+              ("connectorMode", "enum", 0)]
+
+# Enum attribute values
+ENUMS = {"lod": LOD_LEVELS,
+         "connectorMode": CONNECTOR_MODES}
+
+# Controller utility nodes, true while lod is full or not wireframe
+FULL_COND = libName.compile("N", "guideDisplayFull", 0, "cond")
+SHADED_COND = libName.compile("N", "guideDisplayShaded", 0, "cond")
+
+# Group holding chain connector curves
+CHAIN_GROUP = libName.compile("N", "guideChains", 0, "grp")
+
+# Nodes shared by all guides, never owned by one
+SHARED_NODES = [NODE, FULL_COND, SHADED_COND, CHAIN_GROUP]
+
+# Selection job and guides currently shown in focus mode
+_FOCUS_JOB = None
+_FOCUSED = {"up": set(), "connector": set()}
+
+def get_node(create=True):
+    """get_node(create=True)
+    The display controller node, created if missing. Controllers
+    created by older versions or missing utility nodes are rebuilt.
+
+    :param      create:     Create the controller if it does not exist
+    :type       create:     bool
+    :rtype:                 str, None
+    """
+
+    if cmds.objExists(NODE):
+        if create and not (cmds.objExists("%s.%s" % (NODE, ATTRIBUTES[-1][0])) and
+                           cmds.objExists(FULL_COND) and
+                           cmds.objExists(SHADED_COND)):
+            _build(NODE)
+        return NODE
+
+    if not create:
+        return None
+
+    node = cmds.createNode("network", name=NODE, skipSelect=True)
+    _build(node)
+
+    logger.debug("Created guide display controller: '%s'", node)
+    return node
+
+def _build(node):
+    """
+    Add controller attributes and utility nodes, skipping existing ones
+    """
+
+    for name, attr_type, default in ATTRIBUTES:
+        if cmds.objExists("%s.%s" % (node, name)):
+            continue
+        if attr_type == "bool":
+            libAttr.add_bool(node, name, dv=default)
+        elif attr_type == "enum":
+            libAttr.add_enum(node, name, enums=ENUMS[name], dv=default)
+        elif attr_type == "long":
+            libAttr.add_long(node, name, min=0, dv=default)
+        else:
+            libAttr.add_double(node, name, min=0.01, dv=default)
+        libAttr.set(node, name, keyable=False, channelBox=True)
+
+    if not cmds.objExists(FULL_COND):
+        full = cmds.createNode("condition", name=FULL_COND, skipSelect=True)
+        cmds.connectAttr("%s.lod" % node, "%s.firstTerm" % full)
+        libAttr.set(full, "secondTerm", LOD_LEVELS.index("full"))
+        libAttr.set(full, "colorIfTrue", 0, SMOOTHNESS["full"][0], SMOOTHNESS["full"][1], type="float3")
+        libAttr.set(full, "colorIfFalse", 0, SMOOTHNESS["low"][0], SMOOTHNESS["low"][1], type="float3")
+
+    if not cmds.objExists(SHADED_COND):
+        shaded = cmds.createNode("condition", name=SHADED_COND, skipSelect=True)
+        cmds.connectAttr("%s.lod" % node, "%s.firstTerm" % shaded)
+        libAttr.set(shaded, "secondTerm", LOD_LEVELS.index("wireframe"))
+        libAttr.set(shaded, "colorIfTrueR", 0)
+        libAttr.set(shaded, "colorIfFalseR", 1)
+
+def set(**values):
+    """set(**values)
+    Set controller attributes, one setAttr each regardless of guide
+    count. Enum values can be given by name. The connector mode is
+    stored here but applied to connectors by
+    crefor.control.guide.set_connector_mode().
+
+    **Example**:
+
+    >>> set(debug=True, connectorVisibility=False)
+    >>> set(lod="opaque")
+    """
+
+    names = [name for name, _, _ in ATTRIBUTES]
+    node = get_node()
+    for name, value in values.items():
+        if name not in names:
+            raise ValueError("Unknown display attribute '%s', expected one of: %s" % (name, names))
+
+        if name in ENUMS and isinstance(value, basestring):
+            if value not in ENUMS[name]:
+                raise ValueError("Unknown display %s '%s', expected one of: %s" % (name, value, ENUMS[name]))
+            value = ENUMS[name].index(value)
+
+        libAttr.set(node, name, value)
+
+    if "focus" in values or "focusDepth" in values:
+        if get("focus"):
+            _install_focus()
+        update_focus()
+
+def get(name):
+    """get(name)
+    Controller attribute value, the default without a controller
+    """
+
+    node = get_node(create=False)
+    if node is None or not cmds.objExists("%s.%s" % (node, name)):
+        return dict((attr, default) for attr, _, default in ATTRIBUTES)[name]
+    return cmds.getAttr("%s.%s" % (node, name))
+
+def _reroute(source, target, exclude):
+    """
+    Move downstream connections of source plug over to target plug
+    """
+
+    plugs = cmds.listConnections(source, source=False, destination=True, plugs=True) or []
+    for plug in plugs:
+        if plug.split(".")[0] in exclude or plug.endswith(".%s" % source.split(".")[-1]):
+            continue
+        cmds.connectAttr(target, plug, force=True)
+
+def _surfaces(nodes):
+    """
+    Nurbs surfaces of nodes, either shapes or their transforms
+    """
+
+    nodes = [node for node in nodes if node and cmds.objExists(node)]
+    if not nodes:
+        return []
+
+    surfaces = cmds.ls(nodes, type="nurbsSurface") or []
+    surfaces.extend(cmds.listRelatives(nodes, shapes=True, type="nurbsSurface", fullPath=True) or [])
+    return surfaces
+
+def _focus_node(guide):
+    return libName.update(str(guide), append="displayFocus", suffix="cond")
+
+def connect(guide):
+    """connect(guide)
+    Connect a guide to the display controller. The guide's guideScale
+    and debug outputs are routed through utility nodes combining them
+    with the controller, its Up group visibility follows the
+    controller and its spheres follow the level of detail. Safe to
+    run on already connected guides.
+
+    :param      guide:      Guide
+    :type       guide:      Guide
+    :returns:               Utility nodes created
+    :rtype:                 list
+    """
+
+    node = get_node()
+    created = []
+
+    # Guide scale times global scale
+    scale_mdl = libName.update(guide.node, append="displayScale", suffix="mdl")
+    if not cmds.objExists(scale_mdl):
+        scale_mdl = cmds.createNode("multDoubleLinear", name=scale_mdl)
+        created.append(scale_mdl)
+        cmds.connectAttr("%s.guideScale" % guide.node, "%s.input1" % scale_mdl)
+        _reroute("%s.guideScale" % guide.node, "%s.output" % scale_mdl, [scale_mdl])
+    cmds.connectAttr("%s.guideScale" % node, "%s.input2" % scale_mdl, force=True)
+
+    # Guide debug or global debug
+    debug_pma = libName.update(guide.node, append="displayDebug", suffix="pma")
+    if not cmds.objExists(debug_pma):
+        debug_pma = cmds.createNode("plusMinusAverage", name=debug_pma)
+        created.append(debug_pma)
+        cmds.connectAttr("%s.debug" % guide.node, "%s.input1D[0]" % debug_pma)
+        _reroute("%s.debug" % guide.node, "%s.output1D" % debug_pma, [debug_pma])
+    cmds.connectAttr("%s.debug" % node, "%s.input1D[1]" % debug_pma, force=True)
+
+    # Shown unless focus is on and the guide is outside the selection,
+    # red for Up controls and green for child connectors
+    focus_cond = _focus_node(guide)
+    if not cmds.objExists(focus_cond):
+        focus_cond = cmds.createNode("condition", name=focus_cond)
+        created.append(focus_cond)
+        libAttr.set(focus_cond, "secondTerm", 1)
+        libAttr.set(focus_cond, "colorIfTrue", 0, 0, 0, type="float3")
+        libAttr.set(focus_cond, "colorIfFalse", 1, 1, 1, type="float3")
+    cmds.connectAttr("%s.focus" % node, "%s.firstTerm" % focus_cond, force=True)
+
+    grp = guide.up.nodes.get("grp")
+    if grp and cmds.objExists(grp):
+        cmds.connectAttr("%s.upVisibility" % node, "%s.visibility" % grp, force=True)
+        cmds.connectAttr("%s.outColorR" % focus_cond, "%s.visibility" % guide.up.node, force=True)
+
+    # Level of detail, the guide shader is shared so its transparency
+    # is connected once
+    libAttr.set(FULL_COND, "colorIfTrueR", guide._TRANSPARENCY)
+    shader = getattr(guide, "shader", None)
+    if shader and cmds.objExists(shader.node):
+        for channel in ["R", "G", "B"]:
+            cmds.connectAttr("%s.outColorR" % FULL_COND, "%s.transparency%s" % (shader.node, channel), force=True)
+
+    up_nodes = [guide.up.nodes.get(axis) for axis in ["x", "y", "z"]]
+    for surface in _surfaces(list(guide.shapes or []) + up_nodes):
+        libAttr.set(surface, "overrideEnabled", True)
+        cmds.connectAttr("%s.outColorR" % SHADED_COND, "%s.overrideShading" % surface, force=True)
+        cmds.connectAttr("%s.outColorG" % FULL_COND, "%s.divisionsU" % surface, force=True)
+        cmds.connectAttr("%s.outColorG" % FULL_COND, "%s.divisionsV" % surface, force=True)
+        cmds.connectAttr("%s.outColorB" % FULL_COND, "%s.curvePrecisionShaded" % surface, force=True)
+
+    return created
+
+def is_chain_mode():
+    """is_chain_mode()
+    Are connectors drawn as chain curves
+    """
+
+    return get("connectorMode") == CONNECTOR_MODES.index("chain")
+
+def _disconnect(plug):
+    """
+    Break the incoming connection of plug
+    """
+
+    sources = cmds.listConnections(plug, source=True, destination=False, plugs=True) or []
+    for source in sources:
+        cmds.disconnectAttr(source, plug)
+
+def connect_connector(connector, shape):
+    """connect_connector(connector, shape)
+    Connect a connector shape to its child guide shape, the display
+    controller and its parent guide's focus state. In chain mode the
+    connector is hidden and disconnected instead, only keeping its aim
+    condition, and chain curves are rebuilt.
+
+    :param      connector:      Connector annotation shape
+    :type       connector:      str
+    :param      shape:          Child guide shape the connector points at
+    :type       shape:          str
+    """
+
+    if is_chain_mode():
+        _disconnect("%s.dagObjectMatrix[0]" % connector)
+        _disconnect("%s.visibility" % connector)
+        libAttr.set(connector, "visibility", False)
+        libScene.defer(update_chains)
+        return
+
+    cmds.connectAttr("%s.worldMatrix[0]" % shape,
+                     "%s.dagObjectMatrix[0]" % connector,
+                     force=True)
+    cmds.connectAttr("%s.connectorVisibility" % get_node(),
+                     "%s.visibility" % connector,
+                     force=True)
+
+    parent = cmds.listRelatives(connector, parent=True)
+    if parent:
+        focus_cond = _focus_node(parent[0])
+        if cmds.objExists(focus_cond):
+            cmds.connectAttr("%s.outColorG" % focus_cond,
+                             "%s.lodVisibility" % connector,
+                             force=True)
+
+def _set_focus(guides, channel, value):
+    for guide in guides:
+        focus_cond = _focus_node(guide)
+        if cmds.objExists(focus_cond):
+            cmds.setAttr("%s.colorIfTrue%s" % (focus_cond, channel), value)
+
+def _install_focus():
+    """
+    Start the selection job driving focus mode, once per session
+    """
+
+    global _FOCUS_JOB
+
+    if _FOCUS_JOB is not None and cmds.scriptJob(exists=_FOCUS_JOB):
+        return
+
+    # Focus values stored with the scene may be stale
+    for focus_cond in cmds.ls("*DisplayFocus_*_cond", type="condition") or []:
+        libAttr.set(focus_cond, "colorIfTrue", 0, 0, 0, type="float3")
+    for key in _FOCUSED:
+        _FOCUSED[key] = set()
+
+    _FOCUS_JOB = cmds.scriptJob(event=["SelectionChanged", update_focus], killWithScene=True)
+
+def update_focus():
+    """update_focus()
+    Show Up controls of selected guides and connectors of guides
+    within focusDepth steps of the selection. Only guides entering or
+    leaving focus are touched, so cost follows the selection rather
+    than the scene. Called by a selection job while focus is on.
+    """
+
+    node = get_node(create=False)
+    if node is None or not get("focus"):
+        return
+
+    # Deferred to avoid a circular import with the guide model
+    from crefor.model.guideset import is_guide
+
+    selected = set(name for name in cmds.ls(sl=True, type="joint") or [] if is_guide(name))
+
+    near = set(selected)
+    frontier = list(selected)
+    for _ in range(get("focusDepth")):
+        relatives = []
+        for name in frontier:
+            relatives.extend(cmds.listRelatives(name, parent=True, type="joint") or [])
+            relatives.extend(cmds.listRelatives(name, children=True, type="joint") or [])
+        frontier = [name for name in set(relatives) if name not in near]
+        near.update(frontier)
+
+    for key, channel, shown in [("up", "R", selected), ("connector", "G", near)]:
+        _set_focus(_FOCUSED[key] - shown, channel, 0)
+        _set_focus(shown - _FOCUSED[key], channel, 1)
+        _FOCUSED[key] = shown
+
+def update_chains():
+    """update_chains()
+    Rebuild chain connector curves from the guide hierarchy, removing
+    them outside of chain mode. Each unbranched chain is one linear
+    curve whose points are driven by the world position of its guides'
+    setup nodes, so display cost follows the number of chains rather
+    than the number of guides.
+
+    :returns:       Chain curves
+    :rtype:         list
+    """
+
+    if cmds.objExists(CHAIN_GROUP):
+        cmds.delete(CHAIN_GROUP)
+
+    if not is_chain_mode():
+        return []
+
+    # Deferred to avoid a circular import with the guide model
+    from crefor.lib.libUtil import Hierarchy
+
+    group = cmds.createNode("transform", name=CHAIN_GROUP, skipSelect=True)
+    cmds.connectAttr("%s.connectorVisibility" % get_node(), "%s.visibility" % group)
+
+    # Match annotation connectors, coloured and unselectable
+    libAttr.set(group, "overrideEnabled", True)
+    libAttr.set(group, "overrideColor", 18)
+    libAttr.set(group, "overrideDisplayType", 1)
+
+    curves = []
+    for chain in Hierarchy.fetch().chains():
+        curve = cmds.curve(name=libName.update(chain[1], append="chain", suffix="crv"),
+                           degree=1,
+                           point=[(0, 0, 0)] * len(chain))
+        shape = cmds.listRelatives(curve, shapes=True)[0]
+
+        for index, guide in enumerate(chain):
+            cmds.connectAttr("%s.translate" % libName.update(guide, suffix="setup"),
+                             "%s.controlPoints[%s]" % (shape, index))
+
+        curves.append(cmds.parent(curve, group)[0])
+
+    logger.debug("Built %s chain connector(s)", len(curves))
+    return curves
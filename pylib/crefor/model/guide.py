@@ -10,12 +10,13 @@ import json
 import logging
 from maya import cmds
 
-from collections import OrderedDict
-from crefor.lib import libName, libAttr
+from crefor.lib import libName, libAttr, libScene
 from crefor.model import Node
 from crefor.model.shader import Shader
+from crefor.model import display
+from crefor import log, metrics, trace, solver
 
-logger = logging.getLogger(__name__)
+logger = log.get_logger(__name__)
 
 __all__ = ["Guide"]
 
@@ -45,14 +46,25 @@ class Guide(Node):
     _RADIUS = 1.0
     _TRANSPARENCY = 0.6
 
-    AIM_ORIENT = OrderedDict([
-                             ("xyz", [(0, 0, 0), (0, 180, 0)]),
-                             ("xzy", [(-90, 0, 0), (-90, 180, 0)]),
-                             ("yxz", [(0, -180, -90), (0, 0, 90)]),
-                             ("yzx", [(0, -90, -90), (180, 90, -90)]),
-                             ("zxy", [(-90, 180, -90), (90, 180, -90)]),
-                             ("zyx", [(-90, 90, -90), (-90, -90, 90)])
-                             ])
+    # Share one hidden master shape per kind between all guides
+    INSTANCE_SHAPES = False
+
+    # Scale shapes with a 'cluster' deformer or a parent 'transform'.
+    # Instanced shapes always scale by transform.
+    SCALE_MODES = ["cluster", "transform"]
+    SCALE_MODE = "cluster"
+
+    # Sphere tessellation, None uses Maya defaults
+    SPHERE_SECTIONS = None
+    SPHERE_SPANS = None
+
+    # Json attribute describing a symmetry link, see link()
+    SYMMETRY_ATTR = "symmetry"
+
+    # Maya rotateOrder enum
+    ROTATE_ORDERS = solver.ROTATE_ORDERS
+
+    AIM_ORIENT = solver.AIM_ORIENT
 
     @classmethod
     def validate(cls, node):
@@ -94,6 +106,9 @@ class Guide(Node):
         self.up = None
         self.aim = None
 
+        # Instanced shape master
+        self.master = None
+
         # Snapshot
         self.__nodes = {}
         self.__nondag = []
@@ -101,6 +116,8 @@ class Guide(Node):
         # Other
         self.__trash = []
 
+    @metrics.timed("model.guide.create")
+    @trace.traced("model.guide.create", guide=0)
     def create(self):
         """
         Create a guide node.
@@ -128,11 +145,13 @@ class Guide(Node):
         self.__create_shader()
         self.__post()
 
-        logger.info("Guide created: '%s' (%0.3fs)" % (self.node,
-                                                     time.time()-t))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Guide created: '%s' (%0.3fs)", self.node, time.time() - t)
 
         return self
 
+    @metrics.timed("model.guide.reinit")
+    @trace.traced("model.guide.reinit", guide=0)
     def reinit(self):
         """
         Reinitialise an existing guide. The guide must exist in the
@@ -164,6 +183,10 @@ class Guide(Node):
 
         self.up = Up(self).reinit()
 
+        # Scale transforms need picks redirected
+        if str(getattr(self, "scale", "")).endswith("_%s" % SCALE_SUFFIX):
+            _install_selection()
+
         # Get snapshot
         self.__nodes = json.loads(cmds.getAttr("%s.nodes" % self.node))
         self.__nondag = json.loads(cmds.getAttr("%s.nondag" % self.node))
@@ -209,19 +232,22 @@ class Guide(Node):
 
         if self.exists():
 
+            self.unlink()
             self.strip()
 
             self.up.remove()
+            self.shader.remove(self.shapes)
 
-            if self.nondag:
-                cmds.delete(self.nondag)
+            nondag = cmds.ls(self.nondag)
+            if nondag:
+                cmds.delete(nondag)
 
             cmds.delete(self.setup)
             cmds.delete(self.node)
 
-            self.shader.remove()
+            _remove_master(self.master)
 
-    def compile(self):
+    def compile(self, orientation=None):
         """
         Generate a joint from guide matching the guides
         orientation, position and other necessary attributes.
@@ -230,8 +256,11 @@ class Guide(Node):
         Compiling a guide into a joint does not remove it
         from the Maya scene.
 
-        :returns:       Compiled joint
-        :rtype:         str
+        :param      orientation:    Worldspace orientation, defaults to
+                                    the evaluated aim transform
+        :type       orientation:    tuple, None
+        :returns:                   Compiled joint
+        :rtype:                     str
 
         **Example**:
 
@@ -242,20 +271,21 @@ class Guide(Node):
 
         joint = None
         if self.exists():
-            cmds.select(cl=True)
 
             # Get some joint creation args
-            orientation = cmds.xform(self.aim, q=1, ws=1, ro=1)
+            if orientation is None:
+                orientation = cmds.xform(self.aim, q=1, ws=1, ro=1)
             rotationOrder = self.AIM_ORIENT.keys()[cmds.getAttr("%s.aimOrient" % self.node)]
 
-            # Create joint
-            joint = cmds.joint(name=libName.update(self.node, suffix="jnt"),
-                               orientation=orientation,
-                               position=self.get_position(worldspace=True),
-                               rotationOrder=rotationOrder)
+            # Create joint without touching selection
+            joint = cmds.createNode("joint",
+                                    name=libName.update(self.node, suffix="jnt"),
+                                    skipSelect=True)
+            libAttr.set(joint, "translate", *self.get_position(worldspace=True), type="double3")
+            libAttr.set(joint, "jointOrient", *map(float, orientation), type="double3")
+            libAttr.set(joint, "rotateOrder", self.ROTATE_ORDERS.index(rotationOrder))
 
-            cmds.select(cl=True)
-            logger.debug("Compiled guide '%s' into joint: '%s'" % (self.node, joint))
+            logger.debug("Compiled guide '%s' into joint: '%s'", self.node, joint)
 
         return joint
 
@@ -444,6 +474,21 @@ class Guide(Node):
                 connectors.append(Connector(self, child).reinit())
         return connectors
 
+    @property
+    def symmetry(self):
+        """
+        Source guide this guide is symmetry linked to
+
+        :returns:   Source guide
+        :rtype:     Guide, None
+        """
+
+        if self.exists() and cmds.attributeQuery(self.SYMMETRY_ATTR, node=self.node, exists=True):
+            data = json.loads(cmds.getAttr("%s.%s" % (self.node, self.SYMMETRY_ATTR)) or "{}")
+            if cmds.objExists(data.get("source") or ""):
+                return Guide.validate(data["source"])
+        return None
+
     @property
     def primary(self):
         """
@@ -597,7 +642,7 @@ class Guide(Node):
         """
 
         if self.exists():
-            logger.debug("Setting '%s' position: %s" % (self.node, [x, y, z]))
+            logger.debug("Setting '%s' position: %s", self.node, (x, y, z))
             cmds.xform(self.node, ws=worldspace, t=[x, y, z])
 
     def aim_flip(self, flip):
@@ -776,13 +821,79 @@ class Guide(Node):
                     parent=self.parent.node if self.parent else None,
                     children=map(str, self.children),
                     offset=self.get_offset_orient(),
-                    aim_at=self.get_aim_at(),
+                    aim_at=str(self.get_aim_at()),
                     aim_flip=bool(cmds.getAttr("%s.aimFlip" % self.node)),
                     position=self.get_position(worldspace=True),
                     up_position=self.get_up_position(worldspace=True),
                     primary=self.primary,
                     secondary=self.secondary) if self.exists() else {}
 
+    def owned_nodes(self):
+        """
+        All Maya nodes that exist because of this guide. This includes
+        bookkept nodes, Up and Connector nodes, setup descendants,
+        shape deformers and utility nodes driven by guide attributes.
+        Shared shaders and display nodes are not included.
+
+        :returns:           Owned node names
+        :rtype:             set
+
+        **Example**:
+
+        >>> root.owned_nodes()
+        # Result: set([u'C_root_0_gde', u'C_root_0_setup', '...']) #
+        """
+
+        owned = set()
+        if not self.exists():
+            return owned
+
+        def add(value):
+            if isinstance(value, (list, tuple)):
+                owned.update(value)
+            elif value:
+                owned.add(value)
+
+        owned.add(self.node)
+        for value in self.nodes.values():
+            add(value)
+        add(self.nondag)
+
+        if self.up and self.up.exists():
+            owned.add(self.up.node)
+            for value in self.up.nodes.values():
+                add(value)
+
+        for con in self.connectors:
+            owned.add(con.node)
+            for value in con.nodes.values():
+                add(value)
+
+        add(cmds.listRelatives(self.setup, allDescendents=True))
+
+        # Deformer chains on guide shapes
+        shapes = [s for s in list(self.shapes) + [self.up.get_shape(axis) for axis in "xyz"] if s]
+        history = cmds.listHistory(shapes, pruneDagObjects=True) or []
+        add(history)
+        add(cmds.listConnections(cmds.ls(history, type="geometryFilter") or [], type="objectSet"))
+
+        # Utility networks driven by guide attributes
+        pending = [self.node]
+        while pending:
+            downstream = cmds.listConnections(pending,
+                                              source=False,
+                                              destination=True,
+                                              type="condition") or []
+            downstream += cmds.listConnections(pending,
+                                               source=False,
+                                               destination=True,
+                                               type="plusMinusAverage") or []
+            pending = [node for node in set(downstream) if node not in owned]
+            owned.update(pending)
+
+        owned.difference_update(display.SHARED_NODES)
+        return set(cmds.ls(list(owned)) or [])
+
     # ======================================================================== #
     # Public
     # ======================================================================== #
@@ -812,6 +923,145 @@ class Guide(Node):
                 for child in children:
                     self.remove_child(child)
 
+    def add_nondag(self, nodes):
+        """
+        Record utility nodes created after the guide as owned by it,
+        so they are removed with the guide.
+
+        :param      nodes:          Utility nodes
+        :type       nodes:          list
+
+        **Example:**
+
+        >>> arm.add_nondag(["L_armDisplayScale_0_mdl"])
+        """
+
+        if self.exists() and nodes:
+            nondag = list(self.nondag)
+            nondag.extend(node for node in nodes if node not in nondag)
+            libAttr.set(self.node, "nondag", json.dumps(nondag), type="string")
+            set_owner(self.node, nodes)
+            self.__nondag = nondag
+
+    def link(self, guide, plane="YZ"):
+        """
+        Drive this guide's translate, up translate and guideScale from
+        a guide on the other side of a mirror plane. Worldspace positions
+        are mirrored through utility nodes so edits to the source guide
+        are mirrored by the DG. The link is made against the current
+        parent, relink after reparenting.
+
+        :param      guide:          Source guide
+        :type       guide:          Guide, str
+        :param      plane:          Mirror plane, 'YZ', 'XZ' or 'XY'
+        :type       plane:          str
+        :raises:                    ValueError
+
+        **Example:**
+
+        >>> r_arm.link("L_arm_0_gde")
+        >>> r_arm.symmetry
+        # Result: <Guide 'L_arm_0_gde'> #
+        """
+
+        if self.exists():
+
+            guide = Guide.validate(guide)
+            if guide.node == self.node:
+                raise ValueError("Cannot link '%s' to itself" % self.node)
+
+            scale = [1, 1, 1]
+            try:
+                scale[solver.MIRROR_PLANES[str(plane).upper()]] = -1
+            except KeyError:
+                raise ValueError("Unknown mirror plane '%s'" % plane)
+
+            self.unlink()
+
+            # Mirrored worldspace position
+            mirror_md = cmds.createNode("multiplyDivide",
+                                        name=libName.update(self.node, append="mirror", suffix="md"))
+            libAttr.set(mirror_md, "input2", *scale, type="double3")
+            cmds.connectAttr("%s.translate" % guide.setup, "%s.input1" % mirror_md)
+            nodes = [mirror_md]
+            output = "%s.output" % mirror_md
+
+            # Relative to parent, guides are never rotated
+            if self.parent:
+                mirror_pma = cmds.createNode("plusMinusAverage",
+                                             name=libName.update(self.node, append="mirror", suffix="pma"))
+                libAttr.set(mirror_pma, "operation", 2)
+                cmds.connectAttr(output, "%s.input3D[0]" % mirror_pma)
+                cmds.connectAttr("%s.translate" % self.parent.setup, "%s.input3D[1]" % mirror_pma)
+                nodes.append(mirror_pma)
+                output = "%s.output3D" % mirror_pma
+
+            cmds.connectAttr(output, "%s.translate" % self.node, force=True)
+
+            # Up translate is local to the scaled up group
+            up_md = cmds.createNode("multiplyDivide",
+                                    name=libName.update(self.node, append="mirrorUp", suffix="md"))
+            libAttr.set(up_md, "input2", *scale, type="double3")
+            cmds.connectAttr("%s.translate" % guide.up.node, "%s.input1" % up_md)
+            cmds.connectAttr("%s.output" % up_md, "%s.translate" % self.up.node, force=True)
+            nodes.append(up_md)
+
+            cmds.connectAttr("%s.guideScale" % guide.node, "%s.guideScale" % self.node, force=True)
+
+            set_owner(self.node, nodes)
+
+            if not cmds.attributeQuery(self.SYMMETRY_ATTR, node=self.node, exists=True):
+                libAttr.add_string(self.node, self.SYMMETRY_ATTR)
+            data = {"source": guide.node, "plane": str(plane).upper(), "nodes": nodes}
+            libAttr.set(self.node, self.SYMMETRY_ATTR, json.dumps(data), type="string")
+
+            logger.debug("Linked '%s' to '%s' across %s", self.node, guide.node, plane)
+
+    def unlink(self):
+        """
+        Remove a symmetry link, baking the current translates
+        and guideScale.
+
+        :returns:                   If the guide was linked
+        :rtype:                     bool
+
+        **Example:**
+
+        >>> r_arm.unlink()
+        # Result: True #
+        """
+
+        if not self.exists() or not cmds.attributeQuery(self.SYMMETRY_ATTR, node=self.node, exists=True):
+            return False
+
+        data = json.loads(cmds.getAttr("%s.%s" % (self.node, self.SYMMETRY_ATTR)) or "{}")
+
+        # Read driven values before their inputs go away
+        baked = {}
+        for node in [self.node, self.up.node]:
+            baked[node] = cmds.getAttr("%s.translate" % node)[0]
+        scale = cmds.getAttr("%s.guideScale" % self.node)
+
+        source = cmds.listConnections("%s.guideScale" % self.node,
+                                      source=True,
+                                      destination=False,
+                                      plugs=True) or []
+        for plug in source:
+            cmds.disconnectAttr(plug, "%s.guideScale" % self.node)
+
+        nodes = cmds.ls(data.get("nodes", []))
+        if nodes:
+            cmds.delete(nodes)
+
+        for node, translate in baked.items():
+            libAttr.set(node, "translate", *translate, type="double3")
+        libAttr.set(self.node, "guideScale", scale)
+
+        cmds.deleteAttr(self.node, at=self.SYMMETRY_ATTR)
+
+        logger.debug("Unlinked '%s' from '%s'", self.node, data.get("source"))
+        return True
+
     def has_child(self, guide):
         """
         Is input guide an immediate child of this guide?
@@ -879,6 +1129,7 @@ class Guide(Node):
             parent = parent.parent
         return False
 
+    @trace.traced("model.guide.set_parent", guide=0)
     def set_parent(self, guide):
         """
         Set this guides parent to be the input guide.
@@ -902,12 +1153,12 @@ class Guide(Node):
 
         # Try to parent to itself
         if self.node == guide.node:
-            logger.warning("Cannot parent '%s' to itself" % self.node)
+            logger.warning("Cannot parent '%s' to itself", self.node)
             return None
 
         # Is guide already parent
         if self.parent and self.parent.node == guide.node:
-            logger.debug("'%s' is already a parent of '%s'" % (guide.node, self.node))
+            logger.debug("'%s' is already a parent of '%s'", guide.node, self.node)
             return self.parent
 
         # Is guide below self in hierarchy
@@ -919,12 +1170,12 @@ class Guide(Node):
             self.remove_parent()
 
         guide.__add_aim(self)
-        logger.info("'%s' successfully set parent: '%s' (%0.3fs)" % (self.node,
-                                                                     guide.node,
-                                                                     time.time()-t))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("'%s' successfully set parent: '%s' (%0.3fs)", self.node, guide.node, time.time() - t)
 
         return guide
 
+    @trace.traced("model.guide.add_child", guide=0)
     def add_child(self, guide):
         """
         Add input guide as a child to this guide.
@@ -948,12 +1199,12 @@ class Guide(Node):
 
         # Try to parent to itself
         if self.node == guide.node:
-            logger.warning("Cannot add '%s' to itself as child" % self.node)
+            logger.warning("Cannot add '%s' to itself as child", self.node)
             return None
 
         # Guide is already a child of self
         if self.has_child(guide):
-            logger.info("'%s' is already a child of '%s'" % (guide.node, self.node))
+            logger.info("'%s' is already a child of '%s'", guide.node, self.node)
             return self.children.index(guide.node)
 
         # If guide has any parent already
@@ -965,9 +1216,8 @@ class Guide(Node):
             self.remove_parent()
 
         self.__add_aim(guide)
-        logger.info("'%s' successfully added child: '%s' (%0.3fs)" % (self.node,
-                                                                      guide.node,
-                                                                      time.time()-t))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("'%s' successfully added child: '%s' (%0.3fs)", self.node, guide.node, time.time() - t)
         return guide
 
     def remove_parent(self):
@@ -1008,6 +1258,7 @@ class Guide(Node):
     # Private
     # ======================================================================== #
 
+    @trace.traced("model.guide.add_aim", guide=0)
     def __add_aim(self, guide):
         """
         Private aim creation method. Add the input guide as a child
@@ -1035,6 +1286,7 @@ class Guide(Node):
 
         return guide
 
+    @trace.traced("model.guide.remove_aim", guide=0)
     def __remove_aim(self, guide):
         """
         Remove input guide as a child guide.
@@ -1074,9 +1326,8 @@ class Guide(Node):
         if len(enums) == len(self.DEFAULT_AIMS):
             libAttr.set(self.node, "aimAt", 0)
 
-        logger.debug("'%s' remove child: '%s' (%0.3fs)" % (self.node,
-                                                           guide.node,
-                                                           time.time()-t))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("'%s' remove child: '%s' (%0.3fs)", self.node, guide.node, time.time() - t)
 
     def __update_aim_index(self):
         """
@@ -1096,6 +1347,8 @@ class Guide(Node):
         for key, cond in state_conds.items():
             libAttr.set(self.condition, "secondTerm", enum_index)
 
+    @metrics.timed("model.guide.create_nodes")
+    @trace.traced("model.guide.create_nodes", guide=0)
     def __create_nodes(self):
         """
         Main node creation method.
@@ -1109,10 +1362,8 @@ class Guide(Node):
         """
         
         # Create node and parent sphere under
-        cmds.select(cl=True)
-        self.node = cmds.joint(name=self.node)
+        self.node = cmds.createNode("joint", name=self.node, skipSelect=True)
         libAttr.set(self.node, "radius", channelBox=False, l=True)
-        cmds.select(cl=True)
 
         # Create attributes
         libAttr.add_double(self.node, "guideScale", min=0.01, dv=1)
@@ -1135,28 +1386,51 @@ class Guide(Node):
         for axis in ["X", "Y", "Z"]:
             libAttr.set_keyable(self.node, "offsetOrient%s" % axis)
 
-        # Create shapes
-        _sphere = cmds.sphere(radius=self._RADIUS, ch=False)[0]
-        _shapes = cmds.listRelatives(_sphere, type="nurbsSurface", children=True)
-        self.shapes = [cmds.rename(_shapes[0], "%sShape" % self.node)]
-        cmds.parent(self.shapes, self.node, r=True, s=True)
-        libAttr.set(self.node, "drawStyle", 2)
-
         # Setup node
         self.setup = cmds.group(name=libName.update(self.node, suffix="setup"), empty=True)
         cmds.pointConstraint(self.node, self.setup, mo=False)
 
-        # Create scale cluster
-        _cl, _scale = cmds.cluster(self.shapes)
-        libAttr.set(_cl, "relative", True)
-        self.scale = cmds.rename(_scale, libName.update(self.node, append="scale", suffix="clh"))
-        cmds.parent(self.scale, self.setup)
+        # Create shapes
+        if self.INSTANCE_SHAPES:
+
+            # Instance master shape under a scale transform
+            self.master = _get_master(libName.compile("N", "guide", 0, "geo"), self._RADIUS)
+            self.scale = _add_instance(self.master, libName.update(self.node, suffix=SCALE_SUFFIX), self.node)
+            self.shapes = [self.scale]
+
+        elif _scale_mode() == "transform":
+
+            # Parent shape under a scale transform, no deformer
+            _sphere = _create_sphere(radius=self._RADIUS, ch=False)
+            _shapes = cmds.listRelatives(_sphere, type="nurbsSurface", children=True)
+            self.shapes = [cmds.rename(_shapes[0], "%sShape" % self.node)]
+            self.scale = _create_scale_transform(libName.update(self.node, suffix=SCALE_SUFFIX), self.node)
+            cmds.parent(self.shapes, self.scale, r=True, s=True)
+
+            self.__trash.extend([_sphere])
+
+        else:
+
+            _sphere = _create_sphere(radius=self._RADIUS, ch=False)
+            _shapes = cmds.listRelatives(_sphere, type="nurbsSurface", children=True)
+            self.shapes = [cmds.rename(_shapes[0], "%sShape" % self.node)]
+            cmds.parent(self.shapes, self.node, r=True, s=True)
+
+            # Create scale cluster
+            _cl, _scale = cmds.cluster(self.shapes)
+            libAttr.set(_cl, "relative", True)
+            self.scale = cmds.rename(_scale, libName.update(self.node, append="scale", suffix="clh"))
+            cmds.parent(self.scale, self.setup)
+            libAttr.set(self.scale, "visibility", 0, k=False, l=True)
+
+            self.__trash.extend([_sphere])
+
+        libAttr.set(self.node, "drawStyle", 2)
 
         # Lock down scale node
         for attr in ["translate", "rotate"]:
             for axis in ["X", "Y", "Z"]:
                 libAttr.set(self.scale, "%s%s" % (attr, axis), l=True)
-        libAttr.set(self.scale, "visibility", 0, k=False, l=True)
         libAttr.set(self.node, "visibility", k=False, l=True)
 
         for axis in ["X", "Y", "Z"]:
@@ -1178,10 +1452,14 @@ class Guide(Node):
         self.__nodes["node"] = self.node
         self.__nodes["shapes"] = self.shapes
 
+        if self.master:
+            self.__nodes["master"] = self.master
+
         # Tidy up
         cmds.parent([self.aim], self.setup)
-        self.__trash.extend([_sphere])
 
+    @metrics.timed("model.guide.create_up")
+    @trace.traced("model.guide.create_up", guide=0)
     def __create_up(self):
         """
         Create up object that serves as the up control for the secondary aim
@@ -1198,10 +1476,12 @@ class Guide(Node):
             if not cmds.objExists(up_pma):
                 up_pma = cmds.createNode("plusMinusAverage", name=up_pma)
                 cmds.connectAttr("%s.output1D" % up_pma, "%s.visibility" % self.up.get_shape(axis[1]))
+                self.__nondag.append(up_pma)
 
             up_name = libName.update(self.node, suffix="cond", append="Up%s" % ("".join(axis).title()))
             up_cond = cmds.createNode("condition", name=up_name)
             up_conds.append(up_cond)
+            self.__nondag.append(up_cond)
 
             cmds.connectAttr("%s.aimOrient" % self.node, "%s.firstTerm" % up_cond)
             libAttr.set(up_cond, "secondTerm", axis_index)
@@ -1213,6 +1493,8 @@ class Guide(Node):
         for cond in up_conds:
             cmds.connectAttr("%s.aimAt" % self.node, "%s.colorIfTrueR" % cond)
 
+    @metrics.timed("model.guide.initialise_aim")
+    @trace.traced("model.guide.initialise_aim", guide=0)
     def __initialise_aim(self):
         """
         Create inital aim logic network. This is where the guides main
@@ -1224,6 +1506,7 @@ class Guide(Node):
                                         name=libName.update(self.node,
                                                             suffix="cond",
                                                             append="local"))
+        self.__nondag.append(self.__condition)
 
         # Create local orient
         orient_constraint = cmds.orientConstraint(self.node, self.setup, mo=True)[0]
@@ -1250,6 +1533,7 @@ class Guide(Node):
         # Create custom aim constraint offsets
         aim_offset_pma = cmds.createNode("plusMinusAverage",
                                         name=libName.update(self.node, suffix="pma", append="custom"))
+        self.__nondag.append(aim_offset_pma)
 
         cmds.connectAttr("%s.output3D" % aim_offset_pma, "%s.offset" % self.__constraint)
 
@@ -1263,6 +1547,8 @@ class Guide(Node):
                                                             append="aim%s" % pair_index,
                                                             suffix="cond"))
 
+            self.__nondag.append(pair_cond)
+
             cmds.connectAttr("%s.aimOrient" % self.node, "%s.firstTerm" % pair_cond)
             cmds.connectAttr("%s.outColor" % pair_cond, "%s.input3D[%s]" % (aim_offset_pma, pair_index))
 
@@ -1274,6 +1560,8 @@ class Guide(Node):
                                         name=libName.update(self.node,
                                                             append="aim%sFlip" % pair_index,
                                                             suffix="cond"))
+            self.__nondag.append(flip_cond)
+
             cmds.connectAttr("%s.aimFlip" % self.node, "%s.firstTerm" % flip_cond)
             cmds.connectAttr("%s.outColor" % flip_cond, "%s.colorIfTrue" % pair_cond)
 
@@ -1291,6 +1579,8 @@ class Guide(Node):
         self.__nodes["__condition"] = self.__condition
         self.__nodes["__constraint"] = self.__constraint
 
+    @metrics.timed("model.guide.create_shader")
+    @trace.traced("model.guide.create_shader", guide=0)
     def __create_shader(self):
         """
         """
@@ -1302,9 +1592,12 @@ class Guide(Node):
         libAttr.set(self.shader, "color", *rgb, type="float3")
         libAttr.set(self.shader, "incandescence", *rgb, type="float3")
         libAttr.set(self.shader, "diffuse", 0)
-        libAttr.set(self.shader, "transparency",
-                    *[self._TRANSPARENCY, self._TRANSPARENCY, self._TRANSPARENCY],
-                    type="float3")
+
+        # Transparency is driven by the display level of detail once connected
+        if not cmds.connectionInfo("%s.transparencyR" % self.shader, isDestination=True):
+            libAttr.set(self.shader, "transparency",
+                        *[self._TRANSPARENCY, self._TRANSPARENCY, self._TRANSPARENCY],
+                        type="float3")
 
         # cmds.setAttr("%s.color" % self.shader, *rgb, type="float3")
         # cmds.setAttr("%s.incandescence" % self.shader, *rgb, type="float3")
@@ -1319,11 +1612,16 @@ class Guide(Node):
         """
 
         # Clean up trash
-        cmds.delete(self.__trash)
+        if self.__trash:
+            cmds.delete(self.__trash)
+
+        # Connect to scene display controller
+        self.__nondag.extend(display.connect(self))
 
         # Burn in nodes
         libAttr.set(self.node, "nodes", json.dumps(self.__nodes), type="string")
         libAttr.set(self.node, "nondag", json.dumps(self.__nondag), type="string")
+        set_owner(self.node, self.__nondag)
 
         # Burn in shader data
         shader_data = {"node": self.shader.node, "type": self.shader.type}
@@ -1347,6 +1645,9 @@ class Up(Node):
         self.__nodes = {}
         self.__shaders = {}
 
+        self.scale = None
+        self.master = None
+
         super(Up, self).__init__(*libName.decompile(self.guide.node, 3))
 
     @property
@@ -1418,7 +1719,7 @@ class Up(Node):
                 value = cmds.getAttr("%s.translateX" % self.node) * -1
                 libAttr.set(self.node, "translateX", value)
             else:
-                logger.warning("Cannot flip aim when guide '%s' is set to world space" % self.guide.node)
+                logger.warning("Cannot flip aim when guide '%s' is set to world space", self.guide.node)
 
     def flop(self):
         """
@@ -1430,7 +1731,7 @@ class Up(Node):
                 value = cmds.getAttr("%s.translateY" % self.node) * -1
                 libAttr.set(self.node, "translateY", value)
             else:
-                logger.warning("Cannot flop aim when guide '%s' is set to world space" % self.guide.node)
+                logger.warning("Cannot flop aim when guide '%s' is set to world space", self.guide.node)
 
     def set_position(self, vector3f, worldspace=False):
         """
@@ -1440,7 +1741,7 @@ class Up(Node):
             try:
                 cmds.xform(self.node, ws=worldspace, t=vector3f)
             except Exception:
-                logger.error("Failed to set translates on '%s' with args: '%s'" % (self.node, vector3f))
+                logger.error("Failed to set translates on '%s' with args: '%s'", self.node, vector3f)
 
     def __create_nodes(self):
         """
@@ -1455,43 +1756,71 @@ class Up(Node):
                 libAttr.set(self.node, "%s%s" % (attr, axis), k=False, l=True)
         libAttr.set(self.node, "visibility", k=False, l=False)
 
-        _x = cmds.sphere(name=libName.update(self.node, append="X", suffix="up"), radius=self._DEFAULT_SCALE)[0]
-        _y = cmds.sphere(name=libName.update(self.node, append="Y", suffix="up"), radius=self._DEFAULT_SCALE)[0]
-        _z = cmds.sphere(name=libName.update(self.node, append="Z", suffix="up"), radius=self._DEFAULT_SCALE)[0]
-
-        self.x = cmds.listRelatives(_x, type="nurbsSurface")[0]
-        self.y = cmds.listRelatives(_y, type="nurbsSurface")[0]
-        self.z = cmds.listRelatives(_z, type="nurbsSurface")[0]
-
-        cmds.parent([self.x, self.y, self.z], self.node, r=True, s=True)
+        # Add attributes
+        libAttr.add_double(self.node, "guideScale", min=0.01, dv=1, k=True)
 
         for axis in ["X", "Y", "Z"]:
             cmds.connectAttr("%s.guideScale" % self.guide.node, "%s.scale%s" % (self.grp, axis))
 
+        if self.guide.INSTANCE_SHAPES:
+
+            # One scale transform per axis so visibility stays per guide
+            self.master = []
+            for axis in ["X", "Y", "Z"]:
+                master = _get_master(libName.compile("N", "guideUp%s" % axis, 0, "geo"), self._DEFAULT_SCALE)
+                geo = _add_instance(master, libName.update(self.node, append=axis, suffix=SCALE_SUFFIX), self.node)
+                setattr(self, axis.lower(), geo)
+                self.master.append(master)
+
+                for scale_axis in ["X", "Y", "Z"]:
+                    cmds.connectAttr("%s.guideScale" % self.node, "%s.scale%s" % (geo, scale_axis))
+
+            self.__nodes["master"] = self.master
+
+        else:
+
+            _x = _create_sphere(name=libName.update(self.node, append="X", suffix="up"), radius=self._DEFAULT_SCALE)
+            _y = _create_sphere(name=libName.update(self.node, append="Y", suffix="up"), radius=self._DEFAULT_SCALE)
+            _z = _create_sphere(name=libName.update(self.node, append="Z", suffix="up"), radius=self._DEFAULT_SCALE)
+
+            self.x = cmds.listRelatives(_x, type="nurbsSurface")[0]
+            self.y = cmds.listRelatives(_y, type="nurbsSurface")[0]
+            self.z = cmds.listRelatives(_z, type="nurbsSurface")[0]
+
+            cmds.delete([self.x, self.y, self.z], ch=True)
+
+            if _scale_mode() == "transform":
+
+                # Parent shapes under a scale transform, no deformer
+                self.scale = _create_scale_transform(libName.update(self.node, append="upScale", suffix=SCALE_SUFFIX), self.node)
+                cmds.parent([self.x, self.y, self.z], self.scale, r=True, s=True)
+
+            else:
+                cmds.parent([self.x, self.y, self.z], self.node, r=True, s=True)
+
+            cmds.delete([_x, _y, _z])
+
+            # Create scale cluster
+            if _scale_mode() == "cluster":
+                _cl, _scale = cmds.cluster([self.x, self.y, self.z])
+                cmds.setAttr("%s.relative" % _cl, True)
+                libAttr.set(_cl, "relative", True)
+                self.scale = cmds.rename(_scale, libName.update(self.node, append="upScale", suffix="clh"))
+                cmds.parent(self.scale, self.node)
+
+            for axis in ["X", "Y", "Z"]:
+                cmds.connectAttr("%s.guideScale" % self.node, "%s.scale%s" % (self.scale, axis))
+
+            self.__nodes["scale"] = self.scale
+
         # Tidy up
         cmds.parent(self.grp, self.guide.setup)
 
-        cmds.delete(self.node, ch=True)
-        cmds.delete([_x, _y, _z])
-
         self.__nodes["x"] = self.x
         self.__nodes["y"] = self.y
         self.__nodes["z"] = self.z
         self.__nodes["grp"] = self.grp
 
-        # Add attributes
-        libAttr.add_double(self.node, "guideScale", min=0.01, dv=1, k=True)
-
-        # Create scale cluster
-        _cl, _scale = cmds.cluster([self.x, self.y, self.z])
-        cmds.setAttr("%s.relative" % _cl, True)
-        libAttr.set(_cl, "relative", True)
-        self.scale = cmds.rename(_scale, libName.update(self.node, append="upScale", suffix="clh"))
-        cmds.parent(self.scale, self.node)
-
-        for axis in ["X", "Y", "Z"]:
-            cmds.connectAttr("%s.guideScale" % self.node, "%s.scale%s" % (self.scale, axis))
-
         # Offset node initial position
         libAttr.set(self.node,
                     "translate",
@@ -1531,8 +1860,9 @@ class Up(Node):
         libAttr.set(self.node, "shaders", json.dumps(self.__shaders), type="string")
 
         # Lock down cluster
-        libAttr.set(self.scale, "visibility", False)
-        libAttr.lock_all(self.scale)
+        if self.scale and cmds.nodeType(self.scale) == "clusterHandle":
+            libAttr.set(self.scale, "visibility", False)
+            libAttr.lock_all(self.scale)
 
     def create(self):
         """
@@ -1576,11 +1906,14 @@ class Up(Node):
         """
 
         if self.exists():
-            cmds.delete(self.node)
-
             for axis, shader_data in self.__shaders.items():
                 shader = Shader(*libName.decompile(shader_data["node"], 3)).reinit()
-                shader.remove()
+                shader.remove(self.get_shape(axis))
+
+            cmds.delete(self.node)
+
+            for master in self.master or []:
+                _remove_master(master)
 
 
 class Connector(Node):
@@ -1710,9 +2043,6 @@ class Connector(Node):
         cmds.delete(transform)
 
         libAttr.set(self.node, "displayArrow", True)
-        cmds.connectAttr("%s.worldMatrix[0]" % self.child.shapes[0],
-                         "%s.dagObjectMatrix[0]" % self.node,
-                         force=True)
 
     def __create_aim(self):
         """
@@ -1754,6 +2084,7 @@ class Connector(Node):
 
         # Store new condition
         self.__nodes["__condition"] = self.__condition
+        set_owner(self.parent.node, [self.__condition])
 
     def __update_aim_index(self):
         """
@@ -1780,6 +2111,9 @@ class Connector(Node):
         libAttr.set(self.node, "overrideEnabled", 1)
         libAttr.set(self.node, "overrideDisplayType", 1)
 
+        display.connect_connector(self.node, self.child.shapes[0])
+
+    @trace.traced("model.connector.create", guide=0)
     def create(self):
         """create()
         Create all nodes to represent a connector object.
@@ -1804,13 +2138,19 @@ class Connector(Node):
 
         **Example**:
 
-        >>> con = 
-        >>> con.create()
-        # Result: <Connector 'L_arm_0_cnc'> #
+        >>> con = spine.connectors[0]
+        >>> con.remove()
         """
 
+        condition = self.nodes.get("__condition")
         cmds.delete(self.node)
 
+        if condition and cmds.objExists(condition):
+            cmds.delete(condition)
+
+        if display.is_chain_mode():
+            libScene.defer(display.update_chains)
+
     def reinit(self):
         """reinit()
         Reinitialise connector and object nodes.
@@ -1838,3 +2178,187 @@ class Connector(Node):
         self.__update_aim_index()
 
         return self
+
+
+# ======================================================================== #
+# Ownership
+# ======================================================================== #
+
+# Message attribute linking crefor utility nodes to their owning guide
+OWNER_ATTR = "creforOwner"
+
+def set_owner(guide, nodes):
+    """
+    Link nodes to their owning guide through a message connection so
+    they can be found and swept once the guide no longer exists.
+    """
+
+    for node in nodes:
+        libAttr.add(node, OWNER_ATTR, at="message")
+        cmds.connectAttr("%s.message" % guide, "%s.%s" % (node, OWNER_ATTR), force=True)
+
+def get_orphans():
+    """
+    Owned nodes whose guide no longer exists, found with one
+    attribute listing and one connection query.
+    """
+
+    plugs = cmds.ls("*.%s" % OWNER_ATTR) or []
+    if not plugs:
+        return []
+
+    connected = cmds.listConnections(plugs,
+                                     source=True,
+                                     destination=False,
+                                     connections=True,
+                                     plugs=True) or []
+    owned = set(plug.split(".")[0] for plug in connected[::2])
+
+    return sorted(set(plug.split(".")[0] for plug in plugs) - owned)
+
+# ======================================================================== #
+# Shapes
+# ======================================================================== #
+
+# Suffix of transforms carrying instanced or transform scaled shapes
+SCALE_SUFFIX = "geo"
+
+# Selection job redirecting picked scale transforms
+_SELECTION_JOB = None
+
+def _create_sphere(**kwargs):
+    """
+    Create a nurbs sphere using the guide tessellation settings
+    and return its transform.
+    """
+
+    if Guide.SPHERE_SECTIONS:
+        kwargs["sections"] = Guide.SPHERE_SECTIONS
+    if Guide.SPHERE_SPANS:
+        kwargs["spans"] = Guide.SPHERE_SPANS
+
+    return cmds.sphere(**kwargs)[0]
+
+def _get_master(name, radius):
+    """
+    Get or create a hidden master sphere whose shape
+    is instanced by guides.
+    """
+
+    if not cmds.objExists(name):
+        name = _create_sphere(name=name, radius=radius, ch=False)
+        libAttr.set(name, "visibility", False)
+    return name
+
+def _scale_mode():
+    """
+    Validated Guide.SCALE_MODE
+    """
+
+    if Guide.SCALE_MODE not in Guide.SCALE_MODES:
+        raise ValueError("Invalid guide scale mode '%s', expected one of: %s" % (Guide.SCALE_MODE,
+                                                                                Guide.SCALE_MODES))
+    return Guide.SCALE_MODE
+
+def _create_scale_transform(name, parent):
+    """
+    Create an empty transform under parent that carries
+    the guide shape scale.
+    """
+
+    _install_selection()
+
+    transform = cmds.group(name=name, empty=True)
+    return cmds.parent(transform, parent, r=True)[0]
+
+def _install_selection():
+    """
+    Start the selection job redirecting picked scale
+    transforms, once per scene
+    """
+
+    global _SELECTION_JOB
+
+    if _SELECTION_JOB is not None and cmds.scriptJob(exists=_SELECTION_JOB):
+        return
+
+    _SELECTION_JOB = cmds.scriptJob(event=["SelectionChanged", redirect_selection], killWithScene=True)
+
+def redirect_selection():
+    """redirect_selection()
+    Replace selected scale transforms with the guide or Up node they
+    sit under. Viewport picks on instanced or transform scaled shapes
+    select the scale transform, this selects the guide instead. Only
+    transforms named after their guide or Up parent are redirected.
+    Called by a selection job once scale transforms exist.
+
+    **Example**:
+
+    >>> cmds.select("L_arm_0_geo")
+    >>> redirect_selection()
+    >>> cmds.ls(sl=True)
+    # Result: [u'L_arm_0_gde'] #
+    """
+
+    selected = cmds.ls(sl=True, long=True) or []
+
+    redirected = []
+    for path in selected:
+        if path.endswith("_%s" % SCALE_SUFFIX):
+            path = _scale_parent(path) or path
+        if path not in redirected:
+            redirected.append(path)
+
+    if redirected != selected:
+        cmds.select(redirected, r=True)
+
+def _scale_parent(path):
+    """
+    Guide or Up parent path of a scale transform, None for any
+    other node
+    """
+
+    # Deferred to avoid a circular import with the guide set
+    from crefor.model.guideset import is_guide
+
+    parts = path.split("|")
+    if len(parts) < 3 or not libName.is_valid(parts[-2]):
+        return None
+
+    name, parent = parts[-1], parts[-2]
+    if libName.suffix(parent) == Guide.SUFFIX:
+        guide = parent
+        names = [libName.update(parent, suffix=SCALE_SUFFIX)]
+    elif libName.suffix(parent) == Up.SUFFIX:
+        guide = libName.update(parent, suffix=Guide.SUFFIX)
+        names = [libName.update(parent, append=append, suffix=SCALE_SUFFIX)
+                 for append in ["X", "Y", "Z", "upScale"]]
+    else:
+        return None
+
+    if name in names and is_guide(guide):
+        return "|".join(parts[:-1])
+    return None
+
+def _add_instance(master, name, parent):
+    """
+    Instance master shape under a new transform parented
+    under the parent node. Returns the new transform.
+    """
+
+    transform = _create_scale_transform(name, parent)
+
+    shape = cmds.listRelatives(master, shapes=True, fullPath=True)[0]
+    cmds.parent(shape, transform, add=True, shape=True)
+
+    return transform
+
+def _remove_master(master):
+    """
+    Delete master sphere once it is no longer instanced.
+    """
+
+    if master and cmds.objExists(master):
+        shape = cmds.listRelatives(master, shapes=True, fullPath=True)[0]
+        if len(cmds.listRelatives(shape, allParents=True) or []) <= 1:
+            cmds.delete(master)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+
+"""
+Scene queries for guides. Filters are pushed into a single ls or
+listRelatives call where Maya can match them, guides are confirmed
+with one more ls of their guide only attribute and only reinitialised
+as they are iterated. Guides live in the root namespace.
+"""
+
+import re
+import fnmatch
+from maya import cmds
+
+from crefor.lib import libName
+from crefor.model.guide import Guide
+from crefor import log
+
+logger = log.get_logger(__name__)
+
+__all__ = ["GuideSet", "is_guide", "is_guide_name"]
+
+# Guide node names, namespaces and paths stripped
+_GUIDE = re.compile(libName.CONVENTION)
+
+def is_guide(name):
+    """is_guide(name)
+    Is name an existing guide node. Checks the naming convention
+    first and then a guide only attribute with one scene call.
+
+    :param      name:       Node name
+    :type       name:       str, Guide
+    :rtype:                 bool
+
+    **Example**:
+
+    >>> is_guide("L_arm_0_gde")
+    # Result: True #
+    >>> is_guide("persp")
+    # Result: False #
+    """
+
+    name = str(name)
+    if not is_guide_name(name):
+        return False
+
+    return cmds.objExists("%s.aimOrient" % name)
+
+def is_guide_name(name):
+    """is_guide_name(name)
+    Does name follow the guide naming convention, without any
+    scene call. Namespaces and paths are stripped.
+
+    :param      name:       Node name or path
+    :type       name:       str, Guide
+    :rtype:                 bool
+    """
+
+    match = _GUIDE.match(str(name).split("|")[-1].split(":")[-1])
+    return bool(match) and match.group(4) == Guide.SUFFIX
+
+class GuideSet(object):
+    """
+    Lazy query of guides in scene. Filters can be chained with
+    filter(), each returning a new GuideSet.
+
+    :param      position:       Position glob, eg. 'L' or '[LR]'
+    :type       position:       str
+    :param      description:    Description glob, eg. 'arm*'
+    :type       description:    str
+    :param      index:          Index or inclusive (min, max) range,
+                                None for any bound
+    :type       index:          int, tuple, None
+    :param      root:           Only guides below and including root
+    :type       root:           str, Guide, None
+    :param      axis:           Primary aim axis 'x', 'y', 'z' or an
+                                aim orient, eg. 'yzx'
+    :type       axis:           str, None
+
+    **Example**:
+
+    >>> legs = GuideSet(position="L", description="leg*", index=(0, 3))
+    >>> legs.names()
+    # Result: [u'L_legA_0_gde', u'L_legA_1_gde', u'L_legB_0_gde'] #
+    >>> for guide in legs.filter(axis="y"):
+    ...     guide.set_debug(True)
+    """
+
+    def __init__(self, position="*", description="*", index=None,
+                 root=None, axis=None):
+
+        self.position = position
+        self.description = description
+        self.index = index
+        self.root = str(root) if root else None
+        self.axis = axis.lower() if axis else None
+
+        self.__names = None
+
+    def __repr__(self):
+        return "<%s '%s'>" % (self.__class__.__name__, self.pattern)
+
+    def __iter__(self):
+        for name in self.names():
+            yield Guide.validate(name)
+
+    def __len__(self):
+        return len(self.names())
+
+    def __contains__(self, guide):
+        return str(guide) in self.names()
+
+    @property
+    def pattern(self):
+        """
+        Name pattern matched by ls, eg. 'L_arm*_*_gde'
+        """
+
+        return "_".join([self.position, self.description, "*", Guide.SUFFIX])
+
+    def filter(self, **kwargs):
+        """filter(**kwargs)
+        New GuideSet with additional filters
+
+        **Example**:
+
+        >>> GuideSet(position="L").filter(root="L_hip_0_gde")
+        # Result: <GuideSet 'L_*_*_gde'> #
+        """
+
+        options = dict(position=self.position,
+                       description=self.description,
+                       index=self.index,
+                       root=self.root,
+                       axis=self.axis)
+        options.update(kwargs)
+        return self.__class__(**options)
+
+    def names(self):
+        """names()
+        Names of matching guides, queried once and cached
+
+        :rtype:         list
+        """
+
+        if self.__names is None:
+            self.__names = [name for name in self.__query() if self.__match(name)]
+        return list(self.__names)
+
+    def first(self):
+        """first()
+        First matching guide or None
+        """
+
+        names = self.names()
+        return Guide.validate(names[0]) if names else None
+
+    def refresh(self):
+        """refresh()
+        Forget cached names so the next access queries the scene again
+        """
+
+        self.__names = None
+        return self
+
+    def __query(self):
+        """
+        Names with the guide only attribute, from one ls call, or
+        one listRelatives and one ls call below root
+        """
+
+        plug = "%s.aimOrient"
+
+        if not self.root:
+            nodes = cmds.ls(plug % self.pattern, objectsOnly=True) or []
+
+        else:
+            if not cmds.objExists(self.root):
+                return []
+
+            candidates = [self.root]
+            candidates.extend(reversed(cmds.listRelatives(self.root, allDescendents=True, type="joint") or []))
+
+            pattern = self.pattern
+            candidates = [name for name in candidates if fnmatch.fnmatchcase(name, pattern)]
+            if not candidates:
+                return []
+
+            # Keep root first order
+            found = set(cmds.ls([plug % name for name in candidates], objectsOnly=True) or [])
+            nodes = [name for name in candidates if name in found]
+
+        names = []
+        for name in nodes:
+
+            # Guides are addressed by unique name
+            if "|" in name:
+                logger.warning("Skipping guide with a non-unique name: '%s'", name)
+                continue
+            names.append(name)
+
+        return names
+
+    def __match(self, name):
+        """
+        Filters Maya can't match, cheapest first
+        """
+
+        match = _GUIDE.match(name)
+        if not match or match.group(4) != Guide.SUFFIX:
+            return False
+
+        if self.index is not None:
+            index = int(match.group(3))
+            if isinstance(self.index, (tuple, list)):
+                low, high = self.index
+                if (low is not None and index < low) or (high is not None and index > high):
+                    return False
+            elif index != int(self.index):
+                return False
+
+        if self.axis:
+            orient = Guide.AIM_ORIENT.keys()[cmds.getAttr("%s.aimOrient" % name)]
+            if not orient.startswith(self.axis):
+                return False
+
+        return True
@@ -11,6 +11,7 @@ from crefor.model import Node
 class Shader(Node):
 
     SUFFIX = "shd"
+    REFERENCES = "refCount"
 
     def __init__(self, position, description, index=0, shader="lambert"):
         super(Shader, self).__init__(position, description, index)
@@ -31,11 +32,34 @@ class Shader(Node):
 
         return cmds.sets(self.sg, q=True) if self.exists() else []
 
+    @property
+    def references(self):
+        """
+        Number of shapes using this shader. Shaders created before
+        reference counting fall back to querying set members.
+        """
+
+        if not self.exists():
+            return 0
+
+        if self.__has_references():
+            return cmds.getAttr("%s.%s" % (self.node, self.REFERENCES))
+        return len(self.shapes or [])
+
+    def __has_references(self):
+        return cmds.objExists("%s.%s" % (self.node, self.REFERENCES))
+
+    def __set_references(self, count):
+        if not self.__has_references():
+            libAttr.add_long(self.node, self.REFERENCES, min=0, dv=0)
+        libAttr.set(self.node, self.REFERENCES, max(0, count))
+
     def __create_nodes(self):
         self.node = cmds.shadingNode(self.__type, asShader=True, name=self.node)
         self.sg = cmds.sets(renderable=True, noSurfaceShader=True, empty=True, name="%sSG" % self.node)
         cmds.connectAttr("%s.outColor" % self.node,
                          "%s.surfaceShader" % self.sg)
+        libAttr.add_long(self.node, self.REFERENCES, min=0, dv=0)
         return [self.node, self.sg]
 
     def create(self):
@@ -50,28 +74,40 @@ class Shader(Node):
         return self
 
     def add(self, shapes):
+        """
+        Assign shapes to shader. Only the new shapes are forced into the
+        shading group and each one adds a reference to the shader.
+        """
 
         if self.exists():
 
-            if not isinstance(shapes, list):
-                shapes = [shapes]
+            valid_shapes = self.__valid_shapes(shapes)
+            if valid_shapes:
+                refs = self.references
+                cmds.sets(valid_shapes, edit=True, forceElement=self.sg)
+                self.__set_references(refs + len(valid_shapes))
+
+    def __valid_shapes(self, shapes):
+        """
+        Shapes of shapes and transforms, one reference each
+        """
 
-            valid_shapes = []
-            for shape in shapes:
-                is_shape = cmds.objectType(shape, isAType="shape")
-                is_transform = cmds.objectType(shape, isAType="transform")
+        if not isinstance(shapes, list):
+            shapes = [shapes]
 
-                if is_transform:
-                    valid_shapes.extend(cmds.listRelatives(shape, children=True, shapes=True))
-                elif is_shape:
-                    valid_shapes.append(shape)
-                else:
-                    raise TypeError("%s is not a valid shape" % shape)
+        valid_shapes = []
+        for shape in shapes:
+            is_shape = cmds.objectType(shape, isAType="shape")
+            is_transform = cmds.objectType(shape, isAType="transform")
 
-            existing_shapes = cmds.sets(self.sg, q=True) or []
-            valid_shapes.extend(existing_shapes)
+            if is_transform:
+                valid_shapes.extend(cmds.listRelatives(shape, children=True, shapes=True, fullPath=True) or [])
+            elif is_shape:
+                valid_shapes.append(shape)
+            else:
+                raise TypeError("%s is not a valid shape" % shape)
 
-            cmds.sets(valid_shapes, edit=True, forceElement=self.sg)
+        return valid_shapes
 
     def reinit(self):
         """
@@ -87,12 +123,22 @@ class Shader(Node):
         
         return self
 
-    def remove(self, force=False):
+    def remove(self, shapes=None, force=False):
         """
+        Release the references add() took for shapes, before the shapes
+        are deleted. Shapes that no longer exist are skipped. The
+        shader and shading group are deleted once no references remain,
+        or when forced. Shaders created before reference counting start
+        counting from their set members.
         """
 
         if self.exists():
-            
-            if not self.shapes or force:
+
+            shapes = cmds.ls(shapes or []) or []
+            refs = self.references - len(self.__valid_shapes(shapes))
+
+            if refs <= 0 or force:
                 cmds.delete(self.sg)
                 cmds.delete(self.node)
+            else:
+                self.__set_references(refs)
@@ -0,0 +1,459 @@
+#!/usr/bin/env python
+
+"""
+Offline joint orientation solver. Computes the skeleton compile() would
+build from a write() snapshot without Maya, vectorized across all guides
+with NumPy. Useful for validating and previewing templates on machines
+without Maya, and for cross-checking compiled orientations.
+
+NumPy is optional and only imported on first use, functions that
+need it raise an ImportError without it.
+
+**Example**:
+
+>>> from crefor import solver
+>>> skeleton = solver.solve_file("/tmp/spider.json")
+>>> skeleton["names"][:2]
+# Result: ['C_root_0_jnt', 'C_spine_0_jnt'] #
+>>> skeleton["joint_orients"][1]
+# Result: array([  0.,   0., -90.]) #
+"""
+
+import imp
+import json
+from collections import OrderedDict
+
+# Imported on first use, see require()
+numpy = None
+
+# If numpy can be found, checked once
+_AVAILABLE = None
+
+# Aim constraint offsets per aim orient, [default, flipped]
+AIM_ORIENT = OrderedDict([
+                         ("xyz", [(0, 0, 0), (0, 180, 0)]),
+                         ("xzy", [(-90, 0, 0), (-90, 180, 0)]),
+                         ("yxz", [(0, -180, -90), (0, 0, 90)]),
+                         ("yzx", [(0, -90, -90), (180, 90, -90)]),
+                         ("zxy", [(-90, 180, -90), (90, 180, -90)]),
+                         ("zyx", [(-90, 90, -90), (-90, -90, 90)])
+                         ])
+
+# Maya rotateOrder enum
+ROTATE_ORDERS = ["xyz", "yzx", "zxy", "xzy", "yxz", "zyx"]
+
+# Axis negated when mirroring across a plane
+MIRROR_PLANES = {"YZ": 0, "XZ": 1, "XY": 2}
+
+# Aim direction of guides not aiming at a child
+DEFAULT_AIM = (0.0, 0.0, 1.0)
+
+# Vectors shorter than this are treated as zero
+EPSILON = 1e-8
+
+def available():
+    """available()
+    If NumPy can be imported, without importing it
+    """
+
+    global _AVAILABLE
+
+    if _AVAILABLE is None:
+        if numpy is not None:
+            _AVAILABLE = True
+        else:
+            try:
+                imp.find_module("numpy")
+                _AVAILABLE = True
+            except ImportError:
+                _AVAILABLE = False
+    return _AVAILABLE
+
+def require():
+    """require()
+    Import NumPy on first use
+
+    :returns:               numpy module
+    :raises:                ImportError
+    """
+
+    global numpy
+
+    if numpy is None:
+        try:
+            import numpy as module
+        except ImportError:
+            raise ImportError("The offline solver requires numpy")
+        numpy = module
+    return numpy
+
+def load(path):
+    """load(path)
+    Read a write() snapshot from disk
+
+    :param      path:       Snapshot json path
+    :type       path:       str
+    :rtype:                 dict
+    """
+
+    with open(path, "rU") as f:
+        return json.loads(f.read())
+
+def aim_orient(primary, secondary):
+    """aim_orient(primary, secondary)
+    Aim orient key for a primary and secondary axis
+
+    **Example**:
+
+    >>> aim_orient("y", "z")
+    # Result: 'yzx' #
+    """
+
+    base = list(list(AIM_ORIENT)[0])
+    try:
+        base.remove(str(primary).lower())
+        base.remove(str(secondary).lower())
+    except ValueError:
+        raise ValueError("Primary and/or secondary axis not valid: %s, %s" % (primary, secondary))
+    return "".join([primary, secondary] + base).lower()
+
+def joint_name(guide, suffix="jnt"):
+    return "%s_%s" % (str(guide).rsplit("_", 1)[0], suffix)
+
+def hierarchy(data):
+    """hierarchy(data)
+    Order snapshot guides so parents come before their children.
+    Guides whose parent is missing from the snapshot become roots.
+
+    :param      data:       Snapshot dict, {"C_root_0_gde": {...}}
+    :type       data:       dict
+    :returns:               Ordered guide names and parent indices,
+                            -1 for roots
+    :rtype:                 tuple
+    :raises:                ValueError
+    """
+
+    children = dict((guide, []) for guide in data)
+    roots = []
+    for guide in sorted(data):
+        parent = data[guide].get("parent")
+        if parent in children:
+            children[parent].append(guide)
+        else:
+            roots.append(guide)
+
+    guides = []
+    parents = []
+    index = {}
+    stack = [(root, -1) for root in reversed(roots)]
+    while stack:
+        guide, parent = stack.pop()
+        index[guide] = len(guides)
+        guides.append(guide)
+        parents.append(parent)
+        stack.extend((child, index[guide]) for child in reversed(children[guide]))
+
+    if len(guides) != len(data):
+        cycle = sorted(set(data) - set(guides))
+        raise ValueError("Guides form a cycle: %s" % ", ".join(cycle))
+
+    return guides, parents
+
+def _aim_target(snapshot, index):
+    """
+    Index of the guide being aimed at, -1 for default aims. Older
+    snapshots store the child aim transform instead of the guide.
+    """
+
+    target = str(snapshot.get("aim_at"))
+    if target not in index:
+        target = joint_name(target, "gde")
+    return index.get(target, -1)
+
+def _normalize(vectors, fallback):
+    """
+    Normalize rows, replacing near zero rows with fallback rows
+    """
+
+    lengths = numpy.sqrt(numpy.einsum("ij,ij->i", vectors, vectors))
+    short = lengths < EPSILON
+    vectors = numpy.where(short[:, None], fallback, vectors)
+    lengths = numpy.where(short, numpy.sqrt(numpy.einsum("ij,ij->i", vectors, vectors)), lengths)
+    return vectors / lengths[:, None]
+
+def euler_to_matrix(rotations):
+    """euler_to_matrix(rotations)
+    Rotation matrices from xyz euler rotations in degrees.
+    Matrices are row-major and multiply row vectors, like Maya.
+
+    :param      rotations:  Euler rotations, shape (n, 3)
+    :type       rotations:  numpy.ndarray
+    :rtype:                 numpy.ndarray
+    """
+
+    require()
+
+    rx, ry, rz = numpy.radians(numpy.asarray(rotations, dtype=float)).T
+    cx, sx = numpy.cos(rx), numpy.sin(rx)
+    cy, sy = numpy.cos(ry), numpy.sin(ry)
+    cz, sz = numpy.cos(rz), numpy.sin(rz)
+
+    matrices = numpy.empty((len(rx), 3, 3))
+    matrices[:, 0, 0] = cy * cz
+    matrices[:, 0, 1] = cy * sz
+    matrices[:, 0, 2] = -sy
+    matrices[:, 1, 0] = sx * sy * cz - cx * sz
+    matrices[:, 1, 1] = sx * sy * sz + cx * cz
+    matrices[:, 1, 2] = sx * cy
+    matrices[:, 2, 0] = cx * sy * cz + sx * sz
+    matrices[:, 2, 1] = cx * sy * sz - sx * cz
+    matrices[:, 2, 2] = cx * cy
+    return matrices
+
+def matrix_to_euler(matrices):
+    """matrix_to_euler(matrices)
+    Xyz euler rotations in degrees from rotation matrices,
+    the inverse of euler_to_matrix()
+
+    :param      matrices:   Rotation matrices, shape (n, 3, 3)
+    :type       matrices:   numpy.ndarray
+    :rtype:                 numpy.ndarray
+    """
+
+    require()
+
+    m = numpy.asarray(matrices, dtype=float)
+    cy = numpy.hypot(m[:, 0, 0], m[:, 0, 1])
+    gimbal = cy < EPSILON
+
+    rx = numpy.where(gimbal, 0.0, numpy.arctan2(m[:, 1, 2], m[:, 2, 2]))
+    ry = numpy.arctan2(-m[:, 0, 2], cy)
+    rz = numpy.where(gimbal,
+                     numpy.arctan2(-m[:, 1, 0], m[:, 1, 1]),
+                     numpy.arctan2(m[:, 0, 1], m[:, 0, 0]))
+    return numpy.degrees(numpy.column_stack([rx, ry, rz]))
+
+def angle_between(a, b):
+    """angle_between(a, b)
+    Angles in degrees between pairs of xyz euler rotations
+
+    :param      a:          Euler rotations, shape (n, 3)
+    :param      b:          Euler rotations, shape (n, 3)
+    :type       a:          numpy.ndarray
+    :type       b:          numpy.ndarray
+    :rtype:                 numpy.ndarray
+    """
+
+    require()
+
+    relative = numpy.einsum("nij,nkj->nik", euler_to_matrix(a), euler_to_matrix(b))
+    cosine = (numpy.trace(relative, axis1=1, axis2=2) - 1.0) / 2.0
+    return numpy.degrees(numpy.arccos(numpy.clip(cosine, -1.0, 1.0)))
+
+def mirror(vectors, plane="YZ"):
+    """mirror(vectors, plane="YZ")
+    Mirror worldspace positions across a plane through the origin
+
+    :param      vectors:    Positions, shape (n, 3)
+    :param      plane:      One of MIRROR_PLANES
+    :type       vectors:    numpy.ndarray
+    :type       plane:      str
+    :rtype:                 numpy.ndarray
+    :raises:                ImportError, ValueError
+
+    **Example**:
+
+    >>> mirror([(1, 2, 3)], "YZ")
+    # Result: array([[-1.,  2.,  3.]]) #
+    """
+
+    try:
+        axis = MIRROR_PLANES[str(plane).upper()]
+    except KeyError:
+        raise ValueError("Unknown mirror plane '%s', expected one of: %s" % (plane, sorted(MIRROR_PLANES)))
+
+    require()
+
+    vectors = numpy.array(vectors, dtype=float).reshape(-1, 3)
+    vectors[:, axis] *= -1
+    return vectors
+
+def mirror_offset(offsets):
+    """mirror_offset(offsets)
+    Mirror offsetOrient rotations. Mirrored guides aim at mirrored
+    targets with a mirrored up, which reflects their aim frame and
+    flips its third axis to keep it right handed. Negating the x and
+    y offsets applies the same offset in that frame.
+
+    :param      offsets:    Xyz euler offsets in degrees, shape (n, 3)
+    :type       offsets:    numpy.ndarray
+    :rtype:                 numpy.ndarray
+    """
+
+    require()
+
+    offsets = numpy.array(offsets, dtype=float).reshape(-1, 3)
+    offsets[:, :2] *= -1
+    return offsets
+
+def linear_transforms(count, offset=(1.0, 0.0, 0.0)):
+    """linear_transforms(count, offset=(1.0, 0.0, 0.0))
+    Transforms placing copies one offset apart
+
+    :param      count:      Number of copies
+    :param      offset:     Worldspace offset between copies
+    :type       count:      int
+    :type       offset:     tuple
+    :returns:               Row vector matrices, shape (count, 4, 4)
+    :rtype:                 numpy.ndarray
+    :raises:                ImportError
+    """
+
+    require()
+
+    matrices = numpy.tile(numpy.eye(4), (count, 1, 1))
+    matrices[:, 3, :3] = numpy.outer(numpy.arange(1, count + 1), offset)
+    return matrices
+
+def radial_transforms(count, axis="y", angle=None, pivot=(0.0, 0.0, 0.0)):
+    """radial_transforms(count, axis="y", angle=None, pivot=(0.0, 0.0, 0.0))
+    Transforms rotating copies around an axis through pivot
+
+    :param      count:      Number of copies
+    :param      axis:       World axis, 'x', 'y' or 'z'
+    :param      angle:      Degrees between copies, defaults to spacing
+                            the source and copies evenly around a circle
+    :param      pivot:      Worldspace centre of rotation
+    :type       count:      int
+    :type       axis:       str
+    :type       angle:      float, None
+    :type       pivot:      tuple
+    :returns:               Row vector matrices, shape (count, 4, 4)
+    :rtype:                 numpy.ndarray
+    :raises:                ImportError, ValueError
+
+    **Example**:
+
+    >>> # Five starfish arms from one
+    >>> radial_transforms(4, axis="y")
+    """
+
+    require()
+
+    if str(axis).lower() not in "xyz" or len(str(axis)) != 1:
+        raise ValueError("Unknown axis '%s', expected 'x', 'y' or 'z'" % axis)
+
+    if angle is None:
+        angle = 360.0 / (count + 1)
+
+    rotations = numpy.zeros((count, 3))
+    rotations[:, "xyz".index(str(axis).lower())] = angle * numpy.arange(1, count + 1)
+    rotation = euler_to_matrix(rotations)
+
+    pivot = numpy.asarray(pivot, dtype=float)
+    matrices = numpy.tile(numpy.eye(4), (count, 1, 1))
+    matrices[:, :3, :3] = rotation
+    matrices[:, 3, :3] = pivot - numpy.einsum("i,nij->nj", pivot, rotation)
+    return matrices
+
+def transform_points(points, matrices):
+    """transform_points(points, matrices)
+    Transform points by every matrix
+
+    :param      points:     Worldspace points, shape (n, 3)
+    :param      matrices:   Row vector matrices, shape (m, 4, 4)
+    :returns:               Transformed points, shape (m, n, 3)
+    :rtype:                 numpy.ndarray
+    :raises:                ImportError
+    """
+
+    require()
+
+    points = numpy.asarray(points, dtype=float).reshape(-1, 3)
+    matrices = numpy.asarray(matrices, dtype=float).reshape(-1, 4, 4)
+    return numpy.einsum("ni,mij->mnj", points, matrices[:, :3, :3]) + matrices[:, None, 3, :3]
+
+def solve(data, suffix="jnt"):
+    """solve(data, suffix="jnt")
+    Solve joint names, parents, positions and orientations for
+    all guides in a snapshot in one pass.
+
+    Mirrors the guide aim network: the primary axis aims at the
+    aimAt child, or down +Z for 'world' and 'custom', the secondary
+    axis points at the up node and the aimOrient, aimFlip and
+    offsetOrient rotations are applied on top.
+
+    :param      data:       Snapshot dict from write()
+    :param      suffix:     Joint name suffix
+    :type       data:       dict
+    :type       suffix:     str
+    :returns:               Skeleton dict with 'guides', 'names' and
+                            'rotate_orders' lists and 'parents',
+                            'positions', 'matrices', 'orients',
+                            'translates' and 'joint_orients' arrays.
+                            Guides are ordered parents first.
+    :rtype:                 dict
+    :raises:                ImportError, ValueError
+
+    **Example**:
+
+    >>> skeleton = solve(load("/tmp/spider.json"))
+    >>> skeleton["orients"][0]
+    # Result: array([  0., -90.,   0.]) #
+    """
+
+    require()
+
+    guides, parents = hierarchy(data)
+    index = dict((guide, i) for i, guide in enumerate(guides))
+    snapshots = [data[guide] for guide in guides]
+    count = len(guides)
+
+    parents = numpy.array(parents, dtype=int).reshape(count)
+    targets = numpy.array([_aim_target(s, index) for s in snapshots], dtype=int).reshape(count)
+    positions = numpy.array([s["position"] for s in snapshots], dtype=float).reshape(count, 3)
+    ups = numpy.array([s["up_position"] for s in snapshots], dtype=float).reshape(count, 3)
+
+    orders = [aim_orient(s["primary"], s["secondary"]) for s in snapshots]
+    offsets = numpy.array([AIM_ORIENT[order][int(bool(s.get("aim_flip")))]
+                           for order, s in zip(orders, snapshots)], dtype=float).reshape(count, 3)
+    offsets += numpy.array([s.get("offset", (0, 0, 0)) for s in snapshots], dtype=float).reshape(count, 3)
+
+    # Aim frame, x at target and y towards up node
+    default = numpy.tile(DEFAULT_AIM, (count, 1))
+    aims = numpy.where((targets >= 0)[:, None], positions[targets] - positions, default)
+    x = _normalize(aims, default)
+
+    ups = ups - positions
+    z = numpy.cross(x, ups)
+    z = _normalize(z, numpy.cross(x, numpy.where(numpy.abs(x[:, 1:2]) < 0.9, (0, 1, 0), (1, 0, 0))))
+    y = numpy.cross(z, x)
+
+    # Offset rotation is applied in aim space
+    frames = numpy.stack([x, y, z], axis=1)
+    matrices = numpy.einsum("nij,njk->nik", euler_to_matrix(offsets), frames)
+
+    # Local transforms relative to parent joints
+    roots = parents < 0
+    parent_matrices = numpy.where(roots[:, None, None], numpy.eye(3), matrices[parents])
+    parent_positions = numpy.where(roots[:, None], 0.0, positions[parents])
+
+    local = numpy.einsum("nij,nkj->nik", matrices, parent_matrices)
+    translates = numpy.einsum("ni,nji->nj", positions - parent_positions, parent_matrices)
+
+    return {"guides": guides,
+            "names": [joint_name(guide, suffix) for guide in guides],
+            "rotate_orders": orders,
+            "parents": parents,
+            "positions": positions,
+            "matrices": matrices,
+            "orients": matrix_to_euler(matrices),
+            "translates": translates,
+            "joint_orients": matrix_to_euler(local)}
+
+def solve_file(path, suffix="jnt"):
+    """solve_file(path, suffix="jnt")
+    Solve a snapshot file, see solve()
+    """
+
+    return solve(load(path), suffix=suffix)
@@ -1,4 +1,10 @@
 from crefor.tests.api import *
+from crefor.tests.lib.name import *
+from crefor.tests.lib.util import *
+from crefor.tests.metrics import *
+from crefor.tests.trace import *
+from crefor.tests.solver import *
+from crefor.tests.jobs import *
 from crefor.tests.model.guide.guide import *
 from crefor.tests.model.guide.up import *
-from crefor.tests.model.guide.connector import *
\ No newline at end of file
+from crefor.tests.model.guide.connector import *
@@ -6,8 +6,10 @@
 from maya import cmds
 from crefor import api
 from crefor.lib import libName
-from crefor import log
+from crefor.model import display
+from crefor import log, solver
 
+import sys
 import unittest
 import logging
 
@@ -191,6 +193,370 @@ class TestApi(unittest.TestCase):
                           True,
                           "Api listed guides after compiling: %s" % guides)
 
+    def test_compile_modes(self):
+        """
+        Test solved and constraint compile orientations match
+        """
+
+        if not solver.available():
+            self.skipTest("numpy is not available")
+
+        child, parent = self.__create()
+        api.set_parent(child, parent)
+        child.set_position(2, 3, -1, worldspace=True)
+
+        self.assertEquals(api.verify(),
+                          {},
+                          "Solved orientations differ from aim network")
+
+        self.assertRaises(ValueError, api.compile, "unknown")
+
+        api.compile(mode="verify")
+        joint = libName.update(child.node, suffix="jnt")
+
+        self.assertEquals(cmds.objExists(joint),
+                          True,
+                          "Joint does not exist: '%s'" % joint)
+
+    def test_mirror(self):
+        """
+        Test api.mirror() creates counterparts with mirrored positions
+        """
+
+        if not solver.available():
+            self.skipTest("numpy is not available")
+
+        arm, spine = self.__create()
+        hand = api.create("L", "hand", 0)
+        api.set_parent(arm, spine)
+        api.set_parent(hand, arm)
+
+        arm.set_position(2, 5, 1, worldspace=True)
+        hand.set_position(4, 5, 0, worldspace=True)
+        arm.set_offset(10, 20, 30)
+
+        mirrored = api.mirror()
+        self.assertEquals([guide.node for guide in mirrored],
+                          ["R_arm_0_gde", "R_hand_0_gde"],
+                          "Unexpected mirrored guides: %s" % mirrored)
+
+        r_arm, r_hand = mirrored
+        self.assertEquals(r_arm.parent.node, spine.node, "Mirrored arm is not parented to spine")
+        self.assertEquals(r_hand.parent.node, r_arm.node, "Mirrored hand is not parented to arm")
+        self.assertEquals(str(r_arm.get_aim_at()), r_hand.node, "Mirrored arm does not aim at hand")
+
+        for position, expected in zip(r_hand.get_position(worldspace=True), (-4, 5, 0)):
+            self.assertAlmostEqual(position, expected, 4)
+
+        self.assertEquals(r_arm.get_offset_orient(), (-10.0, -20.0, 30.0))
+
+        # Mirroring again updates existing counterparts
+        hand.set_position(6, 5, 0, worldspace=True)
+        api.mirror([arm, hand])
+        self.assertAlmostEqual(r_hand.get_position(worldspace=True)[0], -6, 4)
+
+    def test_link(self):
+        """
+        Test api.link() keeps counterparts mirrored until unlinked
+        """
+
+        if not solver.available():
+            self.skipTest("numpy is not available")
+
+        arm, spine = self.__create()
+        api.set_parent(arm, spine)
+        arm.set_position(2, 5, 1, worldspace=True)
+
+        r_arm, = api.link()
+        self.assertEquals(r_arm.symmetry, arm, "Guide is not linked: '%s'" % r_arm.node)
+        self.assertEquals(api.get_linked(), [r_arm])
+
+        arm.set_position(3, 4, 0, worldspace=True)
+        for position, expected in zip(r_arm.get_position(worldspace=True), (-3, 4, 0)):
+            self.assertAlmostEqual(position, expected, 4)
+
+        self.assertEquals(api.unlink(), [r_arm])
+        self.assertEquals(r_arm.symmetry, None)
+
+        # Baked position stays put
+        arm.set_position(1, 1, 1, worldspace=True)
+        self.assertAlmostEqual(r_arm.get_position(worldspace=True)[0], -3, 4)
+
+    def test_state(self):
+        """
+        Test api.get_state() and api.set_state() round trip
+        """
+
+        arm, spine = self.__create()
+        api.set_parent(arm, spine)
+
+        state = api.get_state([spine, arm])
+        self.assertEquals(state["guides"], [spine.node, arm.node])
+        self.assertEquals(list(state["axes"]), ["xyz", "xyz"])
+
+        api.set_state([arm, spine],
+                      positions=[(4, 2, 0), (0, 1, 0)],
+                      axes=["yzx", ("z", "x")],
+                      offsets=[(0, 45, 0), (0, 0, 0)],
+                      flips=[True, False])
+
+        for position, expected in zip(arm.get_position(worldspace=True), (4, 2, 0)):
+            self.assertAlmostEqual(position, expected, 4)
+
+        self.assertEquals((arm.primary, arm.secondary), ("y", "z"))
+        self.assertEquals((spine.primary, spine.secondary), ("z", "x"))
+        self.assertEquals(arm.get_offset_orient(), (0.0, 45.0, 0.0))
+
+        self.assertRaises(ValueError, api.set_state, [arm], positions=[])
+
+    def test_guideset(self):
+        """
+        Test api.GuideSet filters and api.is_guide()
+        """
+
+        arm, spine = self.__create()
+        hand = api.create("L", "hand", 3)
+        api.set_parent(hand, arm)
+        cmds.createNode("joint", name="L_fake_0_gde")
+
+        self.assertEquals(api.is_guide(arm), True)
+        self.assertEquals(api.is_guide("L_fake_0_gde"), False)
+        self.assertEquals(api.is_guide("persp"), False)
+
+        self.assertEquals(sorted(api.GuideSet().names()),
+                          sorted([arm.node, spine.node, hand.node]))
+        self.assertEquals(api.GuideSet(position="L").names(), [arm.node, hand.node])
+        self.assertEquals(api.GuideSet(index=(1, None)).names(), [hand.node])
+        self.assertEquals(api.GuideSet(root=arm).names(), [arm.node, hand.node])
+        self.assertEquals(api.GuideSet(description="sp*").first(), spine)
+
+        hand.set_axis("y", "z")
+        self.assertEquals(api.GuideSet(position="L").filter(axis="y").names(), [hand.node])
+
+        # Guides in other namespaces are not matched
+        cmds.namespace(add="rig")
+        cmds.createNode("joint", name="rig:L_leg_0_gde")
+        cmds.addAttr("rig:L_leg_0_gde", longName="aimOrient", attributeType="enum", enumName="xyz")
+        self.assertEquals(sorted(guide.node for guide in api.GuideSet(position="L")),
+                          sorted([arm.node, hand.node]))
+
+    def test_duplicate_array(self):
+        """
+        Test api.duplicate_array() linear and radial copies
+        """
+
+        if not solver.available():
+            self.skipTest("numpy is not available")
+
+        arm, _ = self.__create()
+        hand = api.create("L", "hand", 0)
+        api.set_parent(hand, arm)
+        arm.set_position(1, 0, 0, worldspace=True)
+        hand.set_position(3, 0, 0, worldspace=True)
+
+        copies = api.duplicate_array(arm, 2, offset=(0, 0, 2))
+        self.assertEquals([[guide.node for guide in dups] for dups in copies],
+                          [["L_arm_1_gde", "L_hand_1_gde"], ["L_arm_2_gde", "L_hand_2_gde"]])
+
+        arm_copy, hand_copy = copies[1]
+        self.assertEquals(hand_copy.parent.node, arm_copy.node)
+        self.assertEquals(str(arm_copy.get_aim_at()), hand_copy.node)
+        for position, expected in zip(hand_copy.get_position(worldspace=True), (3, 0, 4)):
+            self.assertAlmostEqual(position, expected, 4)
+
+        copies = api.duplicate_array(arm, 1, "radial", axis="y")
+        for position, expected in zip(copies[0][1].get_position(worldspace=True), (-3, 0, 0)):
+            self.assertAlmostEqual(position, expected, 4)
+
+    def test_duplicate_array_chain(self):
+        """
+        Test api.duplicate_array() numbers each copy of a chain contiguously
+        """
+
+        if not solver.available():
+            self.skipTest("numpy is not available")
+
+        legs = [api.create("L", "leg", index) for index in range(3)]
+        api.set_parent(legs[1], legs[0])
+        api.set_parent(legs[2], legs[1])
+
+        copies = api.duplicate_array(legs[0], 2)
+        self.assertEquals([[guide.node for guide in dups] for dups in copies],
+                          [["L_leg_3_gde", "L_leg_4_gde", "L_leg_5_gde"],
+                           ["L_leg_6_gde", "L_leg_7_gde", "L_leg_8_gde"]])
+        self.assertEquals(copies[1][2].parent.node, "L_leg_7_gde")
+
+    def test_display(self):
+        """
+        Test guides follow the scene display controller
+        """
+
+        arm, _ = self.__create()
+
+        api.set_debug(True)
+        self.assertEquals(cmds.getAttr("%s.displayLocalAxis" % arm.aim), True)
+        self.assertEquals(cmds.getAttr("%s.debug" % arm.node), False)
+
+        # Turning debug off clears guide debug flags as well
+        arm.set_debug(True)
+        api.set_debug(False)
+        self.assertEquals(cmds.getAttr("%s.debug" % arm.node), False)
+        self.assertEquals(cmds.getAttr("%s.displayLocalAxis" % arm.aim), False)
+
+        api.set_display(guideScale=2.0, upVisibility=False)
+        self.assertAlmostEqual(cmds.getAttr("%s.scaleX" % arm.scale), 2.0, 4)
+        self.assertEquals(cmds.getAttr("%s.visibility" % arm.up.nodes["grp"]), False)
+
+        self.assertRaises(ValueError, api.set_display, unknown=True)
+        self.assertEquals(api.connect_display(), [])
+
+        # Shared display nodes are never owned or swept
+        shared = set(cmds.ls(display.SHARED_NODES))
+        self.assertFalse(arm.owned_nodes() & shared)
+        self.assertFalse(set(api.sweep(legacy=True, dry_run=True)) & shared)
+
+        cmds.delete(display.FULL_COND)
+        api.create("L", "leg", 0)
+        self.assertTrue(cmds.objExists(display.FULL_COND))
+
+    def test_display_lod(self):
+        """
+        Test level of detail and focus display modes
+        """
+
+        arm, parent = self.__create()
+        api.set_parent(arm, parent)
+        shape = arm.shapes[0]
+
+        api.set_display(lod="wireframe")
+        self.assertEquals(cmds.getAttr("%s.overrideShading" % shape), False)
+        self.assertAlmostEqual(cmds.getAttr("%s.transparencyR" % arm.shader), 0.0, 4)
+
+        api.set_display(lod="full")
+        self.assertEquals(cmds.getAttr("%s.overrideShading" % shape), True)
+        self.assertAlmostEqual(cmds.getAttr("%s.transparencyR" % arm.shader), arm._TRANSPARENCY, 4)
+        self.assertRaises(ValueError, api.set_display, lod="unknown")
+
+        cmds.select(arm.node)
+        api.set_display(focus=True, focusDepth=0)
+        self.assertEquals(cmds.getAttr("%s.visibility" % arm.up.node), True)
+        self.assertEquals(cmds.getAttr("%s.visibility" % parent.up.node), False)
+        self.assertEquals(cmds.getAttr("%s.lodVisibility" % parent.connectors[0].node), False)
+
+        api.set_display(focusDepth=1)
+        self.assertEquals(cmds.getAttr("%s.lodVisibility" % parent.connectors[0].node), True)
+
+        api.set_display(focus=False)
+        self.assertEquals(cmds.getAttr("%s.visibility" % parent.up.node), True)
+
+    def test_connector_mode(self):
+        """
+        Test drawing connectors as chain curves
+        """
+
+        arm, spine = self.__create()
+        hand = api.create("L", "hand", 0)
+        api.set_parent(arm, spine)
+        api.set_parent(hand, arm)
+        connector = spine.connectors[0]
+
+        api.set_connector_mode("chain")
+        self.assertEquals(cmds.getAttr("%s.visibility" % connector.node), False)
+        self.assertEquals(cmds.ls("*_crv", type="transform"), ["L_armChain_0_crv"])
+
+        hand.set_position(0, 5, 0, worldspace=True)
+        self.assertAlmostEqual(cmds.pointPosition("L_armChain_0_crv.cv[2]")[1], 5.0, 4)
+
+        api.remove_parent(hand)
+        self.assertEquals(cmds.getAttr("L_armChain_0_crvShape.spans"), 1)
+
+        api.set_connector_mode("annotation")
+        self.assertEquals(cmds.ls("*_crv"), [])
+        self.assertEquals(cmds.getAttr("%s.visibility" % connector.node), True)
+        self.assertTrue(cmds.objExists(connector.condition))
+
+    def test_lazy_import(self):
+        """
+        Test importing crefor.api and the view package loads nothing heavy
+        """
+
+        from crefor.tools import benchmark
+
+        if benchmark.interpreter() is None:
+            self.skipTest("No Python interpreter found for '%s'" % sys.executable)
+
+        _, modules = benchmark.import_modules("import crefor.api")
+        self.assertEquals([name for name in modules if name.startswith(("crefor.control", "crefor.model"))], [])
+
+        _, modules = benchmark.import_modules("import crefor.view.guide")
+        self.assertTrue("crefor.view.guide.io" not in modules, "View widgets were imported eagerly")
+
+        self.assertTrue(callable(api.create))
+        self.assertTrue("write_async" in dir(api))
+
+    def test_undo(self):
+        """
+        Test api calls are undone in a single step
+        """
+
+        cmds.undoInfo(state=True)
+        cmds.select(cl=True)
+
+        spine = api.create("C", "spine", 1)
+        self.assertEquals(cmds.ls(sl=True), [], "Selection was not restored after create")
+
+        cmds.undo()
+        self.assertEquals(api.exists(spine), False, "Guide create was not undone in one step: '%s'" % spine.node)
+
+    def test_report(self):
+        """
+        Test api.report()
+        """
+
+        child, parent = self.__create()
+        api.set_parent(child, parent)
+
+        cmds.group(name="C_body_0_geo", empty=True)
+        data = api.report()
+
+        self.assertEquals(sorted(data["guides"].keys()),
+                          sorted([child.node, parent.node]),
+                          "Report is missing guides: %s" % data["guides"].keys())
+        self.assertEquals(data["guides"][parent.node]["nodes"] > 0,
+                          True,
+                          "Guide owns no nodes: '%s'" % parent.node)
+        self.assertEquals(data["orphans"]["names"],
+                          [],
+                          "Orphans found in clean scene: %s" % data["orphans"]["names"])
+
+    def test_sweep(self):
+        """
+        Test api.remove() leaves no utility nodes and api.sweep()
+        """
+
+        child, parent = self.__create()
+        api.set_parent(child, parent)
+
+        nodes = child.owned_nodes()
+        api.remove(child)
+
+        self.assertEquals(cmds.ls(list(nodes)),
+                          [],
+                          "Removed guide left nodes behind: %s" % cmds.ls(list(nodes)))
+
+        nondag = parent.nondag
+        cmds.delete(parent.node)
+
+        self.assertEquals(sorted(api.sweep()),
+                          sorted(nondag),
+                          "Sweep did not remove orphaned nodes")
+
+        # User nodes named like crefor nodes are never swept
+        body = cmds.group(name="C_body_0_geo", empty=True)
+        cmds.group(body, name="C_character_0_grp")
+        self.assertEquals(api.sweep(legacy=True, dry_run=False), [])
+        self.assertEquals(cmds.objExists(body), True)
+
     def test_get_guides(self):
         """
         Test api.get_guides()
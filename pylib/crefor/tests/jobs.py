@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+
+"""
+"""
+
+import os
+import tempfile
+
+from maya import cmds
+from crefor import api, jobs
+
+import unittest
+
+def _steps(job, count, log, cancel_at=None):
+    job.total = count
+    try:
+        for index in range(count):
+            log.append(index)
+            if index == cancel_at:
+                job.cancel()
+            yield
+    except GeneratorExit:
+        del log[:]
+        raise
+    job.result = count
+
+class _Interactive(object):
+    """
+    Maya commands as seen by an interactive session. Deferred calls
+    are queued until run() and scriptJob events are kept for firing.
+    """
+
+    def __init__(self):
+        self.queue = []
+        self.events = {}
+
+    def __getattr__(self, name):
+        return getattr(cmds, name)
+
+    def about(self, **kwargs):
+        if kwargs.get("batch"):
+            return False
+        return cmds.about(**kwargs)
+
+    def evalDeferred(self, func, **kwargs):
+        self.queue.append(func)
+
+    def scriptJob(self, event=None, exists=None, kill=None, **kwargs):
+        if event is not None:
+            self.events[len(self.events) + 1] = event
+            return len(self.events)
+        if exists is not None:
+            return exists in self.events
+        self.events.pop(kill, None)
+
+    def fire(self, name):
+        for event, func in self.events.values():
+            if event == name:
+                func()
+
+    def run(self):
+        while self.queue:
+            self.queue.pop(0)()
+
+class TestJobs(unittest.TestCase):
+
+    def setUp(self):
+        """Runs before each test"""
+        cmds.file(newFile=True, force=True)
+
+    def tearDown(self):
+        """Runs after each test"""
+        pass
+
+    def test_run(self):
+        """
+        Test running a job to completion with progress callbacks
+        """
+
+        log = []
+        seen = []
+
+        job = jobs.Job("test", _steps, (5, log), callback=lambda job: seen.append(job.status))
+        self.assertEquals(job.run(), 5)
+        self.assertEquals(job.status, jobs.DONE)
+        self.assertEquals((job.done, job.total, job.progress()), (5, 5, 1.0))
+        self.assertEquals(log, range(5))
+        self.assertEquals(seen[-1], jobs.DONE)
+
+    def test_cancel(self):
+        """
+        Test cancelling rolls back between units of work
+        """
+
+        log = []
+
+        job = jobs.Job("test", _steps, (5, log), kwargs={"cancel_at": 2})
+        self.assertEquals(job.run(), None)
+        self.assertEquals(job.status, jobs.CANCELLED)
+        self.assertEquals(job.done, 3)
+        self.assertEquals(log, [])
+
+    def test_failed(self):
+        """
+        Test failures are raised and recorded
+        """
+
+        def steps(job):
+            yield
+            raise ValueError("Broken")
+
+        job = jobs.Job("test", steps)
+        self.assertRaises(ValueError, job.run)
+        self.assertEquals(job.status, jobs.FAILED)
+
+    def test_deferred(self):
+        """
+        Test started jobs run in deferred chunks and cancel on undo
+        """
+
+        interactive = _Interactive()
+        jobs.cmds = interactive
+        try:
+            log = []
+            seen = []
+
+            job = jobs.Job("test", _steps, (3, log), budget=1e-9,
+                           callback=lambda job: seen.append(job.done))
+            job.start()
+            self.assertEquals(jobs.current(), job)
+            self.assertEquals(log, [])
+
+            interactive.run()
+            self.assertEquals(job.status, jobs.DONE)
+            self.assertEquals(job.result, 3)
+            self.assertEquals(seen, [1, 2, 3, 3])
+            self.assertEquals(jobs.current(), None)
+            self.assertEquals(interactive.events, {})
+
+            log = []
+            job = jobs.Job("test", _steps, (3, log), budget=1e-9).start()
+            interactive.queue.pop(0)()
+            interactive.fire("Undo")
+            interactive.run()
+            self.assertEquals(job.status, jobs.CANCELLED)
+            self.assertEquals(log, [])
+            self.assertEquals(interactive.events, {})
+
+        finally:
+            jobs.cmds = cmds
+
+    def test_submit(self):
+        """
+        Test worker thread futures
+        """
+
+        seen = []
+
+        future = jobs.submit(sum, [1, 2, 3])
+        future.add_done_callback(seen.append)
+        self.assertEquals(future.result(timeout=10), 6)
+
+        # Batch mode callbacks run on the calling thread
+        self.assertEquals(seen, [future])
+        future.add_done_callback(seen.append)
+        self.assertEquals(seen, [future, future])
+
+        failed = jobs.submit(int, "x")
+        self.assertRaises(ValueError, failed.result, 10)
+        self.assertTrue(isinstance(failed.exception(), ValueError))
+
+    def test_write_async(self):
+        """
+        Test compressed background writes can be read back
+        """
+
+        arm = api.create("L", "arm", 0)
+        arm.set_position(1, 2, 3, worldspace=True)
+
+        path = os.path.join(tempfile.mkdtemp(), "guides.json.gz")
+        self.assertEquals(api.write_async(path).result(timeout=10), True)
+        self.assertEquals(os.listdir(os.path.dirname(path)), ["guides.json.gz"])
+
+        cmds.file(newFile=True, force=True)
+        api.rebuild(path)
+        self.assertEquals(api.exists("L_arm_0_gde"), True)
+
+        # Compression overriding the extension
+        path = os.path.join(os.path.dirname(path), "guides.json")
+        self.assertEquals(api.write_async(path, compress=True).result(timeout=10), True)
+
+        cmds.file(newFile=True, force=True)
+        api.rebuild(path)
+        self.assertEquals(api.exists("L_arm_0_gde"), True)
+
+    def test_rebuild_job(self):
+        """
+        Test control jobs match their blocking operations
+        """
+
+        arm = api.create("L", "arm", 0)
+        hand = api.create("L", "hand", 0)
+        api.set_parent(hand, arm)
+
+        path = os.path.join(tempfile.mkdtemp(), "guides.json")
+        job = api.write_job(path)
+        self.assertEquals(job.result, True)
+
+        cmds.file(newFile=True, force=True)
+
+        job = api.rebuild_job(path)
+        self.assertEquals(job.status, jobs.DONE)
+        self.assertEquals(job.done, job.total)
+        self.assertEquals(api.validate("L_hand_0_gde").parent.node, "L_arm_0_gde")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+
+"""
+"""
+
+from maya import cmds
+from crefor.lib import libName
+from crefor.lib.libPython import memoize
+
+import unittest
+
+class TestName(unittest.TestCase):
+
+    def setUp(self):
+        """Runs before each test"""
+        libName.cache_clear()
+
+    def tearDown(self):
+        """Runs after each test"""
+        pass
+
+    def test_compile(self):
+        """
+        Test compile()
+        """
+
+        self.assertEquals(libName.compile("c", "spine", 3, "gde"),
+                          "C_spine_3_gde",
+                          "Name did not compile")
+
+    def test_decompile(self):
+        """
+        Test decompile()
+        """
+
+        self.assertEquals(libName.decompile("L_arm_07_gde"),
+                          ("L", "arm", 7, "gde"),
+                          "Name did not decompile")
+        self.assertEquals(libName.decompile("L_arm_0_gde", 3),
+                          ("L", "arm", 0),
+                          "Name depth not respected")
+        self.assertRaises(ValueError, libName.decompile, "L_arm-0_0_gde")
+
+    def test_update(self):
+        """
+        Test update()
+        """
+
+        self.assertEquals(libName.update("L_arm_0_gde", suffix="jnt"),
+                          "L_arm_0_jnt",
+                          "Suffix not updated")
+        self.assertEquals(libName.update("L_arm_0_gde", append="upAxisX", suffix="pma"),
+                          "L_armUpAxisX_0_pma",
+                          "Description not appended")
+
+        # Cached result must match a fresh parse
+        cached = libName.update("L_arm_0_gde", append="upAxisX", suffix="pma")
+        libName.cache_clear()
+        self.assertEquals(cached,
+                          libName.update("L_arm_0_gde", append="upAxisX", suffix="pma"),
+                          "Cached name differs from parsed name")
+
+    def test_memoize(self):
+        """
+        Test memoize() keeps positional and keyword arguments apart
+        """
+
+        @memoize()
+        def arguments(*args, **kwargs):
+            return args, kwargs
+
+        self.assertEquals(arguments(("suffix", "jnt")), ((("suffix", "jnt"),), {}))
+        self.assertEquals(arguments(suffix="jnt"), ((), {"suffix": "jnt"}),
+                          "Keyword arguments share a cache key with positional arguments")
+
+    def test_fields(self):
+        """
+        Test position(), description(), index() and suffix()
+        """
+
+        name = "R_leg_2_gde"
+        self.assertEquals((libName.position(name),
+                           libName.description(name),
+                           libName.index(name),
+                           libName.suffix(name)),
+                          ("R", "leg", 2, "gde"),
+                          "Name fields do not match")
+
+    def test_allocate(self):
+        """
+        Test allocate() and reservation()
+        """
+
+        cmds.file(newFile=True, force=True)
+        for index in [0, 1, 3]:
+            cmds.group(empty=True, name="L_arm_%s_gde" % index)
+
+        self.assertEquals(libName.allocate("L_arm_0_gde", 3),
+                          ["L_arm_2_gde", "L_arm_4_gde", "L_arm_5_gde"],
+                          "Allocated names are not free")
+
+        with libName.reservation():
+            first = libName.generate("L_arm_0_gde")
+            second = libName.generate("L_arm_0_gde")
+
+        self.assertEquals((first, second),
+                          ("L_arm_2_gde", "L_arm_4_gde"),
+                          "Reserved names were handed out twice")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+"""
+"""
+
+from maya import cmds
+from crefor import api
+from crefor.lib import libUtil
+
+import unittest
+
+class TestHierarchy(unittest.TestCase):
+
+    def setUp(self):
+        """Runs before each test"""
+        cmds.file(newFile=True, force=True)
+
+        # root -> (a -> c, b)
+        self.tree = libUtil.Hierarchy(["root", "a", "b", "c"], [-1, 0, 0, 1])
+
+    def tearDown(self):
+        """Runs after each test"""
+        pass
+
+    def test_iterators(self):
+        """
+        Test bfs, dfs and topological orders
+        """
+
+        self.assertEquals(list(self.tree.bfs()), ["root", "a", "b", "c"])
+        self.assertEquals(list(self.tree.dfs()), ["root", "a", "c", "b"])
+        self.assertEquals(list(self.tree.topological()), ["root", "a", "b", "c"])
+        self.assertEquals(list(self.tree.edges()), [("root", "a"), ("root", "b"), ("a", "c")])
+
+    def test_subtree(self):
+        """
+        Test subtree slicing
+        """
+
+        subtree = self.tree.subtree("a")
+        self.assertEquals(subtree.nodes, ["a", "c"])
+        self.assertEquals(list(subtree.parents), [-1, 0])
+        self.assertEquals(subtree.parent("a"), None)
+        self.assertEquals(self.tree.children("root"), ["a", "b"])
+
+    def test_chains(self):
+        """
+        Test splitting into unbranched chains
+        """
+
+        self.assertEquals(self.tree.chains(), [["root", "a", "c"], ["root", "b"]])
+
+        # root -> a -> b -> c
+        tail = libUtil.Hierarchy(["root", "a", "b", "c"], [-1, 0, 1, 2])
+        self.assertEquals(tail.chains(), [["root", "a", "b", "c"]])
+        self.assertEquals(libUtil.Hierarchy(["root"], [-1]).chains(), [])
+
+    def test_fetch(self):
+        """
+        Test fetching a hierarchy from scene
+        """
+
+        spine = api.create("C", "spine", 0)
+        arm = api.create("L", "arm", 0)
+        hand = api.create("L", "hand", 0)
+        api.set_parent(arm, spine)
+        api.set_parent(hand, arm)
+
+        tree = libUtil.Hierarchy.fetch(spine)
+        self.assertEquals(tree.nodes, [spine.node, arm.node, hand.node])
+        self.assertEquals(list(tree.parents), [-1, 0, 1])
+
+        self.assertEquals(libUtil.Hierarchy.fetch().nodes, tree.nodes)
+        self.assertRaises(NameError, libUtil.Hierarchy.fetch, "C_missing_0_gde")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+"""
+"""
+
+import os
+import json
+import tempfile
+
+from crefor.metrics import Registry
+
+import unittest
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        """Runs before each test"""
+        self.registry = Registry()
+
+    def tearDown(self):
+        """Runs after each test"""
+        pass
+
+    def test_record(self):
+        """
+        Test record() and get()
+        """
+
+        for ms in range(1, 101):
+            self.registry.record("op", ms / 1000.0)
+
+        summary = self.registry.get("op")
+
+        self.assertEquals(summary["count"], 100, "Sample count does not match: %s" % summary)
+        self.assertEquals(summary["max"], 0.1, "Max does not match: %s" % summary)
+        self.assertAlmostEqual(summary["p50"], 0.05, delta=0.005)
+        self.assertAlmostEqual(summary["p95"], 0.095, delta=0.01)
+        self.assertEquals(self.registry.get("missing"), {}, "Unrecorded metric is not empty")
+
+    def test_timed(self):
+        """
+        Test timed() records calls and exceptions
+        """
+
+        @self.registry.timed("op")
+        def op(fail=False):
+            if fail:
+                raise ValueError()
+            return True
+
+        self.assertEquals(op(), True, "Decorated function result changed")
+        self.assertRaises(ValueError, op, True)
+        self.assertEquals(self.registry.get("op")["count"], 2, "Calls were not recorded")
+
+        self.registry.enabled = False
+        op()
+        self.assertEquals(self.registry.get("op")["count"], 2, "Disabled registry recorded call")
+
+    def test_export(self):
+        """
+        Test export()
+        """
+
+        with self.registry.timer("op"):
+            pass
+
+        path = os.path.join(tempfile.mkdtemp(), "metrics.json")
+        self.registry.export(path, template="spider")
+
+        with open(path) as f:
+            data = json.loads(f.read())
+
+        self.assertEquals(data["template"], "spider", "Extra data not exported")
+        self.assertEquals(data["metrics"]["op"]["count"], 1, "Metric not exported: %s" % data)
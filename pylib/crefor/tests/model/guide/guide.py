@@ -4,8 +4,9 @@
 """
 
 from maya import cmds
+from crefor.model import guide
 from crefor.model.guide import Guide
-from crefor.lib import libName
+from crefor.lib import libName, libAttr
 
 import unittest
 
@@ -203,6 +204,108 @@ class TestGuide(unittest.TestCase):
 
         self.assertEquals(arm.exists(), False, "Guide does not exist: '%s'" % arm.node)
 
+    def test_shader(self):
+        """
+        Test shared shader is reference counted
+        """
+
+        arm, spine = self.__create()
+
+        self.assertEquals(arm.shader.references, 2, "Shader references do not match guides: '%s'" % arm.shader)
+
+        arm.remove()
+
+        self.assertEquals(spine.shader.exists(), True, "Shader removed while in use: '%s'" % spine.shader)
+        self.assertEquals(spine.shader.references, 1, "Shader reference not released: '%s'" % spine.shader)
+
+        spine.remove()
+
+        self.assertEquals(spine.shader.exists(), False, "Shader exists without references: '%s'" % spine.shader)
+
+    def test_shader_legacy(self):
+        """
+        Test shaders without a reference count release removed guides
+        """
+
+        arm, spine = self.__create()
+        cmds.deleteAttr(arm.shader.node, attribute=arm.shader.REFERENCES)
+
+        arm.remove()
+
+        self.assertEquals(spine.shader.references, 1, "Legacy shader reference not released: '%s'" % spine.shader)
+
+        spine.remove()
+
+        self.assertEquals(spine.shader.exists(), False, "Legacy shader exists without references: '%s'" % spine.shader)
+
+    def test_instance_shapes(self):
+        """
+        Test guides share instanced master shapes
+        """
+
+        Guide.INSTANCE_SHAPES = True
+        try:
+            arm = Guide("L", "arm", 1).create()
+            leg = Guide("L", "leg", 1).create()
+        finally:
+            Guide.INSTANCE_SHAPES = False
+
+        self.assertEquals(arm.master, leg.master, "Guides do not share master shape: '%s'" % arm.master)
+
+        shape = cmds.listRelatives(arm.master, shapes=True, fullPath=True)[0]
+        parents = cmds.listRelatives(shape, allParents=True)
+        self.assertEquals(arm.shapes[0] in parents, True, "Guide shape is not an instance: '%s'" % arm.shapes[0])
+
+        arm.remove()
+        self.assertEquals(cmds.objExists(leg.master), True, "Master removed while instanced: '%s'" % leg.master)
+
+        leg.remove()
+        self.assertEquals(cmds.objExists(leg.master), False, "Master exists without instances: '%s'" % leg.master)
+
+    def test_select_scale_transform(self):
+        """
+        Test picking a scale transform selects its guide
+        """
+
+        Guide.INSTANCE_SHAPES = True
+        try:
+            arm = Guide("L", "arm", 1).create()
+        finally:
+            Guide.INSTANCE_SHAPES = False
+
+        body = cmds.group(name="C_body_0_geo", empty=True)
+        body = cmds.group(body, name="C_character_0_grp") + "|" + body
+
+        cmds.select(arm.scale, arm.up.x, body)
+        guide.redirect_selection()
+        self.assertEquals(cmds.ls(sl=True),
+                          [arm.node, arm.up.node, "C_body_0_geo"],
+                          "Scale transforms were not redirected: %s" % cmds.ls(sl=True))
+
+        self.assertEquals(Guide.validate(cmds.ls(sl=True)[0]).node, arm.node)
+
+    def test_scale_mode(self):
+        """
+        Test transform scale mode creates no deformers
+        """
+
+        Guide.SCALE_MODE = "transform"
+        try:
+            arm = Guide("L", "arm", 1).create()
+        finally:
+            Guide.SCALE_MODE = "cluster"
+
+        self.assertEquals(cmds.nodeType(arm.scale), "transform", "Scale node is not a transform: '%s'" % arm.scale)
+        self.assertEquals(cmds.ls(cmds.listHistory(arm.shapes + [arm.up.x]), type="cluster"),
+                          [],
+                          "Guide shapes are deformed: '%s'" % arm.node)
+
+        libAttr.set(arm.node, "guideScale", 2)
+        self.assertEquals(cmds.getAttr("%s.scaleX" % arm.scale), 2, "Guide scale not applied: '%s'" % arm.scale)
+
+        arm = Guide(*libName.decompile(arm.node, 3)).reinit()
+        self.assertEquals(cmds.objExists(arm.scale), True, "Scale node did not reinit: '%s'" % arm.node)
+
     def test_strip(self):
         """
         Test strip()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+
+"""
+"""
+
+from crefor import solver
+
+import unittest
+
+def _snapshot(node, position, up_position, parent=None, children=[],
+              aim_at="world", primary="x", secondary="y", aim_flip=False):
+    return dict(node=node,
+                parent=parent,
+                children=children,
+                offset=(0.0, 0.0, 0.0),
+                aim_at=aim_at,
+                aim_flip=aim_flip,
+                position=position,
+                up_position=up_position,
+                primary=primary,
+                secondary=secondary)
+
+@unittest.skipIf(not solver.available(), "numpy is not available")
+class TestSolver(unittest.TestCase):
+
+    def setUp(self):
+        """Runs before each test"""
+
+        self.data = {"C_root_0_gde": _snapshot("C_root_0_gde", (0, 0, 0), (-3, 0, 0),
+                                               children=["C_spine_0_gde"],
+                                               aim_at="C_spine_0_gde"),
+                     "C_spine_0_gde": _snapshot("C_spine_0_gde", (0, 5, 0), (-3, 5, 0),
+                                                parent="C_root_0_gde")}
+
+    def test_hierarchy(self):
+        """
+        Test parents are ordered before children
+        """
+
+        guides, parents = solver.hierarchy(self.data)
+        self.assertEquals(guides, ["C_root_0_gde", "C_spine_0_gde"])
+        self.assertEquals(parents, [-1, 0])
+
+        self.data["C_root_0_gde"]["parent"] = "C_spine_0_gde"
+        self.assertRaises(ValueError, solver.hierarchy, self.data)
+
+    def test_euler(self):
+        """
+        Test euler rotations survive a round trip through matrices
+        """
+
+        rotations = solver.require().array([(10.0, 20.0, 30.0), (-45.0, 80.0, 170.0)])
+        matrices = solver.euler_to_matrix(rotations)
+        self.assertTrue(solver.require().allclose(solver.matrix_to_euler(matrices), rotations))
+
+    def test_solve(self):
+        """
+        Test solved orientations follow aim, up, flip and axis settings
+        """
+
+        skeleton = solver.solve(self.data)
+        numpy = solver.require()
+
+        self.assertEquals(skeleton["names"], ["C_root_0_jnt", "C_spine_0_jnt"])
+        self.assertEquals(skeleton["rotate_orders"], ["xyz", "xyz"])
+
+        # Root x aims up at spine, y points at up node
+        root = skeleton["matrices"][0]
+        self.assertTrue(numpy.allclose(root[0], (0, 1, 0)))
+        self.assertTrue(numpy.allclose(root[1], (-1, 0, 0)))
+        self.assertTrue(numpy.allclose(skeleton["orients"][0], (0, 0, 90)))
+
+        # World aim points x down +z
+        spine = skeleton["matrices"][1]
+        self.assertTrue(numpy.allclose(spine[0], (0, 0, 1)))
+        self.assertTrue(numpy.allclose(skeleton["translates"][1], (5, 0, 0)))
+
+        # Flipped y primary aims y away from spine
+        self.data["C_root_0_gde"].update(primary="y", secondary="x", aim_flip=True)
+        root = solver.solve(self.data)["matrices"][0]
+        self.assertTrue(numpy.allclose(root[1], (0, -1, 0)))
+        self.assertTrue(numpy.allclose(root[0], (-1, 0, 0)))
+
+    def test_mirror(self):
+        """
+        Test mirrored positions and offsets
+        """
+
+        numpy = solver.require()
+
+        self.assertTrue(numpy.allclose(solver.mirror([(1, 2, 3)], "YZ"), [(-1, 2, 3)]))
+        self.assertTrue(numpy.allclose(solver.mirror([(1, 2, 3)], "xz"), [(1, -2, 3)]))
+        self.assertRaises(ValueError, solver.mirror, [(1, 2, 3)], "XX")
+
+        # Mirrored guides solve to reflected aim frames
+        data = {}
+        for node, snapshot in self.data.items():
+            snapshot = dict(snapshot, offset=(10.0, 20.0, 30.0))
+            data[node] = snapshot
+            data[node.replace("C_", "R_")] = dict(snapshot,
+                                                  parent=snapshot["parent"] and snapshot["parent"].replace("C_", "R_"),
+                                                  aim_at=snapshot["aim_at"].replace("C_", "R_"),
+                                                  position=solver.mirror([snapshot["position"]])[0],
+                                                  up_position=solver.mirror([snapshot["up_position"]])[0],
+                                                  offset=solver.mirror_offset([snapshot["offset"]])[0])
+
+        skeleton = solver.solve(data)
+        matrices = dict(zip(skeleton["guides"], skeleton["matrices"]))
+        reflect = numpy.diag([-1.0, 1.0, 1.0])
+        handed = numpy.diag([1.0, 1.0, -1.0])
+        for node in self.data:
+            expected = handed.dot(matrices[node]).dot(reflect)
+            self.assertTrue(numpy.allclose(matrices[node.replace("C_", "R_")], expected))
+
+    def test_transforms(self):
+        """
+        Test linear and radial copy transforms
+        """
+
+        numpy = solver.require()
+
+        points = solver.transform_points([(1, 0, 0)], solver.linear_transforms(2, (0, 0, 2)))
+        self.assertTrue(numpy.allclose(points, [[(1, 0, 2)], [(1, 0, 4)]]))
+
+        points = solver.transform_points([(2, 0, 0)], solver.radial_transforms(3, "y", pivot=(1, 0, 0)))
+        self.assertTrue(numpy.allclose(points[:, 0], [(1, 0, -1), (0, 0, 0), (1, 0, 1)]))
+
+        self.assertRaises(ValueError, solver.radial_transforms, 2, "w")
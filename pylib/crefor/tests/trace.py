@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+"""
+"""
+
+import os
+import json
+import tempfile
+
+from crefor import trace
+
+import unittest
+
+class TestTrace(unittest.TestCase):
+
+    def setUp(self):
+        """Runs before each test"""
+        trace.stop()
+
+    def tearDown(self):
+        """Runs after each test"""
+        trace.stop()
+
+    def test_traced(self):
+        """
+        Test traced() spans nest and carry guide names
+        """
+
+        @trace.traced("inner", guide=0)
+        def inner(guide):
+            return guide
+
+        @trace.traced("outer")
+        def outer():
+            return inner("L_arm_0_gde")
+
+        outer()
+        self.assertEquals(trace.stop(), [], "Spans recorded while tracing is disabled")
+
+        trace.start()
+        outer()
+        events = dict((event["name"], event) for event in trace.stop())
+
+        self.assertEquals(events["inner"]["args"], {"guide": "L_arm_0_gde"}, "Guide argument missing: %s" % events)
+        self.assertEquals(events["outer"]["ts"] <= events["inner"]["ts"], True, "Spans are not nested: %s" % events)
+        self.assertEquals(events["outer"]["dur"] >= events["inner"]["dur"], True, "Spans are not nested: %s" % events)
+
+    def test_write(self):
+        """
+        Test stop() writes Chrome trace json
+        """
+
+        trace.start()
+        with trace.span("io", path="/tmp/test.json"):
+            pass
+
+        path = os.path.join(tempfile.mkdtemp(), "trace.json")
+        trace.stop(path)
+
+        with open(path) as f:
+            data = json.loads(f.read())
+
+        self.assertEquals(data["traceEvents"][0]["ph"], "X", "Event is not a complete event: %s" % data)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+
+"""
+Microbenchmarks for hot library paths. Run inside mayapy:
+
+    mayapy -m crefor.tools.benchmark
+"""
+
+import os
+import re
+import sys
+import copy
+import timeit
+import subprocess
+
+class _LegacyName(object):
+    """
+    Name parsing as libName did it before validators were precompiled
+    and lookups memoized, kept as the bench_name() baseline. Every field
+    is matched against a pattern string and every update deep copies.
+    """
+
+    def __init__(self, position, description, index=0, suffix="grp"):
+        self.position = self.validate("^((?!_)[a-zA-Z]+)$", position).upper()
+        self.description = self.validate("^((?!_)[a-zA-Z0-9]+)$", description)
+        self.index = int(self.validate("^((?!_)[0-9]+)$", index))
+        self.suffix = self.validate("^((?!_)[a-zA-Z0-9]+)$", suffix)
+
+    @staticmethod
+    def validate(regex, string):
+        try:
+            return re.match(regex, str(string)).group(0)
+        except AttributeError:
+            raise ValueError("Invalid naming convention: %s" % string)
+
+    def decompile(self, depth=None):
+        return (self.position, self.description, self.index, self.suffix)[:depth]
+
+    def recompile(self, append=None, suffix=None):
+        new = copy.deepcopy(self)
+        if suffix:
+            new.suffix = new.validate("^((?!_)[a-zA-Z0-9]+)$", suffix)
+        if append:
+            description = "%s%s%s" % (new.description, append[0].upper(), append[1:])
+            new.description = new.validate("^((?!_)[a-zA-Z0-9]+)$", description)
+        return "_".join([new.position, new.description, str(new.index), new.suffix])
+
+def bench_name(number=10000):
+    """bench_name(number=10000)
+    Time libName parsing before and after precompiled validators and
+    memoization. 'old' is the previous implementation, 'cold' the
+    current one with its cache cleared every iteration and 'warm' the
+    current one answering from its cache.
+
+    :param      number:     Iterations per measurement
+    :type       number:     int
+    :returns:               Seconds per measurement
+    :rtype:                 dict
+    """
+
+    from crefor.lib import libName
+
+    def old():
+        _LegacyName(*"L_arm_0_gde".split("_")).recompile(append="upAxisX", suffix="pma")
+        _LegacyName(*"L_arm_0_gde".split("_")).decompile(3)
+
+    def cold():
+        libName.cache_clear()
+        libName.update("L_arm_0_gde", append="upAxisX", suffix="pma")
+        libName.decompile("L_arm_0_gde", 3)
+
+    def warm():
+        libName.update("L_arm_0_gde", append="upAxisX", suffix="pma")
+        libName.decompile("L_arm_0_gde", 3)
+
+    return {"old": timeit.timeit(old, number=number),
+            "cold": timeit.timeit(cold, number=number),
+            "warm": timeit.timeit(warm, number=number)}
+
+# Statement timed in a fresh interpreter, printing seconds then the
+# crefor modules it loaded
+_IMPORT = """
+import sys, time
+start = time.time()
+%s
+print time.time() - start
+print " ".join(sorted(name for name in sys.modules if name.startswith("crefor") and sys.modules[name]))
+"""
+
+def interpreter():
+    """interpreter()
+    Python interpreter for fresh processes. Inside the Maya GUI
+    sys.executable is Maya itself, so mayapy is looked up next to it.
+
+    :returns:                   Interpreter path, None if not found
+    :rtype:                     str, None
+    """
+
+    name = os.path.splitext(os.path.basename(sys.executable))[0].lower()
+    if name.startswith(("python", "mayapy")):
+        return sys.executable
+
+    # Maya/bin on Linux and Windows, Maya.app/Contents/MacOS on macOS
+    folder = os.path.dirname(sys.executable)
+    for path in [os.path.join(folder, "mayapy"),
+                 os.path.join(folder, "mayapy.exe"),
+                 os.path.join(folder, os.pardir, "bin", "mayapy")]:
+        if os.path.isfile(path):
+            return os.path.normpath(path)
+    return None
+
+def import_modules(statement):
+    """import_modules(statement)
+    Time a statement in a fresh interpreter sharing this sys.path
+
+    :param      statement:      Python statement, eg. 'import crefor.api'
+    :type       statement:      str
+    :returns:                   Seconds and crefor modules loaded
+    :rtype:                     tuple
+    :raises:                    RuntimeError
+    """
+
+    executable = interpreter()
+    if executable is None:
+        raise RuntimeError("No Python interpreter found for '%s', run from mayapy instead" % sys.executable)
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(path for path in sys.path if path)
+
+    output = subprocess.check_output([executable, "-c", _IMPORT % statement], env=env)
+    seconds, modules = output.strip().split("\n")[-2:]
+    return float(seconds), modules.split()
+
+def bench_import(number=5):
+    """bench_import(number=5)
+    Time importing crefor.api and the view package in fresh
+    interpreters, best of number runs. Lazy modules should stay far
+    below the cost of first use.
+
+    :param      number:     Runs per measurement
+    :type       number:     int
+    :returns:               Seconds per measurement
+    :rtype:                 dict
+    """
+
+    if interpreter() is None:
+        print "Skipping import benchmark, no Python interpreter found for '%s'" % sys.executable
+        return {}
+
+    statements = {"api": "import crefor.api",
+                  "api_first_use": "import crefor.api; crefor.api.create",
+                  "view_guide": "import crefor.view.guide"}
+
+    results = {}
+    for key, statement in statements.items():
+        results[key] = min(import_modules(statement)[0] for _ in range(number))
+    return results
+
+def main():
+
+    for name, func in sorted(globals().items()):
+        if name.startswith("bench_") and callable(func):
+            for key, value in sorted(func().items()):
+                print "%s.%s: %0.4fs" % (name, key, value)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+"""
+Opt-in tracer writing nested spans in Chrome trace-event format, which
+can be opened in Perfetto (ui.perfetto.dev) or chrome://tracing. While
+tracing is off, traced functions only pay for a single flag check.
+
+**Example**:
+
+>>> from crefor import trace, api
+>>> trace.start()
+>>> api.rebuild("/tmp/spider.json")
+>>> trace.stop("/tmp/spider_trace.json")
+"""
+
+import os
+import json
+import time
+import threading
+from functools import wraps
+
+_ENABLED = False
+_EVENTS = []
+
+def is_enabled():
+    return _ENABLED
+
+def start():
+    """start()
+    Start recording spans, discarding any previous recording
+    """
+
+    global _ENABLED
+
+    del _EVENTS[:]
+    _ENABLED = True
+
+def stop(path=None):
+    """stop(path=None)
+    Stop recording and optionally write the trace to disk
+
+    :param      path:       Trace json file path
+    :type       path:       str, None
+    :returns:               Recorded trace events
+    :rtype:                 list
+    """
+
+    global _ENABLED
+
+    _ENABLED = False
+    events = list(_EVENTS)
+
+    if path:
+        write(path, events)
+
+    return events
+
+def write(path, events=None):
+    """write(path, events=None)
+    Write trace events to a Chrome trace json file
+    """
+
+    data = {"traceEvents": _EVENTS if events is None else events,
+            "displayTimeUnit": "ms"}
+
+    with open(path, "w") as f:
+        f.write(json.dumps(data))
+
+    return path
+
+class _Span(object):
+
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.time()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+
+        _EVENTS.append({"name": self.name,
+                        "cat": self.name.split(".")[0],
+                        "ph": "X",
+                        "ts": self.start * 1e6,
+                        "dur": (end - self.start) * 1e6,
+                        "pid": os.getpid(),
+                        "tid": threading.current_thread().ident,
+                        "args": self.args})
+        return False
+
+class _NullSpan(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+def span(name, **args):
+    """span(name, **args)
+    Context manager recording a span with arguments
+
+    **Example**:
+
+    >>> with span("control.guide.read", path=path):
+    ...     pass
+    """
+
+    if not _ENABLED:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+def traced(name, **arguments):
+    """traced(name, **arguments)
+    Decorator recording a span for every call while tracing. Keyword
+    arguments map span argument names to positional argument indices,
+    eg. guide=0 adds str(self) as 'guide' for methods.
+
+    **Example**:
+
+    >>> @traced("model.guide.create", guide=0)
+    ... def create(self):
+    ...     pass
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def inner(*args, **kwargs):
+            if not _ENABLED:
+                return func(*args, **kwargs)
+
+            span_args = {}
+            for key, index in arguments.items():
+                if len(args) > index:
+                    span_args[key] = str(args[index])
+
+            with _Span(name, span_args):
+                return func(*args, **kwargs)
+        return inner
+    return decorator
@@ -0,0 +1,19 @@
+#!/usr/bin/env python
+
+"""
+Guide tool widgets. Widgets are imported on first access, so importing
+the package doesn't load PySide or the control stack.
+
+**Example**:
+
+>>> from crefor.view import guide
+>>> guide.GuideIOWidget().show()
+"""
+
+from crefor.lib import libPython
+
+__all__ = ["GuideWidget", "GuideIOWidget", "CreateGuideDialog"]
+
+libPython.lazy_module(__name__, {"GuideWidget": "crefor.view.guide.guide",
+                                 "GuideIOWidget": "crefor.view.guide.io",
+                                 "CreateGuideDialog": "crefor.view.guide.dialogs"})
@@ -7,10 +7,8 @@ import os
 
 from maya import cmds
 
-from crefor.control import guide
-from crefor.model.guide import Guide
+from crefor import api
 from crefor.view.guide.dialogs import CreateGuideDialog
-from crefor.lib import libName, libXform
 from crefor import log
 
 from PySide.QtCore import QSize, Qt
@@ -119,7 +117,7 @@ class GuideWidget(QWidget):
         selected = cmds.ls(sl=1)
         for sel in selected:
             try:
-                guides.append(Guide.validate(sel))
+                guides.append(api.validate(sel))
             except Exception:
                 pass
 
@@ -136,7 +134,7 @@ class GuideWidget(QWidget):
 
         position, description, index = CREATE_GUIDE_DIALOG.results
         if all([position, description, isinstance(index, int)]):
-            _guide = guide.create(position, description, index)
+            _guide = api.create(position, description, index)
             cmds.select(_guide.node, r=True)
 
     def __remove(self):
@@ -149,7 +147,7 @@ class GuideWidget(QWidget):
         guides = self.__validate()
 
         for _guide in guides:
-            guide.remove(_guide)
+            api.remove(_guide)
 
         cmds.undoInfo(closeChunk=True)
 
@@ -165,7 +163,7 @@ class GuideWidget(QWidget):
             children = guides[:-1]
             parent = guides[-1]
             for child in children:
-                guide.set_parent(child, parent)
+                api.set_parent(child, parent)
 
             cmds.select(parent.node, r=True)
 
@@ -181,7 +179,7 @@ class GuideWidget(QWidget):
             children = guides[:-1]
             parent = guides[-1]
             for child in children:
-                guide.add_child(parent, child)
+                api.add_child(parent, child)
 
             cmds.select([g.node for g in children], r=True)
 
@@ -206,7 +204,7 @@ class GuideWidget(QWidget):
         top = []
         for _guide in guides:
 
-            nodes = guide.duplicate(_guide, hierarchy=True)
+            nodes = api.duplicate(_guide, hierarchy=True)
             top.append(nodes[0])
 
         # Select top guides
@@ -226,7 +224,7 @@ class GuideWidget(QWidget):
 
             last = child
 
-            guide.set_parent(child, parent)
+            api.set_parent(child, parent)
 
     def __cycle_aim(self):
         """
@@ -250,13 +248,13 @@ class GuideWidget(QWidget):
         """
         """
 
-        guide.decompile()
+        api.decompile()
 
     def __compile(self):
         """
         """
 
-        guide.compile()
+        api.compile()
 
 
 def show():
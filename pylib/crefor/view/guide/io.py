@@ -8,13 +8,12 @@ import os
 from maya import cmds
 
 from crefor import api
-from crefor.model.guide import Guide
-from crefor.lib import libName, libXform
 from crefor import log
 
 
 from PySide.QtCore import QSize, Qt
-from PySide.QtGui import QWidget, QHBoxLayout, QPushButton, QIcon, QPixmap
+from PySide.QtGui import QWidget, QHBoxLayout, QPushButton, QIcon, QPixmap, \
+    QProgressDialog
 
 logger = log.get_logger(__name__)
 
@@ -31,6 +30,8 @@ class GuideIOWidget(QWidget):
         super(GuideIOWidget, self).__init__(parent)
 
         self.buttons = {}
+        self.job = None
+        self.progress = None
 
         self.setup_ui()
 
@@ -55,6 +56,11 @@ class GuideIOWidget(QWidget):
                                        "../icons/rebuild.png"),
                           self.__rebuild,
                           "Rebuild guide snapshot from disk")
+        self.__add_button("report",
+                          os.path.join(os.path.dirname(__file__),
+                                       "../icons/report.png"),
+                          self.__report,
+                          "Write guide node cost report to disk")
 
         self.setLayout(self.layout)
         self.setWindowTitle("Guide IO")
@@ -81,41 +87,108 @@ class GuideIOWidget(QWidget):
     def sizeHint(self):
         return QSize(self.BUTTON_SIZE*len(self.buttons.keys()), self.BUTTON_SIZE)
 
+    def __start_job(self, label, func, *args):
+        """
+        Start a job and show its progress with a cancel button
+        """
+
+        if self.job is not None and not self.job.is_finished():
+            logger.warning("Job '%s' is still running", self.job.name)
+            return
+
+        self.progress = QProgressDialog(label, "Cancel", 0, 100, self)
+        self.progress.setWindowTitle("Guide IO")
+        self.progress.setMinimumDuration(0)
+
+        self.job = func(*args, callback=self.__update_progress)
+        self.progress.canceled.connect(self.job.cancel)
+        self.__update_progress(self.job)
+
+    def __update_progress(self, job):
+        """
+        Job callback showing guides done, total and time left
+        """
+
+        if self.progress is None:
+            return
+
+        if job.is_finished():
+            self.progress.close()
+            self.progress = None
+            if job.status == "failed":
+                logger.error("Job '%s' failed: %s", job.name, job.error[1])
+            return
+
+        eta = "%ds left" % job.eta if job.eta is not None else "estimating"
+        self.progress.setValue(int(job.progress() * 100))
+        self.progress.setLabelText("%s / %s guides, %s" % (job.done, job.total, eta))
+
     def __write(self):
         """
         Write a guide snapshot to disk
         """
 
-        singleFilter = "Json (*.json)"
-        path = cmds.fileDialog2(fileFilter=singleFilter, dialogStyle=2, fileMode=0)
+        fileFilter = "Json (*.json);;Compressed json (*.json.gz)"
+        path = cmds.fileDialog2(fileFilter=fileFilter, dialogStyle=2, fileMode=0)
 
         if path:
-            logger.info("Writing guide snapshot: '%s'" % path[0])
-            api.write(path[0])
+            logger.info("Writing guide snapshot: '%s'", path[0])
+            self.buttons["write"].setEnabled(False)
+            api.write_async(path[0], callback=lambda future: self.__written(path[0], future))
+
+    def __written(self, path, future):
+        """
+        Write completion callback, called on the main thread
+        """
+
+        self.buttons["write"].setEnabled(True)
+
+        error = future.exception()
+        if error:
+            logger.error("Failed to write guide snapshot '%s': %s", path, error)
+        else:
+            logger.info("Wrote guide snapshot: '%s'", path)
 
     def __read(self):
         """
         Read a guide snapshot from disk
         """
 
-        singleFilter = "Json (*.json)"
+        singleFilter = "Json (*.json *.json.gz)"
         path = cmds.fileDialog2(fileFilter=singleFilter, dialogStyle=2, fileMode=1)
 
         if path:
-            logger.info("Reading guide snapshot: '%s'" % path[0])
-            api.read(path[0])
+            logger.info("Reading guide snapshot: '%s'", path[0])
+            self.__start_job("Reading guides", api.read_job, path[0])
 
     def __rebuild(self):
         """
         Rebuild a guide snapshot from disk
         """
 
-        singleFilter = "Json (*.json)"
+        singleFilter = "Json (*.json *.json.gz)"
         path = cmds.fileDialog2(fileFilter=singleFilter, dialogStyle=2, fileMode=1)
 
         if path:
-            logger.info("Reading guide snapshot: '%s'" % path[0])
-            api.rebuild(path[0])
+            logger.info("Reading guide snapshot: '%s'", path[0])
+            self.__start_job("Rebuilding guides", api.rebuild_job, path[0])
+
+    def __report(self):
+        """
+        Write a guide node cost report to disk
+        """
+
+        fileFilter = "Json (*.json);;CSV (*.csv)"
+        path = cmds.fileDialog2(fileFilter=fileFilter, dialogStyle=2, fileMode=0)
+
+        if path:
+            data = api.report()
+            logger.info("Guide cost: %s nodes, %s connections, %s orphans",
+                        data["total"]["nodes"],
+                        data["total"]["connections"],
+                        data["orphans"]["nodes"])
+            logger.info("Writing guide report: '%s'", path[0])
+            api.write_report(path[0], data)
 
 
 def show():